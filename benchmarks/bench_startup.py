@@ -0,0 +1,78 @@
+# bench_startup.py
+#
+# 測量冷啟動時間：每輪在新的 Python 進程中（QT_QPA_PLATFORM=offscreen）依次記錄
+#   start_window  進程啟動到開始界面顯示
+#   gui_ready     開始界面顯示後，後台預加載的主界面模塊可用
+#   app_ready     標準模式窗口構建完成並完成首次刷新
+# 用法：python benchmarks/bench_startup.py [--runs 5] [--check]
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 開始界面必須在此時間內出現（秒）
+START_WINDOW_TARGET = 0.5
+
+# 子進程：模擬 main.run_gui 的啟動順序，在每個階段輸出當前時間
+CHILD = r'''
+import sys, time, json, tempfile, os, importlib, threading
+sys.path.insert(0, sys.argv[1])
+os.chdir(tempfile.mkdtemp())
+marks = {}
+from PyQt6.QtWidgets import QApplication
+from start_window import StartWindow
+app = QApplication([])
+window = StartWindow()
+window.show()
+app.processEvents()
+marks['start_window'] = time.time()
+preload = threading.Thread(target=importlib.import_module, args=('gui',), daemon=True)
+preload.start()
+preload.join()
+marks['gui_ready'] = time.time()
+import gui
+from PyQt6.QtCore import QThreadPool
+main_window = gui.StandardTradingApp('English')
+main_window.show()
+main_window.scheduler.flush()
+QThreadPool.globalInstance().waitForDone()
+app.processEvents()
+marks['app_ready'] = time.time()
+print(json.dumps(marks))
+'''
+
+def measure_once():
+    """在新進程中測量一次，返回各階段相對進程啟動的秒數"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    launched = time.time()
+    output = subprocess.run([sys.executable, '-c', CHILD, ROOT], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    marks = json.loads(output.strip().splitlines()[-1])
+    return {name: value - launched for name, value in marks.items()}
+
+def run(runs):
+    """重複測量並返回各階段的中位數"""
+    samples = [measure_once() for _ in range(runs)]
+    return {name: statistics.median(s[name] for s in samples) for name in samples[0]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="冷啟動時間基準測試")
+    parser.add_argument('--runs', type=int, default=5, help="測量輪數（取中位數）")
+    parser.add_argument('--check', action='store_true', help="開始界面超過目標時間時返回非零狀態")
+    args = parser.parse_args(argv)
+
+    result = run(args.runs)
+    for name, seconds in result.items():
+        print(f"{name:<14}{seconds * 1000:8.1f} ms")
+    passed = result['start_window'] <= START_WINDOW_TARGET
+    print(f"start_window target {START_WINDOW_TARGET * 1000:.0f} ms: {'PASS' if passed else 'FAIL'}")
+    return 0 if passed or not args.check else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# bench_suite.py
+#
+# 基準測試：在 1k / 100k / 10M 筆的合成日誌上測量 data_processing 各函數的耗時和峰值內存，
+# 並在 offscreen Qt 環境中測量「提交一筆交易到界面重繪完成」的延遲。
+# 結果按 git 提交保存到 benchmarks/results/<commit>.json，可與其他提交對比：
+#   python benchmarks/bench_suite.py
+#   python benchmarks/bench_suite.py --sizes 1000,100000 --gui-sizes 1000 --compare HEAD~1
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import data_processing
+import journal
+import periods
+
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+DEFAULT_GUI_SIZES = (1_000, 100_000)
+
+def synthetic_returns(n, seed=0):
+    """標準模式的合成報酬率：約 45% 虧損、50% 盈利、5% 持平"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.001, 0.01, n)
+    returns[rng.random(n) < 0.05] = 0.0
+    return returns
+
+def synthetic_rr(n, seed=0):
+    """風險模式的合成風險回報比：約 40% 為0（虧損），其餘為 0.5~4"""
+    rng = np.random.default_rng(seed)
+    rr = rng.uniform(0.5, 4.0, n)
+    rr[rng.random(n) < 0.4] = 0.0
+    return rr
+
+def synthetic_timestamps(n, seed=0):
+    """合成的交易時間（納秒）：從 2020 年起每筆間隔 0~2 小時"""
+    rng = np.random.default_rng(seed)
+    return np.int64(1_577_836_800 * 10**9) + np.cumsum(rng.integers(0, 7200 * 10**9, n))
+
+def core_cases(n):
+    """返回 (名稱, 無參數函數) 列表；數據在計時前準備好"""
+    returns = synthetic_returns(n)
+    returns_list = returns.tolist()
+    cumulative = data_processing.calculate_cumulative_returns(returns_list)
+    rr = synthetic_rr(n)
+    timestamps = synthetic_timestamps(n)
+    return [
+        ('calculate_cumulative_returns', lambda: data_processing.calculate_cumulative_returns(returns_list)),
+        ('calculate_max_drawdown', lambda: data_processing.calculate_max_drawdown(cumulative)),
+        ('calculate_longest_profit_loss_streak',
+         lambda: data_processing.calculate_longest_profit_loss_streak(returns_list)),
+        ('MetricsAccumulator.rebuild', lambda: data_processing.MetricsAccumulator(returns)),
+        ('calculate_risk_curve', lambda: data_processing.calculate_risk_curve(rr, 10000.0, 100.0)),
+        ('calculate_risk_curve[fractional]', lambda: data_processing.calculate_risk_curve(
+            rr, 10000.0, data_processing.fractional_risks(rr, 10000.0, 0.01))),
+        ('calculate_rolling_stats', lambda: data_processing.calculate_rolling_stats(returns, 50)),
+        ('DrawdownIndex', lambda: data_processing.DrawdownIndex(cumulative)),
+        ('PeriodRollups', lambda: periods.PeriodRollups(returns, timestamps)),
+        ('RHistogram', lambda: data_processing.RHistogram(data_processing.r_multiples(rr))),
+    ]
+
+def time_call(fn, budget=1.0, max_repeats=5):
+    """在時間預算內重複執行，返回最短耗時（秒）"""
+    best = float('inf')
+    spent = 0.0
+    for _ in range(max_repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent > budget:
+            break
+    return best
+
+def peak_memory(fn):
+    """以 tracemalloc 測量單次執行的峰值內存（字節，含 numpy 分配）"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_core(sizes, memory=True):
+    results = {}
+    for n in sizes:
+        for name, fn in core_cases(n):
+            entry = {'seconds': time_call(fn)}
+            if memory:
+                entry['peak_bytes'] = peak_memory(fn)
+            results.setdefault(name, {})[str(n)] = entry
+            print(f"{name:<40}{n:>12,}{entry['seconds'] * 1000:12.2f} ms"
+                  + (f"{entry['peak_bytes'] / 2**20:10.1f} MiB" if memory else ''))
+    return results
+
+def run_gui(sizes, submits=20):
+    """在 offscreen Qt 中測量提交到重繪的延遲（中位數和最大值）"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QThreadPool
+    app = QApplication.instance() or QApplication([])
+    import gui
+
+    def settle(window):
+        # 等待後台計算和零延遲刷新全部完成，再同步重繪畫布
+        while True:
+            QThreadPool.globalInstance().waitForDone()
+            app.processEvents()
+            if not window.scheduler.timer.isActive() and not window.computer.busy:
+                break
+        window.canvas.repaint()
+
+    results = {}
+    cwd = os.getcwd()
+    for n in sizes:
+        for name, cls, args, values in (
+            ('StandardTradingApp.submit', gui.StandardTradingApp, (), synthetic_returns(n)),
+            ('RiskBasedTradingApp.submit', gui.RiskBasedTradingApp, (10000.0, 100.0), synthetic_rr(n)),
+        ):
+            os.chdir(tempfile.mkdtemp())
+            try:
+                path = journal.STANDARD_JOURNAL if not args else journal.RISK_JOURNAL
+                journal.write_journal(path, values, *args)
+                window = cls(*args, language='English')
+                window.show()
+                settle(window)
+                latencies = []
+                for i in range(submits):
+                    start = time.perf_counter()
+                    window.input_edit.setText('1.5' if args else '0.5')
+                    window.submit_return()
+                    settle(window)
+                    latencies.append(time.perf_counter() - start)
+                window.close()
+            finally:
+                os.chdir(cwd)
+            entry = {'seconds': float(np.median(latencies)), 'max_seconds': max(latencies)}
+            results.setdefault(name, {})[str(n)] = entry
+            print(f"{name:<40}{n:>12,}{entry['seconds'] * 1000:12.2f} ms (max {entry['max_seconds'] * 1000:.2f} ms)")
+    return results
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def resolve_results(ref):
+    """根據文件路徑或提交引用找到已保存的結果文件"""
+    if os.path.exists(ref):
+        return ref
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', ref], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ref
+    return os.path.join(RESULTS_DIR, f"{commit}.json")
+
+def compare(current, baseline):
+    """打印當前結果相對基準結果的耗時比例（<1 表示更快）"""
+    print(f"\ncompare with {baseline['commit']}:")
+    for name, by_size in current['results'].items():
+        for size, entry in by_size.items():
+            old = baseline['results'].get(name, {}).get(size)
+            if old:
+                ratio = entry['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+                print(f"{name:<40}{int(size):>12,}{ratio:10.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="data_processing 和界面更新路徑的基準測試")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="data_processing 測試的交易筆數，逗號分隔")
+    parser.add_argument('--gui-sizes', default=','.join(map(str, DEFAULT_GUI_SIZES)),
+                        help="界面延遲測試的交易筆數，逗號分隔；留空則跳過")
+    parser.add_argument('--no-memory', action='store_true', help="跳過峰值內存測量")
+    parser.add_argument('--compare', metavar='COMMIT_OR_FILE', help="與已保存的結果對比")
+    parser.add_argument('--no-save', action='store_true', help="不保存結果")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    gui_sizes = [int(s) for s in args.gui_sizes.split(',') if s]
+
+    results = run_core(sizes, memory=not args.no_memory)
+    if gui_sizes:
+        results.update(run_gui(gui_sizes))
+
+    report = {
+        'commit': current_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'results': results,
+    }
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nsaved {path}")
+    if args.compare:
+        with open(resolve_results(args.compare)) as f:
+            compare(report, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,21 @@
 # data_processing.py
 
 import numpy as np
+from collections import namedtuple
+
+# 風險金額模式的計算結果
+RiskCurve = namedtuple('RiskCurve', [
+    'profits_losses', 'capital_curve', 'drawdowns', 'max_drawdown',
+    'longest_profit', 'longest_loss', 'drawdown_index', 'streaks'
+])
+
+# 一個回撤區間：start 為回撤前的峰值位置，trough 為谷底位置，recovery 為回到峰值的位置
+# （未恢復時為 None），depth 為谷底相對峰值的差（負數），length 為從峰值到恢復（或最新一筆）的筆數
+DrawdownEpisode = namedtuple('DrawdownEpisode', ['start', 'trough', 'recovery', 'depth', 'length'])
 
 def calculate_cumulative_returns(returns):
     """計算累計收益率"""
-    cumulative_returns = np.cumprod([1 + r for r in returns]) - 1
+    cumulative_returns = np.cumprod(1 + np.asarray(returns, dtype=np.float64)) - 1
     return cumulative_returns
 
 def calculate_max_drawdown(cumulative_returns):
@@ -63,3 +74,847 @@ def calculate_longest_streak(results):
             longest_loss = current_loss
 
     return longest_profit, longest_loss
+
+# 可增長緩衝區的最小容量
+MIN_CAPACITY = 1024
+
+def grow_buffer(buffer, count, needed):
+    """確保緩衝區至少能容納 needed 個元素，容量按倍數增長；返回（可能是新分配的）緩衝區
+
+    只複製前 count 個已使用的元素，連續追加的攤銷開銷為 O(1)。
+    """
+    capacity = len(buffer)
+    if needed <= capacity:
+        return buffer
+    grown = np.empty(max(needed, capacity * 2, MIN_CAPACITY), dtype=buffer.dtype)
+    grown[:count] = buffer[:count]
+    return grown
+
+class CumulativeReturnCache:
+    """累計收益率前綴緩存：存放在預分配的 float64 緩衝區中，追加一筆交易只需一次乘法
+
+    緩存與一個日誌版本對應（見 journal.TradeLog.version），只有清除或改寫日誌時才需要整體重建。
+    """
+    __slots__ = ('buffer', 'count', 'equity', 'version')
+
+    def __init__(self, version=None, capacity=MIN_CAPACITY):
+        self.buffer = np.empty(capacity, dtype=np.float64)
+        self.reset(version)
+
+    def reset(self, version=None):
+        """清空緩存（保留已分配的緩衝區）並記錄對應的日誌版本"""
+        self.count = 0
+        self.equity = 1.0
+        self.version = version
+
+    def append(self, r):
+        """追加一筆交易，返回新的累計收益率"""
+        if self.count == len(self.buffer):
+            self.buffer = grow_buffer(self.buffer, self.count, self.count + 1)
+        self.equity *= 1 + r
+        cumulative_return = self.equity - 1
+        self.buffer[self.count] = cumulative_return
+        self.count += 1
+        return cumulative_return
+
+    def extend(self, returns):
+        """以向量化方式追加多筆交易，結果與逐筆 append 相同；返回新增部分的視圖"""
+        r = np.asarray(returns, dtype=np.float64)
+        n = len(r)
+        start = self.count
+        self.buffer = grow_buffer(self.buffer, start, start + n)
+        out = self.buffer[start:start + n]
+        if n:
+            # 在緩衝區內原地從當前淨值開始逐筆連乘，不產生中間數組
+            np.add(r, 1, out=out)
+            out[0] *= self.equity
+            np.multiply.accumulate(out, out=out)
+            self.equity = out[-1]
+            out -= 1
+        self.count += n
+        return out
+
+    def truncate(self, count):
+        """只保留前 count 筆，淨值從保存的累計收益率前綴恢復；之後可從該處繼續追加"""
+        if count < self.count:
+            self.count = count
+            self.equity = 1 + self.buffer[count - 1] if count else 1.0
+
+    def view(self):
+        """返回已使用部分的只讀視圖（零拷貝）"""
+        values = self.buffer[:self.count]
+        values.flags.writeable = False
+        return values
+
+class TradeStore:
+    """內存中的交易歷史：緊湊的 float64 緩衝區，容量按倍數增長
+
+    每筆交易只佔 8 字節（默認 float64，時間戳等可使用 int64）；view() 和 np.asarray(store) 返回零拷貝的只讀視圖，
+    可直接交給 data_processing 的函數、後台計算和圖表。追加不會改動已有元素，
+    修改、插入和刪除則寫入新的緩衝區，因此提交給後台的視圖在之後始終有效。
+    """
+    __slots__ = ('buffer', 'count')
+
+    def __init__(self, values=(), capacity=MIN_CAPACITY, dtype=np.float64):
+        values = np.asarray(values, dtype=dtype)
+        self.buffer = np.empty(max(capacity, len(values)), dtype=dtype)
+        self.buffer[:len(values)] = values
+        self.count = len(values)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view()[index]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('trade index out of range')
+        return self.buffer[index].item()
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.view()
+        if copy or (dtype is not None and values.dtype != dtype):
+            return np.array(values, dtype=dtype)
+        return values
+
+    def append(self, value):
+        """追加一筆交易（攤銷 O(1)）"""
+        if self.count == len(self.buffer):
+            self.buffer = grow_buffer(self.buffer, self.count, self.count + 1)
+        self.buffer[self.count] = value
+        self.count += 1
+
+    def extend(self, values):
+        """批量追加交易"""
+        values = np.asarray(values, dtype=self.buffer.dtype)
+        n = len(values)
+        self.buffer = grow_buffer(self.buffer, self.count, self.count + n)
+        self.buffer[self.count:self.count + n] = values
+        self.count += n
+
+    def _rebuilt(self, parts):
+        """把若干段數據寫入新分配的緩衝區（容量不變），舊緩衝區及其視圖保持原樣"""
+        buffer = np.empty(max(len(self.buffer), self.count + 1), dtype=self.buffer.dtype)
+        position = 0
+        for part in parts:
+            buffer[position:position + len(part)] = part
+            position += len(part)
+        self.buffer = buffer
+        self.count = position
+
+    def set(self, index, value):
+        """修改第 index 筆交易（寫入新緩衝區，已提交給後台的視圖不受影響）"""
+        values = self.view()
+        self._rebuilt((values[:index], [value], values[index + 1:]))
+
+    def insert(self, index, value):
+        """在第 index 筆之前插入一筆交易"""
+        values = self.view()
+        self._rebuilt((values[:index], [value], values[index:]))
+
+    def delete(self, index):
+        """刪除第 index 筆交易"""
+        values = self.view()
+        self._rebuilt((values[:index], values[index + 1:]))
+
+    def clear(self):
+        """清空所有交易；重新分配緩衝區，避免仍持有舊視圖的後台任務看到被覆寫的數據"""
+        self.buffer = np.empty(MIN_CAPACITY, dtype=self.buffer.dtype)
+        self.count = 0
+
+    def view(self):
+        """返回已使用部分的只讀視圖（零拷貝）"""
+        values = self.buffer[:self.count]
+        values.flags.writeable = False
+        return values
+
+# 回撤區間索引中每個已恢復區間的存儲格式（recovery 為 -1 表示未恢復）
+EPISODE_DTYPE = np.dtype([('start', np.int64), ('trough', np.int64), ('recovery', np.int64),
+                          ('depth', np.float64)])
+
+class DrawdownIndex:
+    """回撤區間索引：記錄曲線上所有的水下區間（峰值、谷底、恢復、深度、長度）
+
+    追加一個點為 O(1)，批量追加以向量化方式一次完成；已恢復的區間按時間順序存放在
+    可增長的結構化數組中，當前尚未恢復的區間單獨保存。位置均為從0開始的曲線下標。
+    """
+    __slots__ = ('episodes', 'closed', 'count', 'peak', 'peak_index', 'open', 'trough', 'depth')
+
+    def __init__(self, values=()):
+        self.episodes = np.empty(64, dtype=EPISODE_DTYPE)
+        self.reset()
+        self.extend(values)
+
+    def reset(self):
+        self.closed = 0
+        self.count = 0
+        self.peak = None
+        self.peak_index = -1
+        self.open = False
+        self.trough = -1
+        self.depth = 0.0
+
+    def __len__(self):
+        """區間總數（含尚未恢復的區間）"""
+        return self.closed + self.open
+
+    def _store(self, starts, troughs, recoveries, depths):
+        """把已恢復的區間追加到結構化數組"""
+        n = len(starts)
+        self.episodes = grow_buffer(self.episodes, self.closed, self.closed + n)
+        stored = self.episodes[self.closed:self.closed + n]
+        stored['start'] = starts
+        stored['trough'] = troughs
+        stored['recovery'] = recoveries
+        stored['depth'] = depths
+        self.closed += n
+
+    def append(self, value):
+        """追加曲線上的一個點"""
+        index = self.count
+        self.count += 1
+        if self.peak is None or value >= self.peak:
+            # 回到（或創出）峰值：結束當前的水下區間
+            if self.open:
+                self._store([self.peak_index], [self.trough], [index], [self.depth])
+                self.open = False
+            self.peak = value
+            self.peak_index = index
+        elif not self.open:
+            self.open = True
+            self.trough = index
+            self.depth = value - self.peak
+        elif value - self.peak < self.depth:
+            self.trough = index
+            self.depth = value - self.peak
+
+    def extend(self, values):
+        """以向量化方式追加多個點，結果與逐個 append 相同"""
+        v = np.asarray(values, dtype=np.float64)
+        if len(v) and self.peak is None:
+            # 第一個點即為初始峰值
+            self.append(v[0])
+            v = v[1:]
+        n = len(v)
+        if n == 0:
+            return
+        offset = self.count
+
+        # 帶入當前峰值的滾動峰值；低於峰值的連續段即為水下區間 [starts, ends)
+        peaks = np.maximum(np.maximum.accumulate(v), self.peak)
+        under = v < peaks
+        edges = np.diff(np.concatenate(([False], under, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        if len(starts):
+            # 每段的谷底深度和第一個谷底位置；只取水下的點（曲線溢出為 inf 時，峰值處的差為 NaN）
+            dd = v - peaks
+            depths = np.minimum.reduceat(np.where(under, dd, 0.0), starts)
+            positions = np.flatnonzero(under)
+            runs = np.searchsorted(starts, positions, side='right') - 1
+            at_trough = dd[positions] == depths[runs]
+            _, first = np.unique(runs[at_trough], return_index=True)
+            troughs = positions[at_trough][first] + offset
+
+            # 峰值位置：段前一個點；從第一個點開始的段沿用當前峰值的位置
+            peak_indices = starts + offset - 1
+            if starts[0] == 0:
+                peak_indices[0] = self.peak_index
+                if self.open and self.depth <= depths[0]:
+                    # 與尚未恢復的區間合併，保留更深的谷底
+                    troughs[0] = self.trough
+                    depths[0] = self.depth
+            elif self.open:
+                # 第一個點就回到了峰值：當前區間在此恢復
+                self._store([self.peak_index], [self.trough], [offset], [self.depth])
+            recoveries = ends + offset
+
+            # 最後一段若延續到末尾，則成為新的未恢復區間
+            still_open = ends[-1] == n
+            done = len(starts) - still_open
+            self._store(peak_indices[:done], troughs[:done], recoveries[:done], depths[:done])
+            self.open = bool(still_open)
+            if still_open:
+                self.peak_index = int(peak_indices[-1])
+                self.trough = int(troughs[-1])
+                self.depth = float(depths[-1])
+            else:
+                self.peak_index = offset + n - 1
+        else:
+            if self.open:
+                self._store([self.peak_index], [self.trough], [offset], [self.depth])
+                self.open = False
+            self.peak_index = offset + n - 1
+        self.peak = peaks[-1]
+        self.count += n
+
+    def truncate(self, count, values):
+        """只保留前 count 個點；values 為曲線未改動的前綴，只需重新掃描包含最後一點的區間"""
+        if count >= self.count:
+            return
+        if count == 0:
+            self.reset()
+            return
+        # 在最後一點之前已恢復的區間保持不變，之後的區間被移除
+        closed = self.episodes[:self.closed]
+        keep = int(np.searchsorted(closed['recovery'], count - 1, side='right'))
+        if keep < self.closed:
+            start = int(closed['start'][keep])
+        else:
+            start = self.peak_index if self.open else count - 1
+        self.closed = keep
+        self.count = count
+        self.peak = values[min(start, count - 1)]
+        self.peak_index = min(start, count - 1)
+        self.open = start < count - 1
+        if self.open:
+            # 最後一點仍在水下：該區間變為未恢復，谷底只在區間內重新查找
+            segment = values[start + 1:count]
+            trough = int(np.argmin(segment))
+            self.trough = start + 1 + trough
+            self.depth = float(segment[trough] - self.peak)
+
+    def copy(self):
+        index = DrawdownIndex()
+        index.episodes = self.episodes[:max(self.closed, 1)].copy()
+        for name in ('closed', 'count', 'peak', 'peak_index', 'open', 'trough', 'depth'):
+            setattr(index, name, getattr(self, name))
+        return index
+
+    def deepest(self):
+        """所有區間中最深的深度（即最大回撤），沒有回撤時為0"""
+        depth = float(self.episodes['depth'][:self.closed].min(initial=0.0))
+        return min(depth, self.depth) if self.open else depth
+
+    def _episode(self, start, trough, recovery, depth):
+        recovery = int(recovery) if recovery >= 0 else None
+        end = recovery if recovery is not None else self.count - 1
+        return DrawdownEpisode(int(start), int(trough), recovery, float(depth), end - int(start))
+
+    def current(self):
+        """尚未恢復的回撤區間，沒有則返回 None"""
+        if not self.open:
+            return None
+        return self._episode(self.peak_index, self.trough, -1, self.depth)
+
+    def top(self, k):
+        """最深的 k 個回撤區間（含尚未恢復的區間），按深度從深到淺排列；O(區間數)"""
+        closed = self.episodes[:self.closed]
+        if len(closed) > k:
+            closed = closed[np.argpartition(closed['depth'], k - 1)[:k]]
+        episodes = [self._episode(*row) for row in closed.tolist()]
+        if self.open:
+            episodes.append(self.current())
+        return sorted(episodes, key=lambda episode: episode.depth)[:k]
+
+    def overlapping(self, first, last):
+        """與位置區間 [first, last] 有交集的回撤區間，按時間順序排列；以二分查找定位，O(log n + 結果數)"""
+        closed = self.episodes[:self.closed]
+        lo = np.searchsorted(closed['recovery'], first, side='left')
+        hi = np.searchsorted(closed['start'], last, side='right')
+        episodes = [self._episode(*row) for row in closed[lo:max(lo, hi)].tolist()]
+        if self.open and self.peak_index <= last:
+            episodes.append(self.current())
+        return episodes
+
+# 連續盈虧統計每隔多少筆保存一次檢查點
+CHECKPOINT_INTERVAL = 1024
+
+STREAK_DTYPE = np.dtype([('current_profit', np.int64), ('current_loss', np.int64),
+                         ('longest_profit', np.int64), ('longest_loss', np.int64)])
+
+class StreakTracker:
+    """連續獲利/虧損次數的增量統計
+
+    每 CHECKPOINT_INTERVAL 筆保存一次狀態；截斷到任意位置時從最近的檢查點恢復，
+    最多只需重放一個間隔內的交易，而不是從第一筆開始。
+    """
+    __slots__ = ('count', 'current_profit', 'current_loss', 'longest_profit', 'longest_loss',
+                 'checkpoints', 'saved')
+
+    def __init__(self):
+        self.checkpoints = np.empty(64, dtype=STREAK_DTYPE)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.current_profit = 0
+        self.current_loss = 0
+        self.longest_profit = 0
+        self.longest_loss = 0
+        self.saved = 0
+
+    def _save(self, rows):
+        n = len(rows['current_profit'])
+        self.checkpoints = grow_buffer(self.checkpoints, self.saved, self.saved + n)
+        for name in STREAK_DTYPE.names:
+            self.checkpoints[name][self.saved:self.saved + n] = rows[name]
+        self.saved += n
+
+    def append(self, profit, loss):
+        """追加一筆交易；profit / loss 表示該筆是否獲利、虧損（都不是時中斷連續性）"""
+        if profit:
+            self.current_profit += 1
+            self.current_loss = 0
+        elif loss:
+            self.current_loss += 1
+            self.current_profit = 0
+        else:
+            self.current_profit = 0
+            self.current_loss = 0
+        if self.current_profit > self.longest_profit:
+            self.longest_profit = self.current_profit
+        if self.current_loss > self.longest_loss:
+            self.longest_loss = self.current_loss
+        self.count += 1
+        if self.count % CHECKPOINT_INTERVAL == 0:
+            self._save({'current_profit': [self.current_profit], 'current_loss': [self.current_loss],
+                        'longest_profit': [self.longest_profit], 'longest_loss': [self.longest_loss]})
+
+    def extend(self, profit, loss):
+        """以向量化方式追加多筆交易，結果（含檢查點）與逐筆 append 相同"""
+        n = len(profit)
+        if n == 0:
+            return
+        # 帶入當前連續次數計算每個位置的連續獲利/虧損長度
+        profit_runs = run_lengths(profit, self.current_profit)
+        loss_runs = run_lengths(loss, self.current_loss)
+        longest_profit = np.maximum(np.maximum.accumulate(profit_runs), self.longest_profit)
+        longest_loss = np.maximum(np.maximum.accumulate(loss_runs), self.longest_loss)
+
+        # 新增部分中落在檢查點上的位置
+        positions = np.arange((-self.count - 1) % CHECKPOINT_INTERVAL, n, CHECKPOINT_INTERVAL)
+        if len(positions):
+            self._save({'current_profit': profit_runs[positions], 'current_loss': loss_runs[positions],
+                        'longest_profit': longest_profit[positions], 'longest_loss': longest_loss[positions]})
+
+        self.count += n
+        self.current_profit = int(profit_runs[-1])
+        self.current_loss = int(loss_runs[-1])
+        self.longest_profit = int(longest_profit[-1])
+        self.longest_loss = int(longest_loss[-1])
+
+    def truncate(self, count):
+        """恢復到不超過 count 筆的最近一個檢查點，返回恢復後的筆數；調用方需重放之後到 count 的交易"""
+        if count >= self.count:
+            return self.count
+        self.saved = count // CHECKPOINT_INTERVAL
+        if self.saved == 0:
+            self.reset()
+            return 0
+        state = self.checkpoints[self.saved - 1]
+        self.count = self.saved * CHECKPOINT_INTERVAL
+        self.current_profit = int(state['current_profit'])
+        self.current_loss = int(state['current_loss'])
+        self.longest_profit = int(state['longest_profit'])
+        self.longest_loss = int(state['longest_loss'])
+        return self.count
+
+    def copy(self):
+        tracker = StreakTracker()
+        tracker.checkpoints = self.checkpoints[:max(self.saved, 1)].copy()
+        for name in ('count', 'current_profit', 'current_loss', 'longest_profit', 'longest_loss', 'saved'):
+            setattr(tracker, name, getattr(self, name))
+        return tracker
+
+class MetricsAccumulator:
+    """標準模式的增量指標累加器，每新增一筆交易以 O(1) 時間更新"""
+    def __init__(self, returns=(), version=None):
+        self.cache = CumulativeReturnCache(version)
+        self.rebuild(returns, version)
+
+    def reset(self, version=None):
+        """重置為沒有任何交易的狀態"""
+        self.cache.reset(version)
+        self.drawdown_index = DrawdownIndex()
+        self.streaks = StreakTracker()
+        self.peak = None
+        self.max_drawdown = 0.0
+
+    def rebuild(self, returns, version=None):
+        """根據完整的交易歷史重新計算（僅在加載、清除或改寫時使用）"""
+        self.reset(version)
+        self.extend(returns)
+
+    @property
+    def count(self):
+        return self.cache.count
+
+    @property
+    def version(self):
+        """指標對應的日誌版本"""
+        return self.cache.version
+
+    @property
+    def equity(self):
+        return self.cache.equity
+
+    @property
+    def cumulative_returns(self):
+        """累計收益率序列的只讀視圖"""
+        return self.cache.view()
+
+    @property
+    def longest_profit(self):
+        return self.streaks.longest_profit
+
+    @property
+    def longest_loss(self):
+        return self.streaks.longest_loss
+
+    def recompute_from(self, index, returns, version=None):
+        """修改、插入或刪除第 index 筆交易後，只從該處起重新計算
+
+        returns 為修改後的完整歷史。累計收益率、峰值和回撤區間直接從保存的前綴截斷，
+        連續盈虧從最近的檢查點恢復，然後追加 index 之後的交易。
+        """
+        r = np.asarray(returns, dtype=np.float64)
+        index = min(index, self.count)
+        self.cache.truncate(index)
+        self.cache.version = version
+        self.drawdown_index.truncate(index, self.cache.view())
+        self.peak = self.drawdown_index.peak
+        self.max_drawdown = self.drawdown_index.deepest()
+        start = self.streaks.truncate(index)
+        self.streaks.extend(r[start:index] > 0, r[start:index] < 0)
+        self.extend(r[index:])
+
+    def extend(self, returns):
+        """以向量化方式一次追加多筆交易，結果與逐筆 append 相同"""
+        r = np.asarray(returns, dtype=np.float64)
+        n = len(r)
+        if n == 0:
+            return
+
+        # 從當前淨值開始逐筆連乘，結果直接寫入累計收益率緩存
+        cumulative = self.cache.extend(r)
+        self.drawdown_index.extend(cumulative)
+
+        # 從當前峰值開始的滾動峰值和回撤
+        peaks = np.maximum.accumulate(cumulative)
+        if self.peak is not None:
+            peaks = np.maximum(peaks, self.peak)
+        drawdown = (cumulative - peaks).min()
+
+        # 連續獲利/虧損（收益率為0時中斷連續性）
+        self.streaks.extend(r > 0, r < 0)
+
+        self.peak = peaks[-1]
+        self.max_drawdown = min(self.max_drawdown, drawdown)
+
+    def append(self, r):
+        """追加一筆交易的報酬率並更新所有指標"""
+        # 累計淨值與累計收益率
+        cumulative_return = self.cache.append(r)
+        self.drawdown_index.append(cumulative_return)
+
+        # 峰值與最大回撤（與 calculate_max_drawdown 的定義一致）
+        if self.peak is None or cumulative_return > self.peak:
+            self.peak = cumulative_return
+        drawdown = cumulative_return - self.peak
+        if drawdown < self.max_drawdown:
+            self.max_drawdown = drawdown
+
+        # 連續獲利和連續虧損（收益率為0時中斷連續性）
+        self.streaks.append(r > 0, r < 0)
+
+    @property
+    def total_return(self):
+        """當前累計收益率"""
+        return self.equity - 1
+
+def run_lengths(mask, carry=0):
+    """計算每個位置上以該位置結尾的連續 True 長度，carry 為數組之前已有的連續長度"""
+    mask = np.asarray(mask, dtype=bool)
+    index = np.arange(len(mask))
+    # 每個位置之前（含）最近一個 False 的位置，沒有則為 -1
+    last_break = np.maximum.accumulate(np.where(mask, -1, index))
+    runs = index - last_break
+    # 開頭一段未被打斷的連續 True 接上之前的連續長度
+    runs[last_break < 0] += carry
+    return runs
+
+def longest_run(mask):
+    """以向量化方式計算布爾數組中最長的連續 True 長度"""
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return 0
+    # 在兩端補 False，差分後 +1 為連續段起點，-1 為終點
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max())
+
+# 滾動窗口風險統計：每個數組的第 i 個元素對應第 i 筆交易起的一個窗口
+RollingStats = namedtuple('RollingStats', [
+    'expectancy', 'volatility', 'sharpe', 'sortino', 'win_rate'
+])
+
+def _window_blocks(values, window):
+    """把數值按窗口長度切成二維的塊（末尾用最後一個值補齊），使第 b 塊第 j 個起的窗口
+    恰好由第 b 塊從 j 起的後段和第 b + 1 塊的前 j 個值組成；返回 (塊, 窗口數)"""
+    x = np.asarray(values, dtype=np.float64)
+    count = len(x) - window + 1
+    blocks = -(-count // window) + 1
+    return np.pad(x, (0, blocks * window - len(x)), mode='edge').reshape(blocks, window), count
+
+def _head_exclusive(columns):
+    """把每塊「前 j+1 個」的統計量右移一列，第 j 列變為前 j 個值的統計量（第0列為0）"""
+    return np.concatenate((np.zeros((len(columns), 1)), columns[:, :-1]), axis=1)
+
+def rolling_sum(values, window):
+    """計算所有長度為 window 的滑動窗口之和（O(N)），返回 len(values) - window + 1 個值
+
+    每個窗口的和由塊內的後綴和加上下一塊的前綴和得到，只累加窗口內的數值，
+    不會因為減去整個序列的前綴和而被前面數量級較大的數值淹沒。
+    """
+    blocks, count = _window_blocks(values, window)
+    tails = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1]
+    heads = _head_exclusive(np.cumsum(blocks, axis=1))
+    return (tails[:-1] + heads[1:]).ravel()[:count]
+
+def _prefix_moments(blocks):
+    """以向量化的 Welford 方法計算每塊前 k+1 個值的均值和離差平方和
+
+    先減去每塊的第一個值以減小累加誤差；離差平方和由非負的增量累加而成，不存在相減抵消。
+    """
+    reference = blocks[:, :1]
+    shifted = blocks - reference
+    counts = np.arange(1, blocks.shape[1] + 1)
+    means = np.cumsum(shifted, axis=1) / counts
+    previous = _head_exclusive(means)
+    # 第 k 個值使離差平方和增加 (x - 前 k 個值的均值)² * k / (k + 1)
+    m2 = np.cumsum((shifted - previous) ** 2 * ((counts - 1) / counts), axis=1)
+    return means + reference, m2
+
+def rolling_mean_var(values, window):
+    """計算所有滑動窗口的均值和樣本方差（O(N)）
+
+    窗口的後段和前段各自以自身均值為中心累計離差平方和，再按 Chan 等人的公式合併，
+    相當於每個窗口都以自己的均值為中心，數量級差異很大的序列中小數值窗口的方差也不會失真。
+    """
+    blocks, count = _window_blocks(values, window)
+    tail_means, tail_m2 = (column[:, ::-1] for column in _prefix_moments(blocks[:, ::-1]))
+    head_means, head_m2 = (_head_exclusive(column) for column in _prefix_moments(blocks))
+    head_counts = np.arange(window)
+    delta = head_means[1:] - tail_means[:-1]
+    means = tail_means[:-1] + delta * (head_counts / window)
+    m2 = tail_m2[:-1] + head_m2[1:] + delta ** 2 * ((window - head_counts) * head_counts / window)
+    return means.ravel()[:count], m2.ravel()[:count] / (window - 1)
+
+def calculate_rolling_stats(values, window):
+    """以向量化方式一次計算所有滑動窗口的期望值、波動率、夏普比率、索提諾比率和勝率
+
+    values 為每筆交易的結果（標準模式為報酬率，風險金額模式為 R 倍數）。
+    夏普和索提諾比率按每筆交易計算（無風險收益為0、不年化），波動率為樣本標準差；
+    分母為0時比率為 nan。交易筆數少於 window 時返回空數組。
+    """
+    if window < 2:
+        raise ValueError("滾動窗口至少需要2筆交易")
+    x = np.asarray(values, dtype=np.float64)
+    if len(x) < window:
+        empty = np.empty(0)
+        return RollingStats(empty, empty, empty, empty, empty)
+
+    expectancy, variance = rolling_mean_var(x, window)
+    volatility = np.sqrt(variance)
+
+    downside = np.minimum(x, 0.0)
+    downside_deviation = np.sqrt(rolling_sum(downside * downside, window) / window)
+    win_rate = rolling_sum(x > 0, window) / window
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(volatility > 0, expectancy / volatility, np.nan)
+        sortino = np.where(downside_deviation > 0, expectancy / downside_deviation, np.nan)
+    return RollingStats(expectancy, volatility, sharpe, sortino, win_rate)
+
+def r_multiples(rr_ratios):
+    """把風險回報比換算為每筆交易以風險金額為單位的盈虧（R 倍數）：0 為 -1R，其餘為 rr - 1"""
+    rr = np.asarray(rr_ratios, dtype=np.float64)
+    return np.where(rr == 0, -1.0, rr - 1)
+
+# R 倍數直方圖的默認箱寬（R）和箱數上限（更大的 R 倍數計入最後一個箱）
+HISTOGRAM_BIN_WIDTH = 0.25
+HISTOGRAM_MAX_BINS = 4096
+
+class RHistogram:
+    """R 倍數分布的增量直方圖
+
+    箱邊界固定在箱寬的整數倍上，與數據無關：R 倍數不小於 -1，箱從 -1 所在的箱開始、只向右增長。
+    分布與交易順序無關，追加、修改、插入或刪除一筆交易都只需更新一個箱；
+    批量加載以 np.bincount 一次完成。同時維護總和與盈利筆數，用於均值和勝率。
+    """
+    __slots__ = ('width', 'max_bins', 'first', 'counts', 'size', 'count', 'total', 'wins')
+
+    def __init__(self, r_values=(), width=HISTOGRAM_BIN_WIDTH, max_bins=HISTOGRAM_MAX_BINS):
+        self.width = width
+        self.max_bins = max_bins
+        # 第一個箱的序號（-1R 所在的箱）
+        self.first = int(np.floor(-1.0 / width))
+        self.reset()
+        self.extend(r_values)
+
+    def reset(self):
+        self.counts = np.zeros(MIN_CAPACITY, dtype=np.int64)
+        self.size = 0
+        self.count = 0
+        self.total = 0.0
+        self.wins = 0
+
+    def _bins(self, r_values):
+        bins = np.floor(np.asarray(r_values, dtype=np.float64) / self.width).astype(np.int64) - self.first
+        return np.clip(bins, 0, self.max_bins - 1)
+
+    def _reserve(self, size):
+        """確保前 size 個箱可用，新增的箱計數為0"""
+        if size > self.size:
+            self.counts = grow_buffer(self.counts, self.size, size)
+            self.counts[self.size:size] = 0
+            self.size = size
+
+    def extend(self, r_values, sign=1):
+        """批量加入（sign=-1 時移除）一組 R 倍數"""
+        r = np.asarray(r_values, dtype=np.float64)
+        if not len(r):
+            return
+        bins = self._bins(r)
+        size = int(bins.max()) + 1
+        self._reserve(size)
+        self.counts[:size] += sign * np.bincount(bins, minlength=size)
+        self.count += sign * len(r)
+        self.total += sign * float(r.sum())
+        self.wins += sign * int((r > 0).sum())
+        if sign < 0:
+            self._trim()
+
+    def append(self, r):
+        """加入一筆交易的 R 倍數"""
+        index = int(self._bins(r))
+        self._reserve(index + 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += r
+        self.wins += r > 0
+
+    def remove(self, r):
+        """移除一筆之前加入的 R 倍數（修改或刪除交易時）"""
+        self.counts[int(self._bins(r))] -= 1
+        self.count -= 1
+        self.total -= r
+        self.wins -= r > 0
+        self._trim()
+
+    def _trim(self):
+        # 去掉末尾的空箱，使直方圖的範圍隨最大值收縮
+        while self.size and not self.counts[self.size - 1]:
+            self.size -= 1
+
+    def view(self):
+        """各箱計數的只讀視圖"""
+        counts = self.counts[:self.size]
+        counts.flags.writeable = False
+        return counts
+
+    def edges(self):
+        """箱邊界（比箱數多1）"""
+        return (self.first + np.arange(self.size + 1)) * self.width
+
+    def cdf(self):
+        """各箱右邊界處的累積分布"""
+        return np.cumsum(self.view()) / max(self.count, 1)
+
+    def quantile(self, q):
+        """按箱內均勻分布插值的分位數（R）"""
+        if not self.count:
+            return 0.0
+        cumulative = np.cumsum(self.view())
+        target = q * self.count
+        index = min(int(np.searchsorted(cumulative, target)), self.size - 1)
+        below = cumulative[index - 1] if index else 0
+        fraction = (target - below) / self.counts[index] if self.counts[index] else 0.0
+        return (self.first + index + fraction) * self.width
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count if self.count else 0.0
+
+def fractional_risks(rr_ratios, initial_capital, fraction):
+    """固定比例倉位：每筆的風險金額為交易前資金的 fraction
+
+    資金曲線為 initial_capital * cumprod(1 + fraction * R)，一次累乘得出，不需要逐筆循環；
+    按返回的風險金額計算的資金曲線與之相同。
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError("風險比例必須大於0且不超過100%")
+    growth = 1 + fraction * r_multiples(np.asarray(rr_ratios, dtype=np.float64))
+    capital_before = initial_capital * np.cumprod(np.concatenate(([1.0], growth[:-1])))
+    return fraction * capital_before
+
+def calculate_risk_curve(rr_ratios, initial_capital, risk_per_trade):
+    """以向量化方式計算風險金額模式的盈虧、資金曲線、回撤和最長連續盈虧
+
+    risk_per_trade 可以是固定金額，也可以是與交易一一對應的風險金額數組。
+    """
+    rr = np.asarray(rr_ratios, dtype=np.float64)
+
+    # 風險回報比為0視為虧損一個風險金額，否則盈利 (rr - 1) 個風險金額
+    profits_losses = np.where(rr == 0, -risk_per_trade, (rr - 1) * risk_per_trade)
+
+    # 資金曲線：從初始資金開始逐筆累加盈虧
+    capital_curve = np.cumsum(np.concatenate(([initial_capital], profits_losses)))[1:]
+
+    # 回撤序列和最大回撤
+    drawdowns = capital_curve - np.maximum.accumulate(capital_curve)
+    max_drawdown = drawdowns.min() if drawdowns.size else 0.0
+
+    # 盈利為正視為獲利，其餘（含盈虧為0）視為虧損
+    profitable = profits_losses > 0
+    streaks = StreakTracker()
+    streaks.extend(profitable, ~profitable)
+
+    return RiskCurve(profits_losses, capital_curve, drawdowns, max_drawdown,
+                     streaks.longest_profit, streaks.longest_loss, DrawdownIndex(capital_curve), streaks)
+
+def update_risk_curve(curve, rr_ratios, start, initial_capital, risk_per_trade):
+    """風險回報比從第 start 筆起有變化（追加、修改、插入或刪除）時，只重算 start 之後的部分
+
+    之前的盈虧、資金和回撤直接沿用 curve 中保存的前綴，峰值由 start 前一筆的資金和回撤得出；
+    回撤區間和連續盈虧在副本上截斷後繼續追加，不改動 curve 本身（界面可能仍在使用）。
+    結果與 calculate_risk_curve 對完整序列的計算相同。
+    """
+    rr = np.asarray(rr_ratios, dtype=np.float64)
+    start = min(start, len(curve.capital_curve), len(rr))
+    if start == 0:
+        return calculate_risk_curve(rr, initial_capital, risk_per_trade)
+
+    if np.ndim(risk_per_trade):
+        risk_per_trade = np.asarray(risk_per_trade, dtype=np.float64)[start:]
+    tail = np.where(rr[start:] == 0, -risk_per_trade, (rr[start:] - 1) * risk_per_trade)
+    # 以前一筆的資金為起點逐筆累加，與完整計算的累加順序相同
+    base = curve.capital_curve[start - 1]
+    peak = base - curve.drawdowns[start - 1]
+    capital_tail = np.cumsum(np.concatenate(([base], tail)))[1:]
+    drawdown_tail = capital_tail - np.maximum(np.maximum.accumulate(capital_tail), peak)
+
+    profits_losses = np.concatenate((curve.profits_losses[:start], tail))
+    capital_curve = np.concatenate((curve.capital_curve[:start], capital_tail))
+    drawdowns = np.concatenate((curve.drawdowns[:start], drawdown_tail))
+
+    drawdown_index = curve.drawdown_index.copy()
+    drawdown_index.truncate(start, capital_curve)
+    drawdown_index.extend(capital_tail)
+
+    streaks = curve.streaks.copy()
+    replay = streaks.truncate(start)
+    profitable = profits_losses[replay:] > 0
+    streaks.extend(profitable, ~profitable)
+
+    return RiskCurve(profits_losses, capital_curve, drawdowns, drawdown_index.deepest(),
+                     streaks.longest_profit, streaks.longest_loss, drawdown_index, streaks)
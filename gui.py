@@ -1,90 +1,235 @@
 # gui.py
 
 import sys
-import data_processing
+import math
+import time
 import numpy as np
-import matplotlib.pyplot as plt
-import json
-from matplotlib.ticker import FormatStrFormatter, MaxNLocator, FuncFormatter
+import data_processing
+import importer
+import journal
+import periods
+import plotting
+import portfolio
+import simulation
+import store
+import workers
 from PyQt6 import QtCore
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout,
-    QHBoxLayout, QListWidget, QMessageBox, QComboBox, QDialog
+    QHBoxLayout, QListView, QMessageBox, QDialog, QFileDialog, QSizePolicy,
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QInputDialog, QListWidget,
+    QCheckBox, QComboBox, QDateEdit, QDialogButtonBox, QFormLayout, QMenu
 )
 from PyQt6.QtGui import QAction
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 from translations import translations
-
-# 定義主題樣式表
-light_style = """
-QWidget {
-    background-color: #ffffff;
-    color: #000000;
-}
-"""
-
-dark_style = """
-QWidget {
-    background-color: #2e2e2e;
-    color: #ffffff;
-}
-"""
-
-class StartWindow(QWidget):
-    """開始界面，讓用戶選擇計算方式、語言和主題"""
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("選擇設置")
-        self.setGeometry(100, 100, 400, 250)
-        layout = QVBoxLayout()
-
-        # 計算方式選擇
-        self.calc_label = QLabel("請選擇報酬率計算方式：")
-        self.calc_combo_box = QComboBox()
-        self.calc_combo_box.addItems(["標準累計收益率", "基於初始資金和固定風險金額"])
-
-        # 語言選擇
-        self.lang_label = QLabel("請選擇語言 / Language:")
-        self.lang_combo_box = QComboBox()
-        self.lang_combo_box.addItems(["中文", "English"])
-
-        # 主題選擇
-        self.theme_label = QLabel("請選擇主題 / Theme:")
-        self.theme_combo_box = QComboBox()
-        self.theme_combo_box.addItems(["淺色 / Light", "深色 / Dark"])
-
-        # 下一步按鈕
-        self.next_button = QPushButton("下一步 / Next")
-        self.next_button.clicked.connect(self.next_step)
-
-        layout.addWidget(self.calc_label)
-        layout.addWidget(self.calc_combo_box)
-        layout.addWidget(self.lang_label)
-        layout.addWidget(self.lang_combo_box)
-        layout.addWidget(self.theme_label)
-        layout.addWidget(self.theme_combo_box)
-        layout.addWidget(self.next_button)
-
-        self.setLayout(layout)
-
-        # 保存用戶選擇
-        self.selected_option = None
-        self.selected_language = '中文'
-        self.selected_theme = '淺色'
-
-    def next_step(self):
-        self.selected_option = self.calc_combo_box.currentIndex()
-        self.selected_language = self.lang_combo_box.currentText()
-        self.selected_theme = self.theme_combo_box.currentText()
-        self.close()
+from profiling import profiler
+
+# 開始界面位於輕量模塊中，這裡重新導出以保持兼容
+from start_window import StartWindow, light_style, dark_style  # noqa: F401
+
+class TradeListModel(QtCore.QAbstractListModel):
+    """交易記錄列表模型：包裝交易數據，只在顯示時按需格式化每一行"""
+    def __init__(self, values, formatter, parent=None):
+        super().__init__(parent)
+        self.values = values
+        self.formatter = formatter
+        self.count = len(values)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self.count
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and index.isValid():
+            row = index.row()
+            return self.formatter(row + 1, self.values[row])
+        return None
+
+    def set_values(self, values):
+        """替換整個數據序列（加載或清除時使用）"""
+        self.beginResetModel()
+        self.values = values
+        self.count = len(values)
+        self.endResetModel()
+
+    def sync(self):
+        """與數據序列同步：新增的交易只發出 rowsInserted"""
+        new_count = len(self.values)
+        if new_count > self.count:
+            self.beginInsertRows(QtCore.QModelIndex(), self.count, new_count - 1)
+            self.count = new_count
+            self.endInsertRows()
+        elif new_count < self.count:
+            self.set_values(self.values)
+
+    def retranslate(self):
+        """語言切換後重新格式化可見行"""
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
+
+class UpdateScheduler(QtCore.QObject):
+    """合併界面更新：先標記需要刷新的部分，在下一次事件循環時按順序統一刷新"""
+    def __init__(self, steps, parent=None):
+        super().__init__(parent)
+        # steps 為 (名稱, 刷新函數) 的有序列表
+        self.steps = steps
+        self.dirty = set()
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, *names):
+        """標記指定部分（默認全部）需要刷新，並安排一次零延遲刷新"""
+        self.dirty.update(names or [name for name, _ in self.steps])
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """立即刷新所有被標記的部分"""
+        self.timer.stop()
+        dirty, self.dirty = self.dirty, set()
+        for name, step in self.steps:
+            if name in dirty:
+                step()
+
+class PerfOverlay(QtCore.QObject):
+    """調試用性能覆蓋層：在狀態欄中定時顯示各埋點區間的耗時，顯示期間開啟埋點"""
+    def __init__(self, window, interval=500):
+        super().__init__(window)
+        self.window = window
+        self.visible = False
+        self.profiler_was_enabled = profiler.enabled
+        self.label = QLabel()
+        # 文本很長時不撐寬窗口，完整內容見提示框
+        self.label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Preferred)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.refresh)
+
+    def set_visible(self, visible):
+        if visible == self.visible:
+            return
+        self.visible = visible
+        status_bar = self.window.statusBar()
+        if visible:
+            self.profiler_was_enabled = profiler.enabled
+            profiler.enabled = True
+            status_bar.addPermanentWidget(self.label, 1)
+            self.label.show()
+            status_bar.show()
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+            profiler.enabled = self.profiler_was_enabled
+            status_bar.removeWidget(self.label)
+            status_bar.hide()
+
+    def refresh(self):
+        legend = self.window.trans['perf_legend']
+        self.label.setText(legend + profiler.summary())
+        self.label.setToolTip(legend + '\n' + profiler.summary(separator='\n'))
+
+# 設置菜單中可選的滾動窗口（交易筆數），第一個為默認值
+ROLLING_WINDOWS = (20, 50, 100, 200)
+
+class RollingStatsPanel:
+    """滾動窗口風險統計的標籤組：只取最近 window 筆交易計算最新一個窗口"""
+    def __init__(self, percent):
+        # 標準模式的結果以百分比顯示，風險金額模式以 R 倍數顯示
+        self.percent = percent
+        self.title_label = QLabel()
+        self.expectancy_label = QLabel()
+        self.volatility_label = QLabel()
+        self.sharpe_label = QLabel()
+        self.sortino_label = QLabel()
+        self.win_rate_label = QLabel()
+
+    def add_to(self, layout):
+        for label in (self.title_label, self.expectancy_label, self.volatility_label,
+                      self.sharpe_label, self.sortino_label, self.win_rate_label):
+            layout.addWidget(label)
+
+    def format_value(self, value):
+        if value is None or not math.isfinite(value):
+            return '—'
+        return f"{value * 100:.2f}%" if self.percent else f"{value:.2f}R"
+
+    @staticmethod
+    def format_ratio(value):
+        if value is None or not math.isfinite(value):
+            return '—'
+        return f"{value:.2f}"
+
+    def update(self, values, window, trans):
+        stats = data_processing.calculate_rolling_stats(values[-window:], window)
+        # 交易筆數不足一個窗口時顯示「—」
+        latest = [series[-1] if len(series) else None for series in stats]
+        expectancy, volatility, sharpe, sortino, win_rate = latest
+        self.title_label.setText(trans['rolling_title'].format(window))
+        self.expectancy_label.setText(trans['rolling_expectancy'].format(self.format_value(expectancy)))
+        self.volatility_label.setText(trans['rolling_volatility'].format(self.format_value(volatility)))
+        self.sharpe_label.setText(trans['rolling_sharpe'].format(self.format_ratio(sharpe)))
+        self.sortino_label.setText(trans['rolling_sortino'].format(self.format_ratio(sortino)))
+        self.win_rate_label.setText(trans['rolling_win_rate'].format(
+            '—' if win_rate is None else f"{win_rate * 100:.1f}%"))
+
+# 列表和圖表中標出的最大回撤區間數
+TOP_DRAWDOWNS = 5
+
+class DrawdownPanel:
+    """最大回撤區間列表：從回撤區間索引取最深的幾個區間，在圖表上以陰影標出，雙擊某一行縮放到該區間"""
+    def __init__(self, chart, percent, count=TOP_DRAWDOWNS):
+        self.chart = chart
+        # 標準模式的深度以百分比顯示，風險金額模式以資金顯示
+        self.percent = percent
+        self.count = count
+        self.episodes = []
+        self.title_label = QLabel()
+        self.list_widget = QListWidget()
+        self.list_widget.setMaximumHeight(120)
+        self.list_widget.itemDoubleClicked.connect(self.zoom_to)
+
+    def add_to(self, layout):
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.list_widget)
+
+    @staticmethod
+    def span(episode):
+        """區間在圖表上的 x 範圍（交易序號從1開始）"""
+        return episode.start + 1, episode.start + episode.length + 1
+
+    def update(self, index, trans):
+        self.episodes = index.top(self.count)
+        self.title_label.setText(trans['drawdown_title'].format(self.count))
+        self.list_widget.clear()
+        for rank, episode in enumerate(self.episodes, 1):
+            depth = f"{episode.depth * 100:.2f}%" if self.percent else f"{episode.depth:.2f}"
+            end = trans['drawdown_open'] if episode.recovery is None else episode.recovery + 1
+            self.list_widget.addItem(trans['drawdown_item'].format(
+                rank, depth, episode.start + 1, end, episode.trough + 1))
+        self.chart.set_spans([self.span(episode) for episode in self.episodes])
+
+    def zoom_to(self, item):
+        episode = self.episodes[self.list_widget.row(item)]
+        self.chart.zoom_to(*self.span(episode))
+
+def build_standard_state(returns, timestamps, version):
+    """根據完整歷史構建標準模式的指標累加器和週期匯總（在後台線程中運行）"""
+    return data_processing.MetricsAccumulator(returns, version), periods.PeriodRollups(returns, timestamps)
 
 class StandardTradingApp(QMainWindow):
     """標準累計收益率計算方式"""
-    def __init__(self, language='中文', theme='淺色'):
+    def __init__(self, language='中文', theme='淺色', storage='journal'):
         super().__init__()
         self.language = language
         self.theme = theme
+        self.storage = storage
         self.trans = translations[self.language]
         self.setWindowTitle(self.trans['standard_mode'])
 
@@ -96,8 +241,24 @@ class StandardTradingApp(QMainWindow):
 
         self.setGeometry(100, 100, 1000, 600)
 
-        # 初始化數據列表
-        self.returns = []
+        # 初始化數據列表和增量指標
+        self.returns = data_processing.TradeStore()
+        # 每筆交易的提交時間（納秒，0 表示未知），用於按日、週、月匯總
+        self.timestamps = data_processing.TradeStore(dtype=np.int64)
+        # 交易存儲：默認為二進制日誌，storage='sqlite' 時使用可篩選的 SQLite 存儲
+        if storage == 'sqlite':
+            self.trade_log = store.SqliteTradeLog(store.STANDARD_STORE, legacy_path=journal.STANDARD_JOURNAL)
+        else:
+            self.trade_log = journal.TradeLog(journal.STANDARD_JOURNAL)
+        self.trade_filter = None
+        self.metrics = data_processing.MetricsAccumulator(version=self.trade_log.version)
+        self.rollups = periods.PeriodRollups()
+        self.period_window = None
+
+        # 後台計算：加載時在線程池中重建指標累加器和週期匯總
+        self.computer = workers.BackgroundComputer(self)
+        self.computer.result_ready.connect(self.on_metrics_rebuilt)
+        self.computer.error.connect(self.on_compute_error)
 
         # 加載數據
         self.load_data()
@@ -112,7 +273,17 @@ class StandardTradingApp(QMainWindow):
         # 左側：交易記錄列表
         self.left_layout = QVBoxLayout()
         self.data_label = QLabel(self.trans['trade_record'])
-        self.data_list = QListWidget()
+        self.trade_model = TradeListModel(
+            self.returns, lambda idx, r: self.trans['trade_item'].format(idx, r * 100))
+        self.data_list = QListView()
+        self.data_list.setUniformItemSizes(True)
+        # 分批佈局：追加行時不會重新佈局全部已有行
+        self.data_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.data_list.setModel(self.trade_model)
+        # 右鍵菜單修改、插入或刪除單筆交易，雙擊修改
+        self.data_list.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
+        self.data_list.customContextMenuRequested.connect(self.show_trade_menu)
+        self.data_list.doubleClicked.connect(lambda index: self.edit_trade(index.row()))
         self.left_layout.addWidget(self.data_label)
         self.left_layout.addWidget(self.data_list)
 
@@ -121,15 +292,27 @@ class StandardTradingApp(QMainWindow):
         self.figure = Figure(figsize=(5, 4))
         self.canvas = FigureCanvas(self.figure)
         self.ax = self.figure.add_subplot(111)
-        self.ax.set_title(self.trans['chart_title_standard'])
-        self.ax.set_xlabel(self.trans['x_label'])
-        self.ax.set_ylabel(self.trans['y_label_standard'])
+        self.chart = plotting.CurvePlot(self.canvas, self.ax)
+        self.chart.set_labels(self.trans['chart_title_standard'], self.trans['x_label'],
+                              self.trans['y_label_standard'])
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        # 埋點：記錄畫布完整重繪和 blit 的耗時
+        self.canvas.draw = profiler.wrap('canvas.draw', self.canvas.draw)
+        self.canvas.blit = profiler.wrap('canvas.blit', self.canvas.blit)
+        self.center_layout.addWidget(self.toolbar)
         self.center_layout.addWidget(self.canvas)
 
         # 右側：輸入和指標顯示
         self.right_layout = QVBoxLayout()
         self.input_label = QLabel(self.trans['input_label'])
         self.input_edit = QLineEdit()
+        # SQLite 存儲可為每筆交易記錄品種和標籤（可選）
+        self.symbol_edit = QLineEdit()
+        self.symbol_edit.setPlaceholderText(self.trans['symbol_placeholder'])
+        self.tag_edit = QLineEdit()
+        self.tag_edit.setPlaceholderText(self.trans['tag_placeholder'])
+        self.symbol_edit.setVisible(self.storage == 'sqlite')
+        self.tag_edit.setVisible(self.storage == 'sqlite')
         self.submit_button = QPushButton(self.trans['submit'])
         self.submit_button.clicked.connect(self.submit_return)
         self.input_edit.returnPressed.connect(self.submit_return)  # 支持按 Enter 鍵提交
@@ -139,11 +322,20 @@ class StandardTradingApp(QMainWindow):
         self.longest_profit_label = QLabel(self.trans['longest_profit'].format(0))
         self.longest_loss_label = QLabel(self.trans['longest_loss'].format(0))
 
+        # 滾動窗口風險統計（報酬率以百分比顯示）
+        self.rolling_window = ROLLING_WINDOWS[0]
+        self.rolling_panel = RollingStatsPanel(percent=True)
+
+        # 最大回撤區間列表（深度以百分比顯示）
+        self.drawdown_panel = DrawdownPanel(self.chart, percent=True)
+
         # 添加用於顯示坐標的標籤
         self.coord_label = QLabel(self.trans['coordinate'].format('', ''))
 
         self.right_layout.addWidget(self.input_label)
         self.right_layout.addWidget(self.input_edit)
+        self.right_layout.addWidget(self.symbol_edit)
+        self.right_layout.addWidget(self.tag_edit)
         self.right_layout.addWidget(self.submit_button)
         self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.total_return_label)
@@ -151,6 +343,10 @@ class StandardTradingApp(QMainWindow):
         self.right_layout.addWidget(self.longest_profit_label)
         self.right_layout.addWidget(self.longest_loss_label)
         self.right_layout.addSpacing(20)
+        self.rolling_panel.add_to(self.right_layout)
+        self.right_layout.addSpacing(20)
+        self.drawdown_panel.add_to(self.right_layout)
+        self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.coord_label)
         self.right_layout.addStretch()
 
@@ -162,13 +358,31 @@ class StandardTradingApp(QMainWindow):
         # 連接鼠標移動事件
         self.canvas.mpl_connect("motion_notify_event", self.on_mouse_move)
 
+        # 調試用性能覆蓋層（默認隱藏）
+        self.perf_overlay = PerfOverlay(self)
+
         # 創建菜單
         self.create_menus()
 
+        # 合併刷新列表、指標和圖表，並顯示已加載的數據
+        self.scheduler = UpdateScheduler([
+            ('list', self.update_data_list),
+            ('metrics', self.update_metrics),
+            ('plot', self.update_plot),
+            ('periods', self.update_periods),
+        ], self)
+        self.scheduler.schedule()
+
     def create_menus(self):
         menubar = self.menuBar()
         menubar.clear()
 
+        # 文件菜單
+        file_menu = menubar.addMenu(self.trans['file'])
+        import_action = QAction(self.trans['import_csv'], self)
+        import_action.triggered.connect(lambda: self.import_csv())
+        file_menu.addAction(import_action)
+
         # 設置菜單
         settings_menu = menubar.addMenu(self.trans['settings'])
 
@@ -190,31 +404,76 @@ class StandardTradingApp(QMainWindow):
         theme_menu.addAction(theme_action_light)
         theme_menu.addAction(theme_action_dark)
 
+        # 滾動窗口子菜單
+        window_menu = settings_menu.addMenu(self.trans['rolling_window'])
+        for size in ROLLING_WINDOWS:
+            window_action = QAction(str(size), self)
+            window_action.setCheckable(True)
+            window_action.setChecked(size == self.rolling_window)
+            window_action.triggered.connect(lambda _, size=size: self.set_rolling_window(size))
+            window_menu.addAction(window_action)
+        custom_action = QAction(self.trans['rolling_custom'], self)
+        custom_action.setCheckable(True)
+        custom_action.setChecked(self.rolling_window not in ROLLING_WINDOWS)
+        custom_action.triggered.connect(self.ask_rolling_window)
+        window_menu.addAction(custom_action)
+
         # 添加「清除歷史記錄」菜單項
         clear_action = QAction(self.trans['clear_history'], self)
         clear_action.triggered.connect(self.clear_data)
         settings_menu.addAction(clear_action)
 
+        # 視圖菜單：按日、週、月匯總的週期統計
+        view_menu = menubar.addMenu(self.trans['view_menu'])
+        period_action = QAction(self.trans['period_stats'], self)
+        period_action.triggered.connect(self.show_period_window)
+        view_menu.addAction(period_action)
+
+        # 篩選菜單（SQLite 存儲）：按日期、品種和標籤篩選後計算指標和圖表
+        if self.storage == 'sqlite':
+            filter_menu = menubar.addMenu(self.trans['filter_menu'])
+            filter_action = QAction(self.trans['filter_trades'], self)
+            filter_action.triggered.connect(self.ask_trade_filter)
+            filter_menu.addAction(filter_action)
+            all_trades_action = QAction(self.trans['filter_clear'], self)
+            all_trades_action.setEnabled(self.trade_filter is not None)
+            all_trades_action.triggered.connect(lambda: self.set_trade_filter(None))
+            filter_menu.addAction(all_trades_action)
+
+        # 調試菜單：性能覆蓋層和追蹤導出
+        debug_menu = menubar.addMenu(self.trans['debug'])
+        overlay_action = QAction(self.trans['perf_overlay'], self)
+        overlay_action.setCheckable(True)
+        overlay_action.setChecked(self.perf_overlay.visible)
+        overlay_action.toggled.connect(self.perf_overlay.set_visible)
+        debug_menu.addAction(overlay_action)
+        trace_action = QAction(self.trans['save_trace'], self)
+        trace_action.triggered.connect(self.save_trace)
+        debug_menu.addAction(trace_action)
+
     def clear_data(self):
-        # 提示用戶確認
+        # 提示用戶確認；設置了篩選條件時只刪除篩選出的交易
         reply = QMessageBox.question(self, self.trans['clear_history'], 
-                                     self.trans['confirm_clear_history'], 
+                                     self.trans['confirm_clear_filtered' if self.trade_filter
+                                                else 'confirm_clear_history'], 
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             # 清空交易記錄
-            self.returns = []
+            self.returns.clear()
+            self.timestamps.clear()
+            self.rollups = periods.PeriodRollups()
+            self.computer.cancel()
+            self.trade_model.set_values(self.returns)
             # 刪除數據文件
             try:
-                data_file = 'standard_data.json'
-                if os.path.exists(data_file):
-                    os.remove(data_file)
+                self.trade_log.clear()
             except Exception as e:
                 QMessageBox.warning(self, self.trans['input_error'], str(e))
+            # 清除後日誌版本已變化，累計收益率緩存從空開始
+            self.metrics.reset(self.trade_log.version)
             # 重置界面
-            self.update_data_list()
-            self.update_metrics()
-            self.update_plot()
+            self.scheduler.schedule()
 
     def change_language(self, language):
         self.language = language
@@ -227,97 +486,225 @@ class StandardTradingApp(QMainWindow):
             self.setStyleSheet(light_style)
         elif self.theme in ['深色 / Dark', '深色']:
             self.setStyleSheet(dark_style)
+        if self.period_window is not None:
+            self.period_window.setStyleSheet(self.styleSheet())
+
+    def set_rolling_window(self, size):
+        self.rolling_window = size
+        self.create_menus()
+        self.scheduler.schedule('metrics')
+
+    def ask_rolling_window(self):
+        size, ok = QInputDialog.getInt(self, self.trans['rolling_window'], self.trans['rolling_window_prompt'],
+                                       self.rolling_window, 2, 1000000)
+        if ok:
+            self.set_rolling_window(size)
+        else:
+            # 取消時恢復菜單的勾選狀態
+            self.create_menus()
 
     def update_texts(self):
         # 更新界面中所有的文本
         self.setWindowTitle(self.trans['standard_mode'])
         self.input_label.setText(self.trans['input_label'])
         self.submit_button.setText(self.trans['submit'])
-        self.data_label.setText(self.trans['trade_record'])
+        self.data_label.setText(self.trans['trade_record_filtered' if self.trade_filter else 'trade_record'])
+        self.symbol_edit.setPlaceholderText(self.trans['symbol_placeholder'])
+        self.tag_edit.setPlaceholderText(self.trans['tag_placeholder'])
         self.coord_label.setText(self.trans['coordinate'].format('', ''))
-        self.ax.set_title(self.trans['chart_title_standard'])
-        self.ax.set_xlabel(self.trans['x_label'])
-        self.ax.set_ylabel(self.trans['y_label_standard'])
-        self.update_metrics()
-        self.update_data_list()
+        self.chart.set_labels(self.trans['chart_title_standard'], self.trans['x_label'],
+                              self.trans['y_label_standard'])
+        self.trade_model.retranslate()
+        if self.period_window is not None:
+            self.period_window.retranslate()
+        self.scheduler.schedule('metrics')
         self.create_menus()
-        self.canvas.draw()
 
     def submit_return(self):
+        with profiler.span('submit_return'):
+            try:
+                # 獲取並轉換輸入的報酬率
+                return_rate = float(self.input_edit.text()) / 100
+                timestamp = time.time_ns()
+                if self.log_trade(return_rate, timestamp):
+                    self.returns.append(return_rate)
+                    self.timestamps.append(timestamp)
+                    self.metrics.append(return_rate)
+                    self.rollups.append(return_rate, timestamp)
+                self.input_edit.clear()
+
+                # 標記列表、指標、圖表和週期統計需要刷新，連續提交時只刷新一次
+                self.scheduler.schedule()
+            except ValueError:
+                QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
+
+    def show_trade_menu(self, position):
+        """交易列表的右鍵菜單：修改、在此前插入或刪除該筆交易"""
+        row = self.data_list.indexAt(position).row()
+        if row < 0:
+            return
+        menu = QMenu(self)
+        edit_action = menu.addAction(self.trans['edit_trade'])
+        edit_action.triggered.connect(lambda: self.edit_trade(row))
+        insert_action = menu.addAction(self.trans['insert_trade'])
+        insert_action.triggered.connect(lambda: self.insert_trade(row))
+        delete_action = menu.addAction(self.trans['delete_trade'])
+        delete_action.triggered.connect(lambda: self.delete_trade(row))
+        menu.exec(self.data_list.viewport().mapToGlobal(position))
+
+    def edit_trade(self, row):
+        value = self.ask_trade_value(self.trans['edit_trade'], self.returns[row])
+        if value is not None:
+            self.apply_edit('update', row, value)
+
+    def insert_trade(self, row):
+        value = self.ask_trade_value(self.trans['insert_trade'])
+        if value is not None:
+            self.apply_edit('insert', row, value)
+
+    def delete_trade(self, row):
+        reply = QMessageBox.question(self, self.trans['delete_trade'],
+                                     self.trans['confirm_delete_trade'].format(row + 1),
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.apply_edit('delete', row)
+
+    def edit_log(self, action, row, value=None, timestamp=0):
+        """在日誌中修改、插入或刪除一筆交易；SQLite 存儲插入的交易沿用篩選的品種和標籤，否則使用輸入框中的"""
+        if action == 'update':
+            self.trade_log.update(row, value)
+        elif action == 'delete':
+            self.trade_log.delete(row)
+        elif self.storage == 'sqlite':
+            trade_filter = self.trade_filter or store.TradeFilter()
+            symbol = trade_filter.symbol or self.symbol_edit.text().strip() or None
+            tag = trade_filter.tag or self.tag_edit.text().strip() or None
+            self.trade_log.insert(row, value, timestamp, symbol=symbol, tag=tag)
+        else:
+            self.trade_log.insert(row, value, timestamp)
+
+    def ask_trade_value(self, title, current=None):
+        """輸入一筆報酬率（%），返回小數；取消或輸入無效時返回 None"""
+        text, ok = QInputDialog.getText(self, title, self.trans['input_label'],
+                                        text='' if current is None else f"{current * 100:g}")
+        if not ok:
+            return None
         try:
-            # 獲取並轉換輸入的報酬率
-            return_rate = float(self.input_edit.text()) / 100
-            self.returns.append(return_rate)
-            self.input_edit.clear()
-
-            # 更新數據列表
-            self.update_data_list()
-
-            # 更新指標
-            self.update_metrics()
-
-            # 更新圖表
-            self.update_plot()
+            return float(text) / 100
         except ValueError:
             QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
+            return None
+
+    def apply_edit(self, action, row, value=None):
+        """修改、插入或刪除第 row 筆交易，指標只從該筆起重新計算，週期匯總只重算它所在的週期"""
+        with profiler.span('apply_edit'):
+            version = self.trade_log.version
+            # 被修改或刪除的交易的時間；插入的交易沿用插入位置上原有交易的時間（插在末尾時沿用最後一筆）
+            timestamp = self.timestamps[min(row, len(self.timestamps) - 1)] if self.timestamps else 0
+            try:
+                self.edit_log(action, row, value, timestamp)
+            except Exception as e:
+                QMessageBox.warning(self, self.trans['input_error'], str(e))
+                return
+            if action == 'update':
+                self.returns.set(row, value)
+            elif action == 'insert':
+                self.returns.insert(row, value)
+                self.timestamps.insert(row, timestamp)
+            else:
+                self.returns.delete(row)
+                self.timestamps.delete(row)
+            self.trade_model.set_values(self.returns)
+
+            # 編輯前指標已與日誌一致時才局部重算；否則（如後台重建中）由版本檢查整體重建
+            if not self.computer.busy and self.metrics.version == version:
+                self.metrics.recompute_from(row, self.returns.view(), self.trade_log.version)
+                self.rollups.refresh(self.returns.view(), self.timestamps.view(), timestamp)
+            self.scheduler.schedule()
 
     def update_data_list(self):
-        self.data_list.clear()
-        for idx, r in enumerate(self.returns, 1):
-            percent_return = r * 100
-            self.data_list.addItem(self.trans['trade_item'].format(idx, percent_return))
+        with profiler.span('update_data_list'):
+            self.trade_model.sync()
+
+    def start_rebuild(self):
+        """在後台根據完整歷史重建指標累加器和週期匯總，期間提交的交易在重建完成後補上"""
+        version = self.trade_log.version
+        self.metrics = data_processing.MetricsAccumulator(version=version)
+        self.rollups = periods.PeriodRollups()
+        self.computer.submit(build_standard_state, self.returns.view(), self.timestamps.view(), version)
+
+    def on_metrics_rebuilt(self, result):
+        # 補上重建期間新提交的交易，然後替換累加器和週期匯總
+        metrics, rollups = result
+        metrics.extend(self.returns[metrics.count:])
+        rollups.extend(self.returns[rollups.count:], self.timestamps[rollups.count:])
+        self.metrics = metrics
+        self.rollups = rollups
+        self.scheduler.schedule('metrics', 'plot', 'periods')
+
+    def metrics_ready(self):
+        """指標緩存是否與當前日誌版本一致；版本變化（清除或改寫）時在後台整體重建"""
+        if self.computer.busy:
+            return False
+        if self.metrics.version != self.trade_log.version:
+            self.start_rebuild()
+            return False
+        return True
+
+    def on_compute_error(self, message):
+        QMessageBox.warning(self, self.trans['input_error'], message)
 
     def update_metrics(self):
-        if self.returns:
-            # 計算累計收益率
-            cumulative_returns = data_processing.calculate_cumulative_returns(self.returns)
-            total_return = cumulative_returns[-1] * 100
+        with profiler.span('update_metrics'):
+            # 後台重建完成前保留原有顯示
+            if not self.metrics_ready():
+                return
+            if self.returns:
+                # 從增量累加器讀取指標
+                total_return = self.metrics.total_return * 100
+                max_drawdown = self.metrics.max_drawdown * 100
+                longest_profit = self.metrics.longest_profit
+                longest_loss = self.metrics.longest_loss
+            else:
+                total_return = 0.00
+                max_drawdown = 0.00
+                longest_profit = 0
+                longest_loss = 0
 
-            # 計算最大回撤
-            max_drawdown = data_processing.calculate_max_drawdown(cumulative_returns) * 100
+            # 更新顯示標籤
+            self.total_return_label.setText(self.trans['total_return'].format(total_return))
+            self.max_drawdown_label.setText(self.trans['max_drawdown'].format(max_drawdown))
+            self.longest_profit_label.setText(self.trans['longest_profit'].format(longest_profit))
+            self.longest_loss_label.setText(self.trans['longest_loss'].format(longest_loss))
 
-            # 計算最長連續獲利和最長連續虧損
-            longest_profit, longest_loss = data_processing.calculate_longest_profit_loss_streak(self.returns)
-        else:
-            total_return = 0.00
-            max_drawdown = 0.00
-            longest_profit = 0
-            longest_loss = 0
+            # 最近一個滾動窗口的風險統計
+            self.rolling_panel.update(self.returns.view(), self.rolling_window, self.trans)
 
-        # 更新顯示標籤
-        self.total_return_label.setText(self.trans['total_return'].format(total_return))
-        self.max_drawdown_label.setText(self.trans['max_drawdown'].format(max_drawdown))
-        self.longest_profit_label.setText(self.trans['longest_profit'].format(longest_profit))
-        self.longest_loss_label.setText(self.trans['longest_loss'].format(longest_loss))
+            # 最深的幾個回撤區間，由累加器增量維護的索引查詢
+            self.drawdown_panel.update(self.metrics.drawdown_index, self.trans)
 
     def update_plot(self):
-        # 清除之前的繪圖
-        self.ax.clear()
-        self.ax.set_title(self.trans['chart_title_standard'])
-        self.ax.set_xlabel(self.trans['x_label'])
-        self.ax.set_ylabel(self.trans['y_label_standard'])
-
-        if self.returns:
-            # 計算資產增長率曲線
-            cumulative_returns = data_processing.calculate_cumulative_returns(self.returns)
-            x_data = np.arange(1, len(cumulative_returns) + 1)
-            y_data = cumulative_returns * 100
-
-            # 繪制曲線
-            self.ax.plot(x_data, y_data, marker='o')
-
-            # 設置 x 軸刻度為整數
-            self.ax.xaxis.set_major_locator(MaxNLocator(integer=True))
-            self.ax.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f'{int(x)}'))
-
-            # 設置 y 軸刻度格式為小數點後兩位
-            self.ax.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
-        else:
-            # 如果沒有數據，繪制空圖
-            self.ax.plot([], [])
-
-        # 重繪圖表
-        self.canvas.draw()
+        with profiler.span('update_plot'):
+            if not self.metrics_ready():
+                return
+            # 累計收益率直接取自緩存的視圖，只更新持久化曲線的數據，坐標範圍不變時以 blitting 重繪
+            self.chart.set_data(self.metrics.cumulative_returns * 100)
+
+    def show_period_window(self):
+        if self.period_window is None:
+            self.period_window = PeriodWindow(self)
+        self.period_window.show()
+        self.period_window.raise_()
+        self.period_window.activateWindow()
+        self.scheduler.schedule('periods')
+
+    def update_periods(self):
+        with profiler.span('update_periods'):
+            # 週期統計窗口打開時才重繪；圖表直接讀取匯總表
+            if self.period_window is None or not self.period_window.isVisible() or not self.metrics_ready():
+                return
+            self.period_window.refresh()
 
     def on_mouse_move(self, event):
         if event.inaxes == self.ax:
@@ -335,38 +722,133 @@ class StandardTradingApp(QMainWindow):
     # 添加數據保存和加載方法
     def load_data(self):
         """加載保存的數據"""
+        with profiler.span('load_data'):
+            try:
+                data = self.trade_log.load()
+                self.returns = data_processing.TradeStore(data.returns)
+                timestamps = data.timestamps if data.timestamps is not None else np.zeros(len(data.returns))
+                self.timestamps = data_processing.TradeStore(timestamps, dtype=np.int64)
+                self.start_rebuild()
+            except FileNotFoundError:
+                # 文件不存在，首次運行
+                pass
+            except Exception as e:
+                QMessageBox.warning(self, self.trans['input_error'], str(e))
+
+    def reload_data(self):
+        """按當前篩選條件重新讀取交易，指標和圖表在後台重建"""
+        self.computer.cancel()
+        self.load_data()
+        self.trade_model.set_values(self.returns)
+        self.update_texts()
+        self.scheduler.schedule()
+
+    def import_csv(self, path=None):
+        """從 CSV 流式導入報酬率（%）：每校驗完一塊就寫入日誌，導入完成後只合併和刷新一次
+
+        某一塊無效時，之前的塊已經保存，界面按日誌重新讀取後提示已導入的筆數。
+        """
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, self.trans['import_csv'], '', 'CSV (*.csv);;* (*)')
+            if not path:
+                return
+        imported = 0
         try:
-            with open('standard_data.json', 'r') as f:
-                data = json.load(f)
-                self.returns = data.get('returns', [])
-        except FileNotFoundError:
-            # 文件不存在，首次運行
-            pass
+            for values, timestamps in importer.import_chunks(path, 'standard'):
+                # CSV 含時間列時一併導入，否則時間記為未知
+                if timestamps is None:
+                    timestamps = np.zeros(len(values), dtype=np.int64)
+                self.trade_log.extend(values, timestamps, compact=False)
+                imported += len(values)
+                if self.trade_filter is None:
+                    self.returns.extend(values)
+                    self.timestamps.extend(timestamps)
+                    self.metrics.extend(values)
+                    self.rollups.extend(values, timestamps)
+            self.trade_log.compact()
         except Exception as e:
+            # 內存中的歷史可能只含部分塊，按日誌重新讀取
+            self.reload_data()
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['import_failed'].format(imported, e))
+            return
+        if self.trade_filter is None:
+            self.scheduler.schedule()
+        else:
+            # 篩選時按條件重新讀取，導入的交易中只顯示符合條件的
+            self.reload_data()
+        QMessageBox.information(self, self.trans['import_csv'], self.trans['import_done'].format(imported))
+
+    def log_trade(self, value, timestamp):
+        """將一筆交易連同提交時間追加寫入日誌，返回它是否符合當前的篩選條件（不符合時只保存、不顯示）；寫入失敗時返回 False
+
+        SQLite 存儲同時記錄輸入的品種和標籤。
+        """
+        symbol, tag = None, None
+        try:
+            if self.storage == 'sqlite':
+                symbol = self.symbol_edit.text().strip() or None
+                tag = self.tag_edit.text().strip() or None
+                self.trade_log.append(value, timestamp, symbol, tag)
+            else:
+                self.trade_log.append(value, timestamp)
+        except Exception as e:
+            # 未能保存的交易不加入內存中的歷史，否則重新加載後會消失，之後的編輯序號也會錯位
             QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return False
+        return store.filter_matches(self.trade_filter, timestamp, symbol, tag)
+
+    def ask_trade_filter(self):
+        dialog = TradeFilterDialog(self.trade_log.distinct('symbol'), self.trade_log.distinct('tag'),
+                                   self.trade_filter, self.language, self.theme)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.set_trade_filter(dialog.get_filter())
+
+    def set_trade_filter(self, trade_filter):
+        """設置篩選條件並只讀取匹配的交易；新輸入的交易默認使用篩選的品種和標籤"""
+        self.trade_filter = trade_filter
+        self.trade_log.set_filter(trade_filter)
+        if trade_filter is not None:
+            if trade_filter.symbol is not None:
+                self.symbol_edit.setText(trade_filter.symbol)
+            if trade_filter.tag is not None:
+                self.tag_edit.setText(trade_filter.tag)
+        self.reload_data()
 
     def save_data(self):
-        """保存當前數據"""
-        data = {
-            'returns': self.returns
-        }
+        """保存當前數據（交易已在提交時寫入日誌，此處只需關閉日誌）"""
+        with profiler.span('save_data'):
+            try:
+                self.trade_log.close()
+            except Exception as e:
+                QMessageBox.warning(self, self.trans['input_error'], str(e))
+
+    def save_trace(self):
+        """將埋點記錄導出為 JSON 追蹤文件"""
+        path, _ = QFileDialog.getSaveFileName(self, self.trans['save_trace'], 'trace.json', 'JSON (*.json)')
+        if not path:
+            return
         try:
-            with open('standard_data.json', 'w') as f:
-                json.dump(data, f)
+            profiler.dump_trace(path)
         except Exception as e:
             QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return
+        QMessageBox.information(self, self.trans['save_trace'],
+                                self.trans['trace_saved'].format(len(profiler.events), path))
 
     def closeEvent(self, event):
         """窗口關閉事件"""
         self.save_data()
+        if self.period_window is not None:
+            self.period_window.close()
         event.accept()
 
 class RiskBasedTradingApp(QMainWindow):
     """基於初始資金和固定風險金額的計算方式"""
-    def __init__(self, initial_capital, risk_per_trade, language='中文', theme='淺色'):
+    def __init__(self, initial_capital, risk_per_trade, language='中文', theme='淺色', storage='journal'):
         super().__init__()
         self.language = language
         self.theme = theme
+        self.storage = storage
         self.trans = translations[self.language]
         self.setWindowTitle(self.trans['risk_mode'])
 
@@ -381,10 +863,39 @@ class RiskBasedTradingApp(QMainWindow):
         # 初始化數據列表
         self.initial_capital = initial_capital
         self.risk_per_trade = risk_per_trade
-        self.returns = []
+        self.returns = data_processing.TradeStore()
+        # 每筆交易的風險金額（未單獨記錄的為默認風險金額），與 returns 一一對應
+        self.risks = data_processing.TradeStore()
+        # 交易存儲：默認為二進制日誌，storage='sqlite' 時使用可篩選的 SQLite 存儲
+        if storage == 'sqlite':
+            self.trade_log = store.SqliteTradeLog(store.RISK_STORE, initial_capital, risk_per_trade,
+                                                  legacy_path=journal.RISK_JOURNAL)
+        else:
+            self.trade_log = journal.TradeLog(journal.RISK_JOURNAL, initial_capital, risk_per_trade)
+        self.trade_filter = None
+        # R 倍數分布：增量維護的直方圖，分布窗口打開時才繪製
+        self.r_histogram = data_processing.RHistogram()
+        self.distribution_window = None
+
+        # 後台計算：資金曲線在線程池中計算，完成後再刷新指標和圖表
+        self.computer = workers.BackgroundComputer(self)
+        self.computer.result_ready.connect(self.on_curve_ready)
+        self.computer.error.connect(self.on_compute_error)
+
+        # 蒙特卡羅模擬使用獨立的後台計算，不會被資金曲線的重算取消
+        self.simulation = None
+        self.simulation_paths = simulation.DEFAULT_PATHS
+        self.simulator = workers.BackgroundComputer(self)
+        self.simulator.result_ready.connect(self.on_simulation_ready)
+        self.simulator.error.connect(self.on_compute_error)
+
+        # 資金曲線從哪一筆起需要重算（math.inf 表示只需計算新追加的交易）
+        self.changed_from = 0
+        self.changed_since_submit = 0
 
         # 加載數據
         self.load_data()
+        self.curve = data_processing.calculate_risk_curve([], self.initial_capital, self.risk_per_trade)
 
         # 創建主窗口部件
         self.main_widget = QWidget()
@@ -396,7 +907,17 @@ class RiskBasedTradingApp(QMainWindow):
         # 左側：交易記錄列表
         self.left_layout = QVBoxLayout()
         self.data_label = QLabel(self.trans['trade_record'])
-        self.data_list = QListWidget()
+        self.trade_model = TradeListModel(
+            self.returns, lambda idx, rr: self.trans['trade_item_rr'].format(idx, rr))
+        self.data_list = QListView()
+        self.data_list.setUniformItemSizes(True)
+        # 分批佈局：追加行時不會重新佈局全部已有行
+        self.data_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.data_list.setModel(self.trade_model)
+        # ...（與 StandardTradingApp 相同：右鍵菜單修改、插入或刪除單筆交易，雙擊修改）
+        self.data_list.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
+        self.data_list.customContextMenuRequested.connect(self.show_trade_menu)
+        self.data_list.doubleClicked.connect(lambda index: self.edit_trade(index.row()))
         self.left_layout.addWidget(self.data_label)
         self.left_layout.addWidget(self.data_list)
 
@@ -405,15 +926,31 @@ class RiskBasedTradingApp(QMainWindow):
         self.figure = Figure(figsize=(5, 4))
         self.canvas = FigureCanvas(self.figure)
         self.ax = self.figure.add_subplot(111)
-        self.ax.set_title(self.trans['chart_title_risk'])
-        self.ax.set_xlabel(self.trans['x_label'])
-        self.ax.set_ylabel(self.trans['y_label_risk'])
+        self.chart = plotting.CurvePlot(self.canvas, self.ax)
+        self.chart.set_labels(self.trans['chart_title_risk'], self.trans['x_label'],
+                              self.trans['y_label_risk'])
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        # 埋點：記錄畫布完整重繪和 blit 的耗時
+        self.canvas.draw = profiler.wrap('canvas.draw', self.canvas.draw)
+        self.canvas.blit = profiler.wrap('canvas.blit', self.canvas.blit)
+        self.center_layout.addWidget(self.toolbar)
         self.center_layout.addWidget(self.canvas)
 
         # 右側：輸入和指標顯示
         self.right_layout = QVBoxLayout()
         self.input_label = QLabel(self.trans['input_label_rr'])
         self.input_edit = QLineEdit()
+        # 每筆風險金額（可選）：提交後保留，輸入百分比即為按當前資金的固定比例複利
+        self.risk_edit = QLineEdit()
+        self.risk_edit.setPlaceholderText(self.trans['risk_amount_placeholder'])
+        self.risk_edit.returnPressed.connect(self.submit_return)
+        # SQLite 存儲可為每筆交易記錄品種和標籤（可選）
+        self.symbol_edit = QLineEdit()
+        self.symbol_edit.setPlaceholderText(self.trans['symbol_placeholder'])
+        self.tag_edit = QLineEdit()
+        self.tag_edit.setPlaceholderText(self.trans['tag_placeholder'])
+        self.symbol_edit.setVisible(self.storage == 'sqlite')
+        self.tag_edit.setVisible(self.storage == 'sqlite')
         self.submit_button = QPushButton(self.trans['submit'])
         self.submit_button.clicked.connect(self.submit_return)
         self.input_edit.returnPressed.connect(self.submit_return)  # 支持按 Enter 鍵提交
@@ -423,11 +960,21 @@ class RiskBasedTradingApp(QMainWindow):
         self.longest_profit_label = QLabel(self.trans['longest_profit'].format(0))
         self.longest_loss_label = QLabel(self.trans['longest_loss'].format(0))
 
+        # 滾動窗口風險統計（以 R 倍數顯示）
+        self.rolling_window = ROLLING_WINDOWS[0]
+        self.rolling_panel = RollingStatsPanel(percent=False)
+
+        # 最大回撤區間列表（深度以資金顯示）
+        self.drawdown_panel = DrawdownPanel(self.chart, percent=False)
+
         # 添加用於顯示坐標的標籤
         self.coord_label = QLabel(self.trans['coordinate'].format('', ''))
 
         self.right_layout.addWidget(self.input_label)
         self.right_layout.addWidget(self.input_edit)
+        self.right_layout.addWidget(self.risk_edit)
+        self.right_layout.addWidget(self.symbol_edit)
+        self.right_layout.addWidget(self.tag_edit)
         self.right_layout.addWidget(self.submit_button)
         self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.total_return_label)
@@ -435,6 +982,16 @@ class RiskBasedTradingApp(QMainWindow):
         self.right_layout.addWidget(self.longest_profit_label)
         self.right_layout.addWidget(self.longest_loss_label)
         self.right_layout.addSpacing(20)
+        self.rolling_panel.add_to(self.right_layout)
+        self.right_layout.addSpacing(20)
+        self.drawdown_panel.add_to(self.right_layout)
+        self.right_layout.addSpacing(20)
+        # 蒙特卡羅模擬結果（運行模擬後顯示）
+        self.simulation_label = QLabel()
+        self.simulation_label.setWordWrap(True)
+        self.simulation_label.hide()
+        self.right_layout.addWidget(self.simulation_label)
+        self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.coord_label)
         self.right_layout.addStretch()
 
@@ -446,14 +1003,33 @@ class RiskBasedTradingApp(QMainWindow):
         # 連接鼠標移動事件
         self.canvas.mpl_connect("motion_notify_event", self.on_mouse_move)
 
+        # 調試用性能覆蓋層（默認隱藏）
+        self.perf_overlay = PerfOverlay(self)
+
         # 創建菜單
         self.create_menus()
 
+        # 合併刷新資金曲線、列表、指標和圖表，並顯示已加載的數據
+        self.scheduler = UpdateScheduler([
+            ('curve', self.recompute_curve),
+            ('list', self.update_data_list),
+            ('metrics', self.update_metrics),
+            ('plot', self.update_plot),
+            ('distribution', self.update_distribution),
+        ], self)
+        self.scheduler.schedule('curve', 'list', 'distribution')
+
     def create_menus(self):
         # ...（與 StandardTradingApp 中的 create_menus 方法相同）
         menubar = self.menuBar()
         menubar.clear()
 
+        # 文件菜單
+        file_menu = menubar.addMenu(self.trans['file'])
+        import_action = QAction(self.trans['import_csv'], self)
+        import_action.triggered.connect(lambda: self.import_csv())
+        file_menu.addAction(import_action)
+
         # 設置菜單
         settings_menu = menubar.addMenu(self.trans['settings'])
 
@@ -475,31 +1051,92 @@ class RiskBasedTradingApp(QMainWindow):
         theme_menu.addAction(theme_action_light)
         theme_menu.addAction(theme_action_dark)
 
+        # 滾動窗口子菜單
+        window_menu = settings_menu.addMenu(self.trans['rolling_window'])
+        for size in ROLLING_WINDOWS:
+            window_action = QAction(str(size), self)
+            window_action.setCheckable(True)
+            window_action.setChecked(size == self.rolling_window)
+            window_action.triggered.connect(lambda _, size=size: self.set_rolling_window(size))
+            window_menu.addAction(window_action)
+        custom_action = QAction(self.trans['rolling_custom'], self)
+        custom_action.setCheckable(True)
+        custom_action.setChecked(self.rolling_window not in ROLLING_WINDOWS)
+        custom_action.triggered.connect(self.ask_rolling_window)
+        window_menu.addAction(custom_action)
+
         # 添加「清除歷史記錄」菜單項
         clear_action = QAction(self.trans['clear_history'], self)
         clear_action.triggered.connect(self.clear_data)
         settings_menu.addAction(clear_action)
 
+        # 模擬菜單：有放回抽樣或重新排列已記錄的交易
+        simulation_menu = menubar.addMenu(self.trans['simulation'])
+        bootstrap_action = QAction(self.trans['mc_bootstrap'], self)
+        bootstrap_action.triggered.connect(lambda: self.run_simulation('bootstrap'))
+        simulation_menu.addAction(bootstrap_action)
+        shuffle_action = QAction(self.trans['mc_shuffle'], self)
+        shuffle_action.triggered.connect(lambda: self.run_simulation('shuffle'))
+        simulation_menu.addAction(shuffle_action)
+        clear_simulation_action = QAction(self.trans['mc_clear'], self)
+        clear_simulation_action.triggered.connect(self.clear_simulation)
+        simulation_menu.addAction(clear_simulation_action)
+        # 按其他倉位規則重算全部歷史
+        simulation_menu.addSeparator()
+        sizing_action = QAction(self.trans['sizing_whatif'], self)
+        sizing_action.triggered.connect(self.show_sizing_dialog)
+        simulation_menu.addAction(sizing_action)
+
+        # 視圖菜單：R 倍數分布
+        view_menu = menubar.addMenu(self.trans['view_menu'])
+        distribution_action = QAction(self.trans['r_distribution'], self)
+        distribution_action.triggered.connect(self.show_distribution_window)
+        view_menu.addAction(distribution_action)
+
+        # 篩選菜單（SQLite 存儲）：按日期、品種和標籤篩選後計算指標和圖表
+        if self.storage == 'sqlite':
+            filter_menu = menubar.addMenu(self.trans['filter_menu'])
+            filter_action = QAction(self.trans['filter_trades'], self)
+            filter_action.triggered.connect(self.ask_trade_filter)
+            filter_menu.addAction(filter_action)
+            all_trades_action = QAction(self.trans['filter_clear'], self)
+            all_trades_action.setEnabled(self.trade_filter is not None)
+            all_trades_action.triggered.connect(lambda: self.set_trade_filter(None))
+            filter_menu.addAction(all_trades_action)
+
+        # 調試菜單：性能覆蓋層和追蹤導出
+        debug_menu = menubar.addMenu(self.trans['debug'])
+        overlay_action = QAction(self.trans['perf_overlay'], self)
+        overlay_action.setCheckable(True)
+        overlay_action.setChecked(self.perf_overlay.visible)
+        overlay_action.toggled.connect(self.perf_overlay.set_visible)
+        debug_menu.addAction(overlay_action)
+        trace_action = QAction(self.trans['save_trace'], self)
+        trace_action.triggered.connect(self.save_trace)
+        debug_menu.addAction(trace_action)
+
     def clear_data(self):
-        # 提示用戶確認
+        # 提示用戶確認；設置了篩選條件時只刪除篩選出的交易
         reply = QMessageBox.question(self, self.trans['clear_history'], 
-                                     self.trans['confirm_clear_history'], 
+                                     self.trans['confirm_clear_filtered' if self.trade_filter
+                                                else 'confirm_clear_history'], 
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            # 清空交易記錄
-            self.returns = []
+            # 清空交易記錄和模擬結果
+            self.returns.clear()
+            self.risks.clear()
+            self.r_histogram.reset()
+            self.trade_model.set_values(self.returns)
+            self.mark_changed(0)
+            self.clear_simulation()
             # 刪除數據文件
             try:
-                data_file = 'risk_data.json'
-                if os.path.exists(data_file):
-                    os.remove(data_file)
+                self.trade_log.clear()
             except Exception as e:
                 QMessageBox.warning(self, self.trans['input_error'], str(e))
             # 重置界面
-            self.update_data_list()
-            self.update_metrics()
-            self.update_plot()
+            self.scheduler.schedule('curve', 'list', 'distribution')
 
     def change_language(self, language):
         self.language = language
@@ -512,131 +1149,311 @@ class RiskBasedTradingApp(QMainWindow):
             self.setStyleSheet(light_style)
         elif self.theme in ['深色 / Dark', '深色']:
             self.setStyleSheet(dark_style)
+        if self.distribution_window is not None:
+            self.distribution_window.setStyleSheet(self.styleSheet())
+
+    def set_rolling_window(self, size):
+        self.rolling_window = size
+        self.create_menus()
+        self.scheduler.schedule('metrics')
+
+    def ask_rolling_window(self):
+        size, ok = QInputDialog.getInt(self, self.trans['rolling_window'], self.trans['rolling_window_prompt'],
+                                       self.rolling_window, 2, 1000000)
+        if ok:
+            self.set_rolling_window(size)
+        else:
+            # 取消時恢復菜單的勾選狀態
+            self.create_menus()
+
+    def run_simulation(self, method):
+        """在後台對已記錄的交易做蒙特卡羅模擬"""
+        if len(self.returns) < 2:
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['mc_not_enough'])
+            return
+        paths, ok = QInputDialog.getInt(self, self.trans['simulation'], self.trans['mc_paths_prompt'],
+                                        self.simulation_paths, 100, 1000000)
+        if not ok:
+            return
+        self.simulation_paths = paths
+        horizon = len(self.returns)
+        self.simulator.submit(simulation.run_simulation, self.returns.view(), self.initial_capital,
+                              self.risks.view(), paths, method, None, None,
+                              simulation.default_processes(paths, horizon))
+        self.simulation_label.setText(self.trans['mc_running'].format(paths))
+        self.simulation_label.show()
+
+    def on_simulation_ready(self, result):
+        self.simulation = result
+        self.chart.set_bands(result.band_x, result.bands)
+        self.update_simulation_label()
+
+    def clear_simulation(self):
+        self.simulator.cancel()
+        self.simulation = None
+        self.chart.clear_bands()
+        self.simulation_label.hide()
+
+    def update_simulation_label(self):
+        """以文字顯示模擬的最終資金、最大回撤和破產概率分布"""
+        if self.simulation is None:
+            return
+        result = self.simulation
+        summary = simulation.summarize(result)
+        final = summary['final_capital']
+        drawdown = summary['max_drawdown']
+        ruin = ' / '.join(f"{level * 100:.0f}%: {probability * 100:.1f}%"
+                          for level, probability in summary['ruin_probability'].items())
+        self.simulation_label.setText('\n'.join([
+            self.trans['mc_title'].format(result.paths, self.trans['method_' + result.method], result.horizon),
+            self.trans['mc_final'].format(final[50], final[5], final[95]),
+            self.trans['mc_drawdown'].format(drawdown[50], drawdown[5]),
+            self.trans['mc_ruin'].format(ruin),
+            self.trans['mc_bands'],
+        ]))
+        self.simulation_label.show()
+
+    def show_sizing_dialog(self):
+        """倉位假設分析：按固定金額或固定比例重算全部歷史，可一鍵應用"""
+        if not len(self.returns):
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['sizing_no_trades'])
+            return
+        dialog = SizingDialog(self)
+        dialog.exec()
+        self.chart.clear_overlay()
+
+    def apply_sizing(self, risks):
+        """以新的每筆風險金額替換全部（篩選後的）交易的風險金額，資金曲線從頭重算"""
+        try:
+            self.trade_log.set_risks(risks)
+        except Exception as e:
+            QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return False
+        self.risks = data_processing.TradeStore(risks)
+        self.mark_changed(0)
+        self.clear_simulation()
+        self.scheduler.schedule('curve')
+        return True
 
     def update_texts(self):
         # 更新界面中所有的文本
         self.setWindowTitle(self.trans['risk_mode'])
         self.input_label.setText(self.trans['input_label_rr'])
+        self.risk_edit.setPlaceholderText(self.trans['risk_amount_placeholder'])
         self.submit_button.setText(self.trans['submit'])
-        self.data_label.setText(self.trans['trade_record'])
+        self.data_label.setText(self.trans['trade_record_filtered' if self.trade_filter else 'trade_record'])
+        self.symbol_edit.setPlaceholderText(self.trans['symbol_placeholder'])
+        self.tag_edit.setPlaceholderText(self.trans['tag_placeholder'])
         self.coord_label.setText(self.trans['coordinate'].format('', ''))
-        self.ax.set_title(self.trans['chart_title_risk'])
-        self.ax.set_xlabel(self.trans['x_label'])
-        self.ax.set_ylabel(self.trans['y_label_risk'])
-        self.update_metrics()
-        self.update_data_list()
+        self.chart.set_labels(self.trans['chart_title_risk'], self.trans['x_label'],
+                              self.trans['y_label_risk'])
+        self.trade_model.retranslate()
+        if self.distribution_window is not None:
+            self.distribution_window.retranslate()
+        self.scheduler.schedule('metrics')
+        self.update_simulation_label()
         self.create_menus()
-        self.canvas.draw()
 
     def submit_return(self):
+        with profiler.span('submit_return'):
+            try:
+                # 獲取並轉換輸入的風險回報比
+                rr_ratio = float(self.input_edit.text())
+                if rr_ratio < 0:
+                    QMessageBox.warning(self, self.trans['input_error'], self.trans['negative_rr_error'])
+                    return
+                risk = self.parse_risk(self.risk_edit.text())
+                if self.log_trade(rr_ratio, time.time_ns(), risk):
+                    self.returns.append(rr_ratio)
+                    self.risks.append(risk or self.risk_per_trade)
+                    self.r_histogram.append(float(data_processing.r_multiples(rr_ratio)))
+                self.input_edit.clear()
+
+                # 標記資金曲線和列表需要刷新，連續提交時只刷新一次；指標和圖表在後台計算完成後刷新
+                self.scheduler.schedule('curve', 'list', 'distribution')
+            except ValueError:
+                QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
+
+    def parse_risk(self, text):
+        """解析風險金額輸入：留空為默認風險金額（返回0），「N%」為當前資金的 N%，否則為金額；無效時拋出 ValueError"""
+        text = text.strip()
+        if not text:
+            return 0.0
+        if text.endswith('%'):
+            risk = float(text[:-1]) / 100 * self.current_capital()
+        else:
+            risk = float(text)
+        if not risk > 0:
+            raise ValueError(text)
+        return risk
+
+    def current_capital(self):
+        """按全部已記錄交易計算的當前資金；曲線仍在後台重算時，以仍有效的前綴加上之後各筆的盈虧"""
+        start = min(self.changed_from, len(self.curve.capital_curve), len(self.returns))
+        capital = self.curve.capital_curve[start - 1] if start else self.initial_capital
+        tail = data_processing.r_multiples(self.returns[start:]) * self.risks[start:]
+        return float(capital + tail.sum())
+
+    def show_trade_menu(self, position):
+        # ...（與 StandardTradingApp 中的 show_trade_menu 方法相同）
+        """交易列表的右鍵菜單：修改、在此前插入或刪除該筆交易"""
+        row = self.data_list.indexAt(position).row()
+        if row < 0:
+            return
+        menu = QMenu(self)
+        edit_action = menu.addAction(self.trans['edit_trade'])
+        edit_action.triggered.connect(lambda: self.edit_trade(row))
+        insert_action = menu.addAction(self.trans['insert_trade'])
+        insert_action.triggered.connect(lambda: self.insert_trade(row))
+        delete_action = menu.addAction(self.trans['delete_trade'])
+        delete_action.triggered.connect(lambda: self.delete_trade(row))
+        menu.exec(self.data_list.viewport().mapToGlobal(position))
+
+    def edit_trade(self, row):
+        value = self.ask_trade_value(self.trans['edit_trade'], self.returns[row])
+        if value is not None:
+            self.apply_edit('update', row, value)
+
+    def insert_trade(self, row):
+        value = self.ask_trade_value(self.trans['insert_trade'])
+        if value is not None:
+            self.apply_edit('insert', row, value)
+
+    def delete_trade(self, row):
+        reply = QMessageBox.question(self, self.trans['delete_trade'],
+                                     self.trans['confirm_delete_trade'].format(row + 1),
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.apply_edit('delete', row)
+
+    def edit_log(self, action, row, value=None):
+        """在日誌中修改、插入或刪除一筆交易；SQLite 存儲插入的交易沿用篩選的品種和標籤，否則使用輸入框中的"""
+        if action == 'update':
+            self.trade_log.update(row, value)
+        elif action == 'delete':
+            self.trade_log.delete(row)
+        elif self.storage == 'sqlite':
+            trade_filter = self.trade_filter or store.TradeFilter()
+            symbol = trade_filter.symbol or self.symbol_edit.text().strip() or None
+            tag = trade_filter.tag or self.tag_edit.text().strip() or None
+            self.trade_log.insert(row, value, symbol=symbol, tag=tag)
+        else:
+            self.trade_log.insert(row, value)
+
+    def ask_trade_value(self, title, current=None):
+        """輸入一筆風險回報比；取消、輸入無效或為負數時返回 None"""
+        text, ok = QInputDialog.getText(self, title, self.trans['input_label_rr'],
+                                        text='' if current is None else f"{current:g}")
+        if not ok:
+            return None
         try:
-            # 獲取並轉換輸入的風險回報比
-            rr_ratio = float(self.input_edit.text())
-            if rr_ratio < 0:
-                QMessageBox.warning(self, self.trans['input_error'], self.trans['negative_rr_error'])
+            value = float(text)
+        except ValueError:
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
+            return None
+        if value < 0:
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['negative_rr_error'])
+            return None
+        return value
+
+    def apply_edit(self, action, row, value=None):
+        """修改、插入或刪除第 row 筆交易，資金曲線只從該筆起在後台重算，直方圖只更新受影響的箱"""
+        with profiler.span('apply_edit'):
+            try:
+                self.edit_log(action, row, value)
+            except Exception as e:
+                QMessageBox.warning(self, self.trans['input_error'], str(e))
                 return
-            self.returns.append(rr_ratio)
-            self.input_edit.clear()
+            if action != 'insert':
+                self.r_histogram.remove(float(data_processing.r_multiples(self.returns[row])))
+            if action != 'delete':
+                self.r_histogram.append(float(data_processing.r_multiples(value)))
+            if action == 'update':
+                self.returns.set(row, value)
+            elif action == 'insert':
+                # 插入的交易使用默認風險金額
+                self.returns.insert(row, value)
+                self.risks.insert(row, self.risk_per_trade)
+            else:
+                self.returns.delete(row)
+                self.risks.delete(row)
+            self.trade_model.set_values(self.returns)
+            self.mark_changed(row)
+            self.scheduler.schedule('curve', 'list', 'distribution')
 
-            # 更新數據列表
-            self.update_data_list()
+    def mark_changed(self, row):
+        """記錄第 row 筆起的交易已改變（追加的交易無需記錄，總是從當前曲線的末尾計算）"""
+        self.changed_from = min(self.changed_from, row)
+        self.changed_since_submit = min(self.changed_since_submit, row)
 
-            # 更新指標
-            self.update_metrics()
+    def update_data_list(self):
+        with profiler.span('update_data_list'):
+            self.trade_model.sync()
 
-            # 更新圖表
-            self.update_plot()
-        except ValueError:
-            QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
+    def recompute_curve(self):
+        """在後台計算資金曲線、回撤和連續盈虧，供 update_metrics 和 update_plot 共用
 
-    def update_data_list(self):
-        self.data_list.clear()
-        for idx, rr in enumerate(self.returns, 1):
-            self.data_list.addItem(self.trans['trade_item_rr'].format(idx, rr))
+        只從當前曲線之後第一筆有變化（修改、插入、刪除或新追加）的交易起重算，之前的部分沿用當前曲線。
+        """
+        start = min(self.changed_from, len(self.curve.capital_curve))
+        self.changed_since_submit = math.inf
+        self.computer.submit(data_processing.update_risk_curve, self.curve, self.returns.view(), start,
+                             self.initial_capital, self.risks.view())
+
+    def on_curve_ready(self, curve):
+        # 計算期間又有修改時，下次從修改處繼續重算
+        self.curve = curve
+        self.changed_from = self.changed_since_submit
+        self.scheduler.schedule('metrics', 'plot')
+
+    def on_compute_error(self, message):
+        QMessageBox.warning(self, self.trans['input_error'], message)
 
     def update_metrics(self):
-        if self.returns:
-            # 計算每筆交易的盈虧金額
-            profits_losses = []
-            for rr in self.returns:
-                if rr == 0:
-                    # 虧損交易
-                    profit = -self.risk_per_trade
-                else:
-                    # 盈利交易
-                    profit = (rr - 1) * self.risk_per_trade
-                profits_losses.append(profit)
-
-            # 計算資金曲線
-            capital_curve = [self.initial_capital]
-            for pl in profits_losses:
-                new_capital = capital_curve[-1] + pl
-                capital_curve.append(new_capital)
-            capital_curve = np.array(capital_curve[1:])
-            current_capital = capital_curve[-1]
-
-            # 計算最大回撤
-            drawdowns = capital_curve - np.maximum.accumulate(capital_curve)
-            max_drawdown = drawdowns.min()
-
-            # 計算最長連續獲利和最長連續虧損
-            results = [1 if pl > 0 else -1 for pl in profits_losses]
-            longest_profit, longest_loss = data_processing.calculate_longest_streak(results)
-        else:
-            current_capital = self.initial_capital
-            max_drawdown = 0.00
-            longest_profit = 0
-            longest_loss = 0
+        with profiler.span('update_metrics'):
+            if len(self.curve.capital_curve):
+                current_capital = self.curve.capital_curve[-1]
+                max_drawdown = self.curve.max_drawdown
+                longest_profit = self.curve.longest_profit
+                longest_loss = self.curve.longest_loss
+            else:
+                current_capital = self.initial_capital
+                max_drawdown = 0.00
+                longest_profit = 0
+                longest_loss = 0
 
-        # 更新顯示標籤
-        self.total_return_label.setText(self.trans['current_capital'].format(current_capital))
-        self.max_drawdown_label.setText(self.trans['max_drawdown'].format(max_drawdown))
-        self.longest_profit_label.setText(self.trans['longest_profit'].format(longest_profit))
-        self.longest_loss_label.setText(self.trans['longest_loss'].format(longest_loss))
+            # 更新顯示標籤
+            self.total_return_label.setText(self.trans['current_capital'].format(current_capital))
+            self.max_drawdown_label.setText(self.trans['max_drawdown'].format(max_drawdown))
+            self.longest_profit_label.setText(self.trans['longest_profit'].format(longest_profit))
+            self.longest_loss_label.setText(self.trans['longest_loss'].format(longest_loss))
 
-    def update_plot(self):
-        # 清除之前的繪圖
-        self.ax.clear()
-        self.ax.set_title(self.trans['chart_title_risk'])
-        self.ax.set_xlabel(self.trans['x_label'])
-        self.ax.set_ylabel(self.trans['y_label_risk'])
-
-        if self.returns:
-            # 計算每筆交易的盈虧金額
-            profits_losses = []
-            for rr in self.returns:
-                if rr == 0:
-                    # 虧損交易
-                    profit = -self.risk_per_trade
-                else:
-                    # 盈利交易
-                    profit = (rr - 1) * self.risk_per_trade
-                profits_losses.append(profit)
-
-            # 計算資金曲線
-            capital_curve = [self.initial_capital]
-            for pl in profits_losses:
-                new_capital = capital_curve[-1] + pl
-                capital_curve.append(new_capital)
-            capital_curve = np.array(capital_curve[1:])
-            x_data = np.arange(1, len(capital_curve) + 1)
-            y_data = capital_curve
-
-            # 繪制曲線
-            self.ax.plot(x_data, y_data, marker='o')
-
-            # 設置 x 軸刻度為整數
-            self.ax.xaxis.set_major_locator(MaxNLocator(integer=True))
-            self.ax.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f'{int(x)}'))
-
-            # 設置 y 軸刻度格式為兩位小數
-            self.ax.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
-        else:
-            # 如果沒有數據，繪制空圖
-            self.ax.plot([], [])
+            # 最近一個滾動窗口的風險統計（以 R 倍數計）
+            recent = self.returns.view()[-self.rolling_window:]
+            self.rolling_panel.update(data_processing.r_multiples(recent), self.rolling_window, self.trans)
 
-        # 重繪圖表
-        self.canvas.draw()
+            # 最深的幾個回撤區間，索引與資金曲線一起在後台構建
+            self.drawdown_panel.update(self.curve.drawdown_index, self.trans)
+
+    def update_plot(self):
+        with profiler.span('update_plot'):
+            # 只更新持久化曲線的數據，坐標範圍不變時以 blitting 重繪
+            self.chart.set_data(self.curve.capital_curve)
+
+    def show_distribution_window(self):
+        if self.distribution_window is None:
+            self.distribution_window = DistributionWindow(self)
+        self.distribution_window.show()
+        self.distribution_window.raise_()
+        self.distribution_window.activateWindow()
+        self.scheduler.schedule('distribution')
+
+    def update_distribution(self):
+        with profiler.span('update_distribution'):
+            # 分布窗口打開時才重繪；直方圖已隨交易增量更新，繪製量只與箱數有關
+            if self.distribution_window is not None and self.distribution_window.isVisible():
+                self.distribution_window.refresh()
 
     def on_mouse_move(self, event):
         if event.inaxes == self.ax:
@@ -653,34 +1470,388 @@ class RiskBasedTradingApp(QMainWindow):
 
     def load_data(self):
         """加載保存的數據"""
+        with profiler.span('load_data'):
+            try:
+                data = self.trade_log.load()
+                self.initial_capital = data.initial_capital
+                self.risk_per_trade = data.risk_per_trade
+                self.returns = data_processing.TradeStore(data.returns)
+                self.risks = data_processing.TradeStore(
+                    np.broadcast_to(journal.risk_amounts(data), data.returns.shape))
+                self.r_histogram = data_processing.RHistogram(data_processing.r_multiples(data.returns))
+                self.mark_changed(0)
+            except FileNotFoundError:
+                # 文件不存在，首次運行
+                pass
+            except Exception as e:
+                QMessageBox.warning(self, self.trans['input_error'], str(e))
+
+    def reload_data(self):
+        """按當前篩選條件重新讀取交易，資金曲線在後台重算"""
+        self.computer.cancel()
+        self.load_data()
+        self.trade_model.set_values(self.returns)
+        self.clear_simulation()
+        self.update_texts()
+        self.scheduler.schedule('curve', 'list', 'distribution')
+
+    def import_csv(self, path=None):
+        # ...（與 StandardTradingApp 中的 import_csv 方法相同）
+        """從 CSV 流式導入風險回報比：每校驗完一塊就寫入日誌，導入完成後只合併和刷新一次"""
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, self.trans['import_csv'], '', 'CSV (*.csv);;* (*)')
+            if not path:
+                return
+        imported = 0
         try:
-            with open('risk_data.json', 'r') as f:
-                data = json.load(f)
-                self.initial_capital = data.get('initial_capital', self.initial_capital)
-                self.risk_per_trade = data.get('risk_per_trade', self.risk_per_trade)
-                self.returns = data.get('returns', [])
-        except FileNotFoundError:
-            # 文件不存在，首次運行
-            pass
+            for values, timestamps in importer.import_chunks(path, 'risk'):
+                # CSV 含時間列時一併導入，否則時間記為未知
+                self.trade_log.extend(values, timestamps, compact=False)
+                imported += len(values)
+                if self.trade_filter is None:
+                    self.returns.extend(values)
+                    self.risks.extend(np.full(len(values), self.risk_per_trade))
+                    self.r_histogram.extend(data_processing.r_multiples(values))
+            self.trade_log.compact()
         except Exception as e:
+            # 內存中的歷史可能只含部分塊，按日誌重新讀取
+            self.reload_data()
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['import_failed'].format(imported, e))
+            return
+        if self.trade_filter is None:
+            self.scheduler.schedule('curve', 'list', 'distribution')
+        else:
+            # 篩選時按條件重新讀取，導入的交易中只顯示符合條件的
+            self.reload_data()
+        QMessageBox.information(self, self.trans['import_csv'], self.trans['import_done'].format(imported))
+
+    def log_trade(self, value, timestamp, risk=0.0):
+        # ...（與 StandardTradingApp 中的 log_trade 方法相同，另記錄風險金額）
+        """將一筆交易連同提交時間和風險金額（0 為默認值）追加寫入日誌，返回它是否符合當前的篩選條件；寫入失敗時返回 False
+
+        SQLite 存儲同時記錄輸入的品種和標籤。
+        """
+        symbol, tag = None, None
+        try:
+            if self.storage == 'sqlite':
+                symbol = self.symbol_edit.text().strip() or None
+                tag = self.tag_edit.text().strip() or None
+                self.trade_log.append(value, timestamp, symbol, tag, risk)
+            else:
+                self.trade_log.append(value, timestamp, risk)
+        except Exception as e:
+            # 未能保存的交易不加入內存中的歷史，否則重新加載後會消失，之後的編輯序號也會錯位
             QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return False
+        return store.filter_matches(self.trade_filter, timestamp, symbol, tag)
+
+    def ask_trade_filter(self):
+        dialog = TradeFilterDialog(self.trade_log.distinct('symbol'), self.trade_log.distinct('tag'),
+                                   self.trade_filter, self.language, self.theme)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.set_trade_filter(dialog.get_filter())
+
+    def set_trade_filter(self, trade_filter):
+        """設置篩選條件並只讀取匹配的交易；新輸入的交易默認使用篩選的品種和標籤"""
+        self.trade_filter = trade_filter
+        self.trade_log.set_filter(trade_filter)
+        if trade_filter is not None:
+            if trade_filter.symbol is not None:
+                self.symbol_edit.setText(trade_filter.symbol)
+            if trade_filter.tag is not None:
+                self.tag_edit.setText(trade_filter.tag)
+        self.reload_data()
 
     def save_data(self):
-        """保存當前數據"""
-        data = {
-            'initial_capital': self.initial_capital,
-            'risk_per_trade': self.risk_per_trade,
-            'returns': self.returns
-        }
+        """保存當前數據（交易已在提交時寫入日誌，此處只需關閉日誌）"""
+        with profiler.span('save_data'):
+            try:
+                self.trade_log.close()
+            except Exception as e:
+                QMessageBox.warning(self, self.trans['input_error'], str(e))
+
+    def save_trace(self):
+        """將埋點記錄導出為 JSON 追蹤文件"""
+        path, _ = QFileDialog.getSaveFileName(self, self.trans['save_trace'], 'trace.json', 'JSON (*.json)')
+        if not path:
+            return
         try:
-            with open('risk_data.json', 'w') as f:
-                json.dump(data, f)
+            profiler.dump_trace(path)
         except Exception as e:
             QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return
+        QMessageBox.information(self, self.trans['save_trace'],
+                                self.trans['trace_saved'].format(len(profiler.events), path))
 
     def closeEvent(self, event):
         """窗口關閉事件"""
         self.save_data()
+        if self.distribution_window is not None:
+            self.distribution_window.close()
+        event.accept()
+
+class PortfolioWindow(QMainWindow):
+    """多策略組合：並行加載多個交易日誌，顯示各策略指標、等權組合曲線和各策略的疊加曲線"""
+    def __init__(self, language='中文', theme='淺色', executor_kind='thread'):
+        super().__init__()
+        self.language = language
+        self.theme = theme
+        self.trans = translations[self.language]
+        self.setWindowTitle(self.trans['portfolio_mode'])
+
+        # 應用主題
+        if self.theme in ['淺色 / Light', '淺色']:
+            self.setStyleSheet(light_style)
+        elif self.theme in ['深色 / Dark', '深色']:
+            self.setStyleSheet(dark_style)
+
+        self.setGeometry(100, 100, 1200, 650)
+
+        # 要加載的日誌、已加載的策略（按完成順序）、加載失敗的信息和組合曲線
+        self.paths = []
+        self.results = []
+        self.errors = []
+        self.total = 0
+        self.curve = portfolio.build_portfolio([])
+
+        # 各日誌在執行器中並行加載和計算指標；組合曲線在線程池中合成，界面不會阻塞
+        self.loader = workers.ParallelLoader(lambda: portfolio.make_executor(executor_kind), self)
+        self.loader.item_ready.connect(self.on_strategy_loaded)
+        self.loader.item_failed.connect(self.on_strategy_failed)
+        self.loader.finished.connect(self.on_loading_finished)
+        self.computer = workers.BackgroundComputer(self)
+        self.computer.result_ready.connect(self.on_portfolio_ready)
+        self.computer.error.connect(self.on_compute_error)
+
+        # 創建主窗口部件
+        self.main_widget = QWidget()
+        self.setCentralWidget(self.main_widget)
+        self.main_layout = QHBoxLayout(self.main_widget)
+
+        # 左側：各策略指標表格
+        self.left_layout = QVBoxLayout()
+        self.strategy_label = QLabel(self.trans['strategies'])
+        self.table = QTableWidget(0, 6)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSortingEnabled(True)
+        self.left_layout.addWidget(self.strategy_label)
+        self.left_layout.addWidget(self.table)
+
+        # 中間：繪圖區域
+        self.center_layout = QVBoxLayout()
+        self.figure = Figure(figsize=(5, 4))
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.chart = plotting.PortfolioPlot(self.canvas, self.ax)
+        self.chart.set_labels(self.trans['chart_title_portfolio'], self.trans['x_label'],
+                              self.trans['y_label_portfolio'])
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.center_layout.addWidget(self.toolbar)
+        self.center_layout.addWidget(self.canvas)
+
+        # 右側：加載進度和組合指標
+        self.right_layout = QVBoxLayout()
+        self.progress_label = QLabel(self.trans['loaded_count'].format(0))
+        self.total_return_label = QLabel(self.trans['portfolio_return'].format(0.00))
+        self.max_drawdown_label = QLabel(self.trans['max_drawdown'].format(0.00))
+        self.coord_label = QLabel(self.trans['coordinate'].format('', ''))
+        self.right_layout.addWidget(self.progress_label)
+        self.right_layout.addSpacing(20)
+        self.right_layout.addWidget(self.total_return_label)
+        self.right_layout.addWidget(self.max_drawdown_label)
+        self.right_layout.addSpacing(20)
+        self.right_layout.addWidget(self.coord_label)
+        self.right_layout.addStretch()
+
+        self.main_layout.addLayout(self.left_layout, 2)
+        self.main_layout.addLayout(self.center_layout, 3)
+        self.main_layout.addLayout(self.right_layout, 1)
+
+        self.canvas.mpl_connect("motion_notify_event", self.on_mouse_move)
+
+        self.create_menus()
+
+        # 多個日誌陸續加載完成時，表格和組合曲線只刷新一次
+        self.scheduler = UpdateScheduler([
+            ('table', self.update_table),
+            ('portfolio', self.recompute_portfolio),
+        ], self)
+        self.scheduler.schedule('table')
+
+    def create_menus(self):
+        menubar = self.menuBar()
+        menubar.clear()
+
+        # 文件菜單
+        file_menu = menubar.addMenu(self.trans['file'])
+        open_action = QAction(self.trans['open_journals'], self)
+        open_action.triggered.connect(self.open_journals)
+        file_menu.addAction(open_action)
+        folder_action = QAction(self.trans['open_folder'], self)
+        folder_action.triggered.connect(self.open_folder)
+        file_menu.addAction(folder_action)
+
+        # 設置菜單
+        settings_menu = menubar.addMenu(self.trans['settings'])
+
+        # 語言子菜單
+        language_menu = settings_menu.addMenu(self.trans['language'])
+        lang_action_cn = QAction('中文', self)
+        lang_action_en = QAction('English', self)
+        lang_action_cn.triggered.connect(lambda: self.change_language('中文'))
+        lang_action_en.triggered.connect(lambda: self.change_language('English'))
+        language_menu.addAction(lang_action_cn)
+        language_menu.addAction(lang_action_en)
+
+        # 主題子菜單
+        theme_menu = settings_menu.addMenu(self.trans['theme'])
+        theme_action_light = QAction(self.trans['light_theme'], self)
+        theme_action_dark = QAction(self.trans['dark_theme'], self)
+        theme_action_light.triggered.connect(lambda: self.change_theme('淺色'))
+        theme_action_dark.triggered.connect(lambda: self.change_theme('深色'))
+        theme_menu.addAction(theme_action_light)
+        theme_menu.addAction(theme_action_dark)
+
+    def change_language(self, language):
+        self.language = language
+        self.trans = translations[self.language]
+        self.update_texts()
+
+    def change_theme(self, theme):
+        self.theme = theme
+        if self.theme in ['淺色 / Light', '淺色']:
+            self.setStyleSheet(light_style)
+        elif self.theme in ['深色 / Dark', '深色']:
+            self.setStyleSheet(dark_style)
+
+    def update_texts(self):
+        # 更新界面中所有的文本
+        self.setWindowTitle(self.trans['portfolio_mode'])
+        self.strategy_label.setText(self.trans['strategies'])
+        self.coord_label.setText(self.trans['coordinate'].format('', ''))
+        self.chart.set_labels(self.trans['chart_title_portfolio'], self.trans['x_label'],
+                              self.trans['y_label_portfolio'])
+        self.update_progress()
+        self.update_metrics()
+        self.update_plot()
+        self.scheduler.schedule('table')
+        self.create_menus()
+
+    def open_journals(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, self.trans['open_journals'], '',
+                                                self.trans['journal_filter'])
+        if paths:
+            self.load_journals(paths)
+
+    def open_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, self.trans['open_folder'])
+        if directory:
+            self.load_journals([directory])
+
+    def load_journals(self, paths):
+        """並行加載日誌（目錄會展開為其中的日誌），替換當前的組合"""
+        try:
+            paths = portfolio.expand_paths(paths)
+        except OSError as e:
+            QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return
+        self.paths = paths
+        self.results = []
+        self.errors = []
+        self.total = len(paths)
+        self.computer.cancel()
+        self.curve = portfolio.build_portfolio([])
+        self.loader.submit(portfolio.load_strategy, paths)
+        self.update_progress()
+        self.scheduler.schedule()
+
+    def on_strategy_loaded(self, index, result):
+        self.results.append(result)
+        self.update_progress()
+        self.scheduler.schedule()
+
+    def on_strategy_failed(self, index, message):
+        self.errors.append(f"{self.paths[index]}: {message}")
+        self.update_progress()
+
+    def on_loading_finished(self):
+        self.update_progress()
+        if self.errors:
+            QMessageBox.warning(self, self.trans['input_error'],
+                                self.trans['load_failed'].format('\n'.join(self.errors)))
+
+    def update_progress(self):
+        done = len(self.results) + len(self.errors)
+        if self.loader.busy:
+            self.progress_label.setText(self.trans['loading_progress'].format(done, self.total))
+        else:
+            self.progress_label.setText(self.trans['loaded_count'].format(len(self.results)))
+
+    def update_table(self):
+        """以已加載的策略重新填充表格（策略數量通常只有幾十個）"""
+        headers = [self.trans[key] for key in (
+            'col_strategy', 'col_mode', 'col_trades', 'col_return', 'col_drawdown', 'col_streaks')]
+        self.table.setHorizontalHeaderLabels(headers)
+        # 填充期間關閉排序，避免行在插入時移動
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(self.results))
+        for row, result in enumerate(self.results):
+            values = [
+                result.name,
+                self.trans['mode_' + result.mode],
+                result.trades,
+                round(result.total_return * 100, 2),
+                round(result.max_drawdown * 100, 2),
+                f"{result.longest_profit} / {result.longest_loss}",
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem()
+                # 數字以 DisplayRole 存放，排序時按數值比較
+                item.setData(QtCore.Qt.ItemDataRole.DisplayRole, value)
+                item.setToolTip(result.path)
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+
+    def recompute_portfolio(self):
+        """在後台合成組合淨值"""
+        self.computer.submit(portfolio.build_portfolio, [result.equity for result in self.results])
+
+    def on_portfolio_ready(self, curve):
+        self.curve = curve
+        self.update_metrics()
+        self.update_plot()
+
+    def on_compute_error(self, message):
+        QMessageBox.warning(self, self.trans['input_error'], message)
+
+    def update_metrics(self):
+        self.total_return_label.setText(self.trans['portfolio_return'].format(self.curve.total_return * 100))
+        self.max_drawdown_label.setText(self.trans['max_drawdown'].format(self.curve.max_drawdown * 100))
+
+    def update_plot(self):
+        # 以收益率（%）顯示：組合曲線加各策略的疊加曲線
+        overlays = [(result.name, (result.equity - 1) * 100) for result in self.results]
+        self.chart.set_curves((self.curve.equity - 1) * 100, overlays, self.trans['portfolio_curve'])
+
+    def on_mouse_move(self, event):
+        if event.inaxes == self.ax:
+            x, y = event.xdata, event.ydata
+            if x is not None and y is not None:
+                # 格式化坐標顯示
+                x_formatted = int(round(x))
+                y_formatted = f"{y:.2f}"
+                self.coord_label.setText(self.trans['coordinate'].format(x_formatted, y_formatted))
+            else:
+                self.coord_label.setText(self.trans['coordinate'].format('', ''))
+        else:
+            self.coord_label.setText(self.trans['coordinate'].format('', ''))
+
+    def closeEvent(self, event):
+        """窗口關閉事件：停止仍在進行的加載"""
+        self.loader.shutdown()
         event.accept()
 
 class InitialSettingsDialog(QDialog):
@@ -723,3 +1894,279 @@ class InitialSettingsDialog(QDialog):
         except ValueError:
             QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
             return None, None
+
+class TradeFilterDialog(QDialog):
+    """按日期範圍、品種和標籤篩選交易的對話框"""
+    def __init__(self, symbols, tags, trade_filter=None, language='中文', theme='淺色'):
+        super().__init__()
+        self.trans = translations[language]
+        self.setWindowTitle(self.trans['filter_trades'])
+        trade_filter = trade_filter or store.TradeFilter()
+        today = QtCore.QDate.currentDate()
+
+        # 日期範圍：勾選後才生效，結束日期包含當天
+        self.start_check = QCheckBox(self.trans['filter_from'])
+        self.start_edit = QDateEdit(today.addMonths(-1))
+        self.end_check = QCheckBox(self.trans['filter_to'])
+        self.end_edit = QDateEdit(today)
+        for edit in (self.start_edit, self.end_edit):
+            edit.setCalendarPopup(True)
+        if trade_filter.start is not None:
+            self.start_check.setChecked(True)
+            self.start_edit.setDate(self.to_date(trade_filter.start))
+        if trade_filter.end is not None:
+            self.end_check.setChecked(True)
+            self.end_edit.setDate(self.to_date(trade_filter.end).addDays(-1))
+
+        self.symbol_combo = self.make_combo(symbols, trade_filter.symbol)
+        self.tag_combo = self.make_combo(tags, trade_filter.tag)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QFormLayout()
+        layout.addRow(self.start_check, self.start_edit)
+        layout.addRow(self.end_check, self.end_edit)
+        layout.addRow(self.trans['filter_symbol'], self.symbol_combo)
+        layout.addRow(self.trans['filter_tag'], self.tag_combo)
+        layout.addRow(buttons)
+        self.setLayout(layout)
+
+        # 應用主題
+        if theme in ['淺色 / Light', '淺色']:
+            self.setStyleSheet(light_style)
+        elif theme in ['深色 / Dark', '深色']:
+            self.setStyleSheet(dark_style)
+
+    def make_combo(self, values, current):
+        combo = QComboBox()
+        combo.addItem(self.trans['filter_any'], None)
+        for value in values:
+            combo.addItem(value, value)
+        if current is not None:
+            if current not in values:
+                combo.addItem(current, current)
+            combo.setCurrentIndex(combo.findData(current))
+        return combo
+
+    @staticmethod
+    def to_date(timestamp):
+        return QtCore.QDateTime.fromMSecsSinceEpoch(timestamp // 1_000_000).date()
+
+    @staticmethod
+    def to_timestamp(date):
+        """當天本地時間零點的納秒時間戳"""
+        return QtCore.QDateTime(date, QtCore.QTime(0, 0)).toMSecsSinceEpoch() * 1_000_000
+
+    def get_filter(self):
+        """返回篩選條件；沒有任何條件時返回 None"""
+        trade_filter = store.TradeFilter(
+            self.to_timestamp(self.start_edit.date()) if self.start_check.isChecked() else None,
+            self.to_timestamp(self.end_edit.date().addDays(1)) if self.end_check.isChecked() else None,
+            self.symbol_combo.currentData(),
+            self.tag_combo.currentData(),
+        )
+        return trade_filter if any(field is not None for field in trade_filter) else None
+
+class SizingDialog(QDialog):
+    """倉位假設分析：按固定金額或固定比例（複利）重算全部歷史的資金曲線，在主圖上以虛線對照，可一鍵應用"""
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.trans = app.trans
+        self.risks = None
+        self.setWindowTitle(self.trans['sizing_title'])
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem(self.trans['sizing_fixed'], 'fixed')
+        self.mode_combo.addItem(self.trans['sizing_fraction'], 'fraction')
+        self.value_edit = QLineEdit(f"{app.risk_per_trade:g}")
+        self.value_edit.returnPressed.connect(self.preview)
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        self.summary_label = QLabel()
+
+        self.preview_button = QPushButton(self.trans['sizing_preview'])
+        self.preview_button.clicked.connect(self.preview)
+        self.apply_button = QPushButton(self.trans['sizing_apply'])
+        self.apply_button.clicked.connect(self.apply)
+        self.apply_button.setEnabled(False)
+        self.close_button = QPushButton(self.trans['sizing_close'])
+        self.close_button.clicked.connect(self.reject)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.preview_button)
+        buttons.addWidget(self.apply_button)
+        buttons.addWidget(self.close_button)
+
+        layout = QFormLayout()
+        layout.addRow(self.mode_combo)
+        layout.addRow(self.trans['sizing_value'], self.value_edit)
+        layout.addRow(self.summary_label)
+        layout.addRow(buttons)
+        self.setLayout(layout)
+        self.setStyleSheet(app.styleSheet())
+
+    def on_mode_changed(self):
+        # 切換方式時給出對應的默認值：固定金額為默認風險金額，固定比例為其佔初始資金的比例
+        app = self.app
+        if self.mode_combo.currentData() == 'fixed':
+            self.value_edit.setText(f"{app.risk_per_trade:g}")
+        elif app.initial_capital > 0:
+            self.value_edit.setText(f"{app.risk_per_trade / app.initial_capital * 100:g}")
+        self.risks = None
+        self.apply_button.setEnabled(False)
+
+    def sized_risks(self, value):
+        """按輸入的金額或比例（%）計算每筆的風險金額；數值超出範圍時拋出 ValueError"""
+        app = self.app
+        rr = app.returns.view()
+        if self.mode_combo.currentData() == 'fraction':
+            return data_processing.fractional_risks(rr, app.initial_capital, value / 100)
+        if not value > 0:
+            raise ValueError(self.trans['input_error_message'])
+        return np.full(len(rr), value)
+
+    def preview(self):
+        """重算全部歷史並在主圖上顯示對照曲線"""
+        app = self.app
+        try:
+            value = float(self.value_edit.text().strip().rstrip('%'))
+        except ValueError:
+            QMessageBox.warning(self, self.trans['input_error'], self.trans['input_error_message'])
+            return
+        try:
+            risks = self.sized_risks(value)
+        except ValueError as e:
+            QMessageBox.warning(self, self.trans['input_error'], str(e))
+            return
+        curve = data_processing.calculate_risk_curve(app.returns.view(), app.initial_capital, risks)
+        self.risks = risks
+        app.chart.set_overlay(curve.capital_curve)
+        current = app.curve.capital_curve[-1] if len(app.curve.capital_curve) else app.initial_capital
+        final = curve.capital_curve[-1] if len(curve.capital_curve) else app.initial_capital
+        self.summary_label.setText(self.trans['sizing_summary'].format(
+            final, current, curve.max_drawdown, app.curve.max_drawdown))
+        self.apply_button.setEnabled(True)
+
+    def apply(self):
+        """把預覽的倉位規則寫入全部歷史"""
+        if self.risks is None or len(self.risks) != len(self.app.returns):
+            self.preview()
+            if self.risks is None:
+                return
+        reply = QMessageBox.question(self, self.trans['sizing_apply'],
+                                     self.trans['sizing_confirm'].format(len(self.risks)),
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes and self.app.apply_sizing(self.risks):
+            self.accept()
+
+class PeriodWindow(QWidget):
+    """週期統計窗口：按日、週或月顯示匯總指標的柱狀圖或日曆熱圖，數據取自主窗口增量維護的週期匯總"""
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.setStyleSheet(app.styleSheet())
+        self.resize(900, 500)
+
+        self.period_combo = QComboBox()
+        self.metric_combo = QComboBox()
+        self.view_combo = QComboBox()
+        for combo in (self.period_combo, self.metric_combo, self.view_combo):
+            combo.currentIndexChanged.connect(self.refresh)
+        self.summary_label = QLabel()
+
+        self.figure = Figure(figsize=(6, 4))
+        self.canvas = FigureCanvas(self.figure)
+        self.chart = plotting.PeriodPlot(self.canvas, self.figure)
+        self.toolbar = NavigationToolbar(self.canvas, self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.period_combo)
+        controls.addWidget(self.metric_combo)
+        controls.addWidget(self.view_combo)
+        controls.addStretch()
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+        layout.addWidget(self.summary_label)
+
+        self.retranslate()
+
+    def retranslate(self):
+        trans = self.app.trans
+        self.setWindowTitle(trans['period_stats'])
+        for combo, keys in (
+            (self.period_combo, [f'period_{period}' for period in periods.PERIODS]),
+            (self.metric_combo, [f'period_metric_{metric}' for metric in periods.METRICS]),
+            (self.view_combo, ['period_view_bars', 'period_view_heatmap']),
+        ):
+            # 重填選項時保持當前選擇，且不觸發刷新
+            index = max(combo.currentIndex(), 0)
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems([trans[key] for key in keys])
+            combo.setCurrentIndex(index)
+            combo.blockSignals(False)
+        self.refresh()
+
+    def refresh(self):
+        trans = self.app.trans
+        period = periods.PERIODS[self.period_combo.currentIndex()]
+        metric = periods.METRICS[self.metric_combo.currentIndex()]
+        rollup = self.app.rollups[period]
+        title = f"{trans['period_stats']} - {self.period_combo.currentText()}"
+        if not len(rollup):
+            self.chart.show_empty(title, trans['period_empty'])
+            self.summary_label.setText('')
+            return
+
+        starts = periods.period_starts(rollup.view()['key'], period)
+        values = rollup.values(metric)
+        signed = metric != 'count'
+        if signed:
+            values = values * 100
+        if self.view_combo.currentIndex() == 0:
+            self.chart.show_bars(starts, values, period, title, self.metric_combo.currentText(), signed)
+        else:
+            self.chart.show_heatmap(starts, values, period, title, trans['weekday_labels'].split(','),
+                                    trans['month_labels'].split(','), signed)
+
+        period_returns = rollup.values('return') * 100
+        self.summary_label.setText(trans['period_summary'].format(
+            len(rollup), int((period_returns > 0).sum()), period_returns.max(), period_returns.min()))
+
+class DistributionWindow(QWidget):
+    """R 倍數分布窗口：直方圖和累積分布，數據取自風險金額模式增量維護的直方圖"""
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+        self.setStyleSheet(app.styleSheet())
+        self.resize(800, 500)
+
+        self.figure = Figure(figsize=(6, 4))
+        self.canvas = FigureCanvas(self.figure)
+        self.chart = plotting.DistributionPlot(self.canvas, self.figure.add_subplot(111))
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        self.summary_label = QLabel()
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+        layout.addWidget(self.summary_label)
+
+        self.retranslate()
+
+    def retranslate(self):
+        trans = self.app.trans
+        self.setWindowTitle(trans['r_distribution'])
+        self.chart.set_labels(trans['r_distribution'], trans['r_axis'], trans['r_count'], trans['r_cdf'])
+        self.refresh()
+
+    def refresh(self):
+        histogram = self.app.r_histogram
+        self.chart.set_histogram(histogram.edges(), histogram.view(), histogram.cdf())
+        self.summary_label.setText(self.app.trans['r_summary'].format(
+            histogram.count, histogram.mean, histogram.quantile(0.5), histogram.quantile(0.1),
+            histogram.quantile(0.9), histogram.win_rate * 100))
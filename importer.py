@@ -0,0 +1,126 @@
+# importer.py
+
+import csv
+import itertools
+import numpy as np
+import periods
+
+# 每次解析和校驗的行數
+CHUNK_SIZE = 65536
+
+# 未指定列時，按以下列名（不分大小寫）查找數據列
+COLUMN_NAMES = ('return', 'returns', 'return_pct', 'rr', 'r', 'r_multiple', 'value')
+
+# 按以下列名（不分大小寫）查找交易時間列
+TIME_COLUMNS = ('time', 'timestamp', 'datetime', 'date')
+
+def _find_column(header, column):
+    """根據列名或列序號確定數據列的位置"""
+    if isinstance(column, int):
+        return column
+    names = [name.strip().lower() for name in header]
+    candidates = (column.lower(),) if column else COLUMN_NAMES
+    for name in candidates:
+        if name in names:
+            return names.index(name)
+    if column:
+        raise ValueError(f"CSV 中找不到列 '{column}'")
+    return 0
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+def _is_time(text):
+    try:
+        np.datetime64(text, 'ns')
+        return True
+    except ValueError:
+        return False
+
+def _parse_times(cells, row_number):
+    """把一塊時間文本（本地時間）解析為 UTC 納秒時間戳，空白記為0（未知）"""
+    cells = [cell.replace('/', '-') for cell in cells]
+    try:
+        times = np.array(cells, dtype='datetime64[ns]')
+    except ValueError:
+        bad = next(i for i, cell in enumerate(cells) if not _is_time(cell))
+        raise ValueError(f"第 {row_number + bad} 行不是有效的時間：'{cells[bad]}'")
+    known = ~np.isnat(times)
+    local = times.astype(np.int64)
+    # 減去該日期的本地時區偏移，換算為 UTC 時間戳
+    timestamps = np.zeros(len(local), dtype=np.int64)
+    timestamps[known] = local[known] - periods.local_offsets(local[known])
+    return timestamps
+
+def read_csv_chunks(path, column=None, chunk_size=CHUNK_SIZE):
+    """流式讀取 CSV，每次產出 (起始行號, float64 數值數組, 納秒時間戳數組或 None)
+
+    第一行若不是數字則視為表頭；column 可以是列名或從0開始的列序號。
+    表頭中有交易時間列（如 2024-01-05 或 2024-01-05 10:30）時在同一遍讀取中解析，
+    時間按本地時區解釋，空白的時間記為0（未知）；沒有表頭或時間列時時間戳為 None。
+    文件中沒有任何數據行時拋出 ValueError。
+    """
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            raise ValueError("CSV 文件是空的")
+        index = column if isinstance(column, int) else 0
+        time_index = None
+        row_number = 1
+        if first and not _is_number(first[index] if index < len(first) else ''):
+            # 表頭行
+            index = _find_column(first, column)
+            names = [name.strip().lower() for name in first]
+            time_index = next((names.index(name) for name in TIME_COLUMNS if name in names), None)
+            row_number = 2
+        elif isinstance(column, str):
+            raise ValueError(f"CSV 沒有表頭，無法按列名 '{column}' 讀取")
+        else:
+            reader = itertools.chain([first], reader)
+
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+            cells = [row[index].strip() if index < len(row) else '' for row in rows]
+            try:
+                values = np.array(cells, dtype=np.float64)
+            except ValueError:
+                bad = next(i for i, cell in enumerate(cells) if not _is_number(cell))
+                raise ValueError(f"第 {row_number + bad} 行不是有效的數字：'{cells[bad]}'")
+            timestamps = None
+            if time_index is not None:
+                timestamps = _parse_times([row[time_index].strip() if time_index < len(row) else ''
+                                           for row in rows], row_number)
+            yield row_number, values, timestamps
+            row_number += len(rows)
+
+        if row_number == 2:
+            # 只有一行且被當作表頭，例如分隔符不是逗號的無表頭文件
+            raise ValueError(f"CSV 中沒有可導入的數據行（第一行被視為表頭：'{','.join(first)}'）")
+
+def validate_values(values, row_number, allow_negative=True):
+    """以向量化方式校驗一塊數值：不允許非有限值，風險回報比不允許負數"""
+    invalid = ~np.isfinite(values)
+    if not allow_negative:
+        invalid |= values < 0
+    if invalid.any():
+        bad = int(np.flatnonzero(invalid)[0])
+        raise ValueError(f"第 {row_number + bad} 行的數值無效：{values[bad]}")
+
+def import_chunks(path, mode, column=None, chunk_size=CHUNK_SIZE):
+    """流式讀取並校驗 CSV，每次產出一塊可直接寫入日誌的 (float64 數值, 納秒時間戳或 None)
+
+    mode 為 'standard' 時數值為報酬率百分比（與輸入框相同），會換算為小數；
+    mode 為 'risk' 時數值為風險回報比，不能為負數。某一塊無效時拋出 ValueError，之前產出的塊不受影響。
+    """
+    for row_number, values, timestamps in read_csv_chunks(path, column, chunk_size):
+        validate_values(values, row_number, allow_negative=(mode != 'risk'))
+        if mode == 'standard':
+            values /= 100
+        yield values, timestamps
@@ -0,0 +1,443 @@
+# journal.py
+
+import json
+import os
+import struct
+import numpy as np
+from collections import namedtuple
+
+# 二進制交易日誌格式：
+#   文件頭（40 字節）：魔數、版本、標誌位、交易筆數、初始資金、每筆風險金額、每列容量
+#   之後為 float64 報酬率列；若設置了時間戳標誌，再接一段 int64 時間戳列（納秒）；
+#   若設置了風險金額標誌，再接一段 float64 每筆風險金額列（0 表示使用文件頭中的默認值）
+#   每列佔用「容量」筆的空間，前「交易筆數」筆有效，其餘為預留給追加的空位
+#   版本1的文件頭為 32 字節、沒有容量字段，各列緊密相連（容量等於交易筆數）
+MAGIC = b'TRRJ'
+VERSION = 2
+FLAG_TIMESTAMPS = 0x1
+FLAG_RISKS = 0x2
+HEADER = struct.Struct('<4sHHQddQ')
+HEADER_V1 = struct.Struct('<4sHHQdd')
+
+# 預寫日誌格式：
+#   文件頭（16 字節）：魔數、版本、創建時主日誌中的交易筆數
+#   之後為定長記錄：float64 報酬率 + int64 時間戳（納秒，0 表示未知）+ float64 風險金額（0 表示默認值）
+#   版本1的記錄沒有風險金額，讀取時按0處理
+WAL_MAGIC = b'TRRW'
+WAL_VERSION = 2
+WAL_HEADER = struct.Struct('<4sHxxQ')
+WAL_RECORD = np.dtype([('value', '<f8'), ('timestamp', '<i8'), ('risk', '<f8')])
+WAL_RECORD_V1 = np.dtype([('value', '<f8'), ('timestamp', '<i8')])
+
+# 預寫日誌累積到多少筆記錄時合併入主日誌
+COMPACT_EVERY = 1024
+
+# 有多列的日誌需要擴容時，每列至少預留的容量
+MIN_CAPACITY = 4096
+
+STANDARD_JOURNAL = 'standard_data.trj'
+RISK_JOURNAL = 'risk_data.trj'
+
+# 加載後的日誌內容
+Journal = namedtuple('Journal', ['initial_capital', 'risk_per_trade', 'returns', 'timestamps', 'risks'],
+                     defaults=(None,))
+
+# 日誌文件頭：offset 為第一列的起始位置，第 k 列從 offset + k * capacity * 8 開始
+JournalHeader = namedtuple('JournalHeader', ['flags', 'count', 'initial_capital', 'risk_per_trade',
+                                             'version', 'capacity', 'offset'])
+
+def risk_amounts(data):
+    """每筆交易的風險金額：沒有記錄（為0）的交易使用默認風險金額；沒有風險金額列時直接返回默認值"""
+    if data.risks is None:
+        return data.risk_per_trade
+    return np.where(data.risks > 0, data.risks, data.risk_per_trade)
+
+def legacy_json_path(path):
+    """返回與日誌對應的舊版 JSON 數據文件路徑"""
+    return os.path.splitext(path)[0] + '.json'
+
+def journal_exists(path):
+    """判斷日誌或尚未遷移的舊版 JSON 文件是否存在"""
+    return os.path.exists(path) or os.path.exists(legacy_json_path(path))
+
+def _map_column(path, dtype, offset, count):
+    """以 np.memmap 只讀映射一列數據，空列返回空數組"""
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+def read_header(path):
+    """只讀取日誌文件頭，返回 JournalHeader"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER_V1.size:
+        raise ValueError(f"{path}: 日誌文件頭不完整")
+    magic, version, flags, count, initial_capital, risk_per_trade = HEADER_V1.unpack(header[:HEADER_V1.size])
+    if magic != MAGIC:
+        raise ValueError(f"{path}: 不是有效的交易日誌文件")
+    if version > VERSION:
+        raise ValueError(f"{path}: 不支持的日誌版本 {version}")
+    if version < 2:
+        return JournalHeader(flags, count, initial_capital, risk_per_trade, version, count, HEADER_V1.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: 日誌文件頭不完整")
+    capacity = HEADER.unpack(header)[6]
+    return JournalHeader(flags, count, initial_capital, risk_per_trade, version, capacity, HEADER.size)
+
+def column_count(flags):
+    """日誌中的列數：報酬率列加上可選的時間戳列和風險金額列"""
+    return 1 + bool(flags & FLAG_TIMESTAMPS) + bool(flags & FLAG_RISKS)
+
+def read_journal(path):
+    """以零拷貝方式打開二進制日誌"""
+    header = read_header(path)
+    count, stride = header.count, header.capacity * 8
+    returns = _map_column(path, '<f8', header.offset, count)
+    offset = header.offset + stride
+    timestamps = risks = None
+    if header.flags & FLAG_TIMESTAMPS:
+        timestamps = _map_column(path, '<i8', offset, count)
+        offset += stride
+    if header.flags & FLAG_RISKS:
+        risks = _map_column(path, '<f8', offset, count)
+    return Journal(header.initial_capital, header.risk_per_trade, returns, timestamps, risks)
+
+def write_journal(path, returns, initial_capital=0.0, risk_per_trade=0.0, timestamps=None, risks=None,
+                  capacity=None):
+    """將交易數據寫入二進制日誌（先寫臨時文件再原子替換）
+
+    capacity 為每列預留的筆數（不小於交易筆數），多出的空位供之後原地追加。
+    """
+    returns = np.asarray(returns, dtype='<f8')
+    flags = 0
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps, dtype='<i8')
+        if timestamps.shape != returns.shape:
+            raise ValueError("時間戳數量必須與交易筆數一致")
+        flags |= FLAG_TIMESTAMPS
+    if risks is not None:
+        risks = np.asarray(risks, dtype='<f8')
+        if risks.shape != returns.shape:
+            raise ValueError("風險金額數量必須與交易筆數一致")
+        flags |= FLAG_RISKS
+    capacity = len(returns) if capacity is None else max(capacity, len(returns))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, len(returns),
+                            float(initial_capital), float(risk_per_trade), capacity))
+        for k, column in enumerate(c for c in (returns, timestamps, risks) if c is not None):
+            f.seek(HEADER.size + k * capacity * 8)
+            column.tofile(f)
+        # 預留的空位不寫入數據，以稀疏方式擴展到完整長度
+        f.truncate(HEADER.size + column_count(flags) * capacity * 8)
+    os.replace(tmp_path, path)
+
+def migrate_json(path):
+    """將舊版 JSON 數據文件一次性遷移為二進制日誌，原文件改名為 .bak 保留"""
+    json_path = legacy_json_path(path)
+    with open(json_path, 'r') as f:
+        data = json.load(f)
+    write_journal(path, data.get('returns', []),
+                  data.get('initial_capital', 0.0), data.get('risk_per_trade', 0.0))
+    os.replace(json_path, json_path + '.bak')
+
+def load_journal(path):
+    """加載日誌，必要時先從舊版 JSON 遷移；兩者都不存在時拋出 FileNotFoundError"""
+    if not os.path.exists(path) and os.path.exists(legacy_json_path(path)):
+        migrate_json(path)
+    return read_journal(path)
+
+def remove_journal(path):
+    """刪除日誌以及尚未遷移的舊版 JSON 文件"""
+    for p in (path, legacy_json_path(path)):
+        if os.path.exists(p):
+            os.remove(p)
+
+def wal_version(wal_path):
+    """預寫日誌的格式版本；文件不存在或為空時返回 None"""
+    if not os.path.exists(wal_path):
+        return None
+    with open(wal_path, 'rb') as f:
+        header = f.read(WAL_HEADER.size)
+    if len(header) < WAL_HEADER.size:
+        return None
+    return WAL_HEADER.unpack(header)[1]
+
+def read_wal(wal_path, journal_count):
+    """讀取預寫日誌中尚未合併入主日誌的記錄"""
+    if not os.path.exists(wal_path):
+        return np.empty(0, dtype=WAL_RECORD)
+    with open(wal_path, 'rb') as f:
+        header = f.read(WAL_HEADER.size)
+        data = f.read()
+    if len(header) < WAL_HEADER.size:
+        return np.empty(0, dtype=WAL_RECORD)
+    magic, version, base_count = WAL_HEADER.unpack(header)
+    if magic != WAL_MAGIC:
+        raise ValueError(f"{wal_path}: 不是有效的預寫日誌文件")
+    if version > WAL_VERSION:
+        raise ValueError(f"{wal_path}: 不支持的預寫日誌版本 {version}")
+    record = WAL_RECORD if version >= 2 else WAL_RECORD_V1
+    # 丟棄崩潰時寫了一半的尾部記錄
+    usable = len(data) - len(data) % record.itemsize
+    stored = np.frombuffer(data[:usable], dtype=record)
+    if record is not WAL_RECORD:
+        records = np.zeros(len(stored), dtype=WAL_RECORD)
+        records['value'] = stored['value']
+        records['timestamp'] = stored['timestamp']
+    else:
+        records = stored
+    # 合併過程中崩潰時，主日誌可能已包含部分記錄，跳過它們
+    return records[max(journal_count - base_count, 0):]
+
+def concat_column(column, values, count, dtype):
+    """把新記錄的一列接到已有的可選列之後；兩者都沒有數據時返回 None"""
+    if column is None:
+        if not values.any():
+            return None
+        column = np.zeros(count, dtype=dtype)
+    return np.concatenate((column, values))
+
+def replay_wal(data, records):
+    """將預寫日誌記錄接到已加載的日誌之後，返回新的 Journal"""
+    if not len(records):
+        return data
+    count = len(data.returns)
+    return Journal(data.initial_capital, data.risk_per_trade,
+                   np.concatenate((data.returns, records['value'])),
+                   concat_column(data.timestamps, records['timestamp'], count, '<i8'),
+                   concat_column(data.risks, records['risk'], count, '<f8'))
+
+def open_journal(path):
+    """以只讀方式打開任意日誌：二進制日誌（含未合併的預寫日誌）、SQLite 存儲或舊版 JSON 文件，不寫入任何文件"""
+    if path.endswith('.db'):
+        # store 模塊依賴本模塊，延遲導入
+        import store
+        return store.open_store(path)
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return Journal(data.get('initial_capital', 0.0), data.get('risk_per_trade', 0.0),
+                       np.asarray(data.get('returns', []), dtype=np.float64), None)
+    if not os.path.exists(path) and os.path.exists(legacy_json_path(path)):
+        return open_journal(legacy_json_path(path))
+    data = read_journal(path)
+    return replay_wal(data, read_wal(path + '.wal', len(data.returns)))
+
+class TradeLog:
+    """追加式交易日誌：每筆交易向預寫日誌追加一條定長記錄，定期合併入主日誌"""
+    def __init__(self, path, initial_capital=0.0, risk_per_trade=0.0, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.wal_path = path + '.wal'
+        self.initial_capital = initial_capital
+        self.risk_per_trade = risk_per_trade
+        self.compact_every = compact_every
+        self.pending = 0
+        self._wal = None
+        # 日誌版本：加載、重寫或清除時遞增，追加交易不改變版本；
+        # 內存中的派生數據（如累計收益率緩存）以此判斷是否需要整體重建
+        self.version = 0
+
+    def _ensure_journal(self):
+        """主日誌不存在時寫入一個只有文件頭的空日誌"""
+        if not os.path.exists(self.path):
+            write_journal(self.path, [], self.initial_capital, self.risk_per_trade)
+
+    def load(self):
+        """加載主日誌並重放預寫日誌，返回合併後的 Journal"""
+        if os.path.exists(self.wal_path):
+            self._ensure_journal()
+        data = load_journal(self.path)
+        self.version += 1
+        self.initial_capital = data.initial_capital
+        self.risk_per_trade = data.risk_per_trade
+
+        records = read_wal(self.wal_path, len(data.returns))
+        self.pending = len(records)
+        if self.pending:
+            data = replay_wal(data, records)
+            if self.pending >= self.compact_every:
+                self.compact()
+        return data
+
+    def _open_wal(self):
+        """打開預寫日誌用於追加，新文件先寫入文件頭"""
+        if self._wal is None:
+            self._ensure_journal()
+            if wal_version(self.wal_path) not in (None, WAL_VERSION):
+                # 舊版本的預寫日誌記錄較短，先合併入主日誌，再以新格式追加
+                self.compact()
+            self._trim_wal()
+            new_file = not os.path.exists(self.wal_path)
+            self._wal = open(self.wal_path, 'ab')
+            if new_file or self._wal.tell() == 0:
+                base_count = read_header(self.path).count
+                self._wal.write(WAL_HEADER.pack(WAL_MAGIC, WAL_VERSION, base_count))
+        return self._wal
+
+    def _trim_wal(self):
+        """截掉崩潰時寫了一半的文件頭或尾部記錄，使之後追加的記錄仍按定長對齊"""
+        if not os.path.exists(self.wal_path):
+            return
+        size = os.path.getsize(self.wal_path)
+        if size < WAL_HEADER.size:
+            usable = 0
+        else:
+            usable = size - (size - WAL_HEADER.size) % WAL_RECORD.itemsize
+        if usable != size:
+            with open(self.wal_path, 'r+b') as f:
+                f.truncate(usable)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_records(self, records):
+        wal = self._open_wal()
+        wal.write(records.tobytes())
+        wal.flush()
+        os.fsync(wal.fileno())
+        self.pending += len(records)
+
+    def append(self, value, timestamp=0, risk=0.0):
+        """追加一筆交易：只寫入一條定長記錄，與歷史長度無關"""
+        self._write_records(np.array([(value, timestamp, risk)], dtype=WAL_RECORD))
+        if self.pending >= self.compact_every:
+            self.compact()
+
+    def extend(self, values, timestamps=None, risks=None, compact=True):
+        """批量追加交易：一次寫入所有記錄後立即合併入主日誌
+
+        分塊導入時可傳入 compact=False，記錄先保存在預寫日誌中，全部寫完後再調用一次 compact()。
+        """
+        records = np.zeros(len(values), dtype=WAL_RECORD)
+        records['value'] = values
+        if timestamps is not None:
+            records['timestamp'] = timestamps
+        if risks is not None:
+            records['risk'] = risks
+        self._write_records(records)
+        if compact:
+            self.compact()
+
+    def compact(self):
+        """將預寫日誌中的記錄合併入主日誌並刪除預寫日誌"""
+        self.close_wal()
+        self._ensure_journal()
+        header = read_header(self.path)
+        records = read_wal(self.wal_path, header.count)
+
+        if len(records):
+            flags = header.flags
+            if records['timestamp'].any():
+                flags |= FLAG_TIMESTAMPS
+            if records['risk'].any():
+                flags |= FLAG_RISKS
+            new_count = header.count + len(records)
+            single = column_count(flags) == 1
+            if header.version == VERSION and flags == header.flags and (single or new_count <= header.capacity):
+                self._append_in_place(header, records, new_count)
+            else:
+                # 需要新增一列、某列空位已用完或是舊版文件時重寫整個日誌；
+                # 有多列時容量按兩倍擴展，之後的合併又可以原地追加
+                capacity = None if single else max(2 * new_count, MIN_CAPACITY)
+                data = replay_wal(read_journal(self.path), records)
+                write_journal(self.path, data.returns, header.initial_capital, header.risk_per_trade,
+                              data.timestamps, data.risks, capacity)
+                del data
+
+        if os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+        self.pending = 0
+
+    def _append_in_place(self, header, records, new_count):
+        """把記錄寫入各列的空位（只有報酬率列時直接接在文件尾），同步後再更新文件頭中的筆數"""
+        columns = [records['value'].astype('<f8')]
+        if header.flags & FLAG_TIMESTAMPS:
+            columns.append(records['timestamp'].astype('<i8'))
+        if header.flags & FLAG_RISKS:
+            columns.append(records['risk'].astype('<f8'))
+        capacity = header.capacity if len(columns) > 1 else new_count
+        with open(self.path, 'r+b') as f:
+            for k, column in enumerate(columns):
+                f.seek(header.offset + (k * header.capacity + header.count) * 8)
+                f.write(column.tobytes())
+            if len(columns) == 1:
+                f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, header.flags, new_count,
+                                header.initial_capital, header.risk_per_trade, capacity))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def update(self, index, value):
+        """修改第 index 筆交易：先合併預寫日誌，再原地覆寫主日誌中的8個字節"""
+        self.compact()
+        header = read_header(self.path)
+        if not 0 <= index < header.count:
+            raise IndexError('trade index out of range')
+        self.version += 1
+        with open(self.path, 'r+b') as f:
+            f.seek(header.offset + index * 8)
+            f.write(struct.pack('<d', value))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _edited_columns(self, edit):
+        """合併預寫日誌後讀出各列並複製，交給 edit 逐列修改；複製後不再持有映射，主日誌可以被替換"""
+        self.compact()
+        data = read_journal(self.path)
+        columns = [None if column is None else edit(np.array(column), name)
+                   for name, column in (('returns', data.returns), ('timestamps', data.timestamps),
+                                        ('risks', data.risks))]
+        del data
+        return columns
+
+    def insert(self, index, value, timestamp=0, risk=0.0):
+        """在第 index 筆之前插入一筆交易（需要重寫主日誌）"""
+        inserted = {'returns': value, 'timestamps': timestamp, 'risks': risk}
+        returns, timestamps, risks = self._edited_columns(
+            lambda column, name: np.insert(column, index, inserted[name]))
+        if risks is None and risk:
+            risks = np.zeros(len(returns))
+            risks[index] = risk
+        self.rewrite(returns, timestamps, risks)
+
+    def delete(self, index):
+        """刪除第 index 筆交易（需要重寫主日誌）"""
+        self.rewrite(*self._edited_columns(lambda column, name: np.delete(column, index)))
+
+    def set_risks(self, risks):
+        """替換全部交易的風險金額（如按新的倉位規則重新計算歷史後），需要重寫主日誌"""
+        returns, timestamps, _ = self._edited_columns(lambda column, name: column)
+        self.rewrite(returns, timestamps, risks)
+
+    def rewrite(self, returns, timestamps=None, risks=None):
+        """以完整數據重寫主日誌並丟棄預寫日誌"""
+        self.version += 1
+        self.close_wal()
+        write_journal(self.path, returns, self.initial_capital, self.risk_per_trade, timestamps, risks)
+        if os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+        self.pending = 0
+
+    def clear(self):
+        """刪除主日誌、舊版 JSON 文件和預寫日誌"""
+        self.version += 1
+        self.close_wal()
+        remove_journal(self.path)
+        if os.path.exists(self.wal_path):
+            os.remove(self.wal_path)
+        self.pending = 0
+
+    def close_wal(self):
+        """關閉預寫日誌文件句柄"""
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    def close(self):
+        """關閉日誌；確保主日誌存在，以便下次啟動時保留初始設置"""
+        self.close_wal()
+        self._ensure_journal()
@@ -1,44 +1,109 @@
 # main.py
 
-import sys
-from PyQt6.QtWidgets import QApplication, QDialog
-from gui import StartWindow, StandardTradingApp, RiskBasedTradingApp, InitialSettingsDialog
 import os
+import sys
+import argparse
+import importlib
+import threading
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+def parse_args(argv):
+    """解析命令行參數，未識別的參數留給 Qt 處理"""
+    parser = argparse.ArgumentParser(description="Trading Return Recorder")
+    parser.add_argument('--import', dest='import_file', metavar='CSV',
+                        help="啟動後將 CSV 中的報酬率（標準模式，%%）或風險回報比（風險模式）導入當前日誌")
+    parser.add_argument('--portfolio', nargs='+', metavar='PATH',
+                        help="以多策略組合方式打開指定的日誌文件、SQLite 存儲或目錄（默認為當前目錄）")
+    parser.add_argument('--processes', action='store_true',
+                        help="組合窗口使用進程池而不是線程池並行加載日誌")
+    parser.add_argument('--sqlite', action='store_true',
+                        help="使用 SQLite 存儲交易（可記錄品種和標籤並按條件篩選），首次使用時導入現有日誌")
+    parser.add_argument('--profile', action='store_true',
+                        help="開啟性能埋點並在狀態欄顯示性能覆蓋層")
+    parser.add_argument('--trace', metavar='JSON',
+                        help="開啟性能埋點，退出時將追蹤記錄寫入指定的 JSON 文件")
+    return parser.parse_known_args(argv)
+
+def run_gui(args, qt_args):
+    """啟動圖形界面"""
+    # Qt 和 matplotlib 只在啟動界面時導入，無界面命令不承擔這部分開銷；
+    # 開始界面只需要 PyQt6，numpy、matplotlib 和主界面模塊在後台線程中預加載
+    from PyQt6.QtWidgets import QApplication, QDialog
+    from start_window import StartWindow
+    from profiling import profiler
+
+    if args.profile or args.trace:
+        profiler.enabled = True
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
     # 顯示開始界面
     start_window = StartWindow()
+    if args.portfolio:
+        start_window.calc_combo_box.setCurrentIndex(2)
     start_window.show()
+    preload = threading.Thread(target=importlib.import_module, args=('gui',), daemon=True)
+    preload.start()
     app.exec()
 
+    # 用戶做出選擇後才需要主界面；若預加載尚未完成，這裡會等待它完成
+    from gui import StandardTradingApp, RiskBasedTradingApp, PortfolioWindow, InitialSettingsDialog
+    import journal
+    import store
+
     # 根據用戶選擇，啓動相應的界面
     language = start_window.selected_language
     theme = start_window.selected_theme
+    storage = 'sqlite' if args.sqlite else 'journal'
 
     if start_window.selected_option == 0:
         # 標準累計收益率
-        window = StandardTradingApp(language, theme)
+        window = StandardTradingApp(language, theme, storage)
     elif start_window.selected_option == 1:
         # 基於初始資金和固定風險金額
-        data_file_exists = os.path.exists('risk_data.json')
+        data_file_exists = journal.journal_exists(journal.RISK_JOURNAL)
+        if args.sqlite:
+            data_file_exists = data_file_exists or os.path.exists(store.RISK_STORE)
         if data_file_exists:
             # 如果數據文件存在，直接加載數據
-            window = RiskBasedTradingApp(0, 0, language, theme)
+            window = RiskBasedTradingApp(0, 0, language, theme, storage)
         else:
             # 彈出對話框，輸入初始資金和風險金額
             dialog = InitialSettingsDialog(language, theme)
             if dialog.exec() == QDialog.DialogCode.Accepted:
                 initial_capital, risk_per_trade = dialog.get_values()
                 if initial_capital is not None and risk_per_trade is not None:
-                    window = RiskBasedTradingApp(initial_capital, risk_per_trade, language, theme)
+                    window = RiskBasedTradingApp(initial_capital, risk_per_trade, language, theme, storage)
                 else:
-                    sys.exit()
+                    return 0
             else:
-                sys.exit()
+                return 0
+    elif start_window.selected_option == 2:
+        # 多策略組合：窗口顯示後再並行加載日誌
+        window = PortfolioWindow(language, theme, 'process' if args.processes else 'thread')
     else:
-        sys.exit()
+        return 0
 
     window.show()
-    sys.exit(app.exec())
+    if start_window.selected_option == 2:
+        window.load_journals(args.portfolio or ['.'])
+    else:
+        if args.profile:
+            window.perf_overlay.set_visible(True)
+
+        # 命令行指定的 CSV 在窗口顯示後導入
+        if args.import_file:
+            window.import_csv(args.import_file)
+
+    status = app.exec()
+    if args.trace:
+        profiler.dump_trace(args.trace)
+    return status
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['report']:
+        # 無界面批量分析：python main.py report --mode risk --file risk_data.trj
+        import report
+        sys.exit(report.main(sys.argv[2:]))
+
+    args, qt_args = parse_args(sys.argv[1:])
+    sys.exit(run_gui(args, qt_args))
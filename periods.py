@@ -0,0 +1,240 @@
+# periods.py
+#
+# 按日、週、月匯總標準模式的交易：每個週期的複利收益率、報酬率之和、交易筆數和週期內最大回撤。
+# 加載或編輯後以向量化方式整體構建，之後每追加一筆交易只以 O(1) 更新它所在的週期；
+# 柱狀圖和日曆熱圖直接讀取匯總表，不再掃描原始交易。週期按本地時區劃分，
+# 時間戳為0（時間未知，如舊日誌或沒有時間列的 CSV）的交易不計入。不依賴 Qt。
+
+import time
+import numpy as np
+import data_processing
+
+PERIODS = ('day', 'week', 'month')
+
+DAY_NS = 86_400 * 10**9
+
+# 匯總表的一行：equity 為週期內的淨值（期初為1），peak 為週期內的最高淨值（含期初），
+# drawdown 為週期內的最大回撤（≤0），pnl 為報酬率之和
+ROLLUP_DTYPE = np.dtype([
+    ('key', np.int64), ('count', np.int64), ('equity', np.float64),
+    ('pnl', np.float64), ('peak', np.float64), ('drawdown', np.float64),
+])
+
+# 匯總表可顯示的指標
+METRICS = ('return', 'pnl', 'count', 'drawdown')
+
+def local_offsets(timestamps):
+    """各時間戳所在日期的本地時區偏移（納秒）
+
+    偏移按每個日期取一次（當日正午的偏移），大量交易只需查詢少量不同的日期。
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    days, inverse = np.unique(timestamps // DAY_NS, return_inverse=True)
+    offsets = np.array([time.localtime(int(day) * 86_400 + 43_200).tm_gmtoff for day in days],
+                       dtype=np.int64)
+    return offsets[inverse] * 10**9
+
+def local_days(timestamps):
+    """納秒時間戳換算為本地日期（自 1970-01-01 起的天數）"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    return (timestamps + local_offsets(timestamps)) // DAY_NS
+
+def period_keys(days, period):
+    """本地日期換算為週期鍵：日為天數，週為以週一開始的週序號，月為自 1970-01 起的月數"""
+    days = np.asarray(days, dtype=np.int64)
+    if period == 'day':
+        return days
+    if period == 'week':
+        # 1970-01-01 為週四，加3後每7天的邊界落在週一
+        return (days + 3) // 7
+    if period == 'month':
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"未知的週期：{period}")
+
+def period_starts(keys, period):
+    """週期鍵對應的起始日期（datetime64[D]）"""
+    keys = np.asarray(keys, dtype=np.int64)
+    if period == 'day':
+        return keys.astype('datetime64[D]')
+    if period == 'week':
+        return (keys * 7 - 3).astype('datetime64[D]')
+    if period == 'month':
+        return keys.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"未知的週期：{period}")
+
+def build_rows(returns, keys):
+    """以向量化方式把交易匯總為按鍵排序的匯總表；同一週期內的交易保持原有順序"""
+    order = np.argsort(keys, kind='stable')
+    keys, returns = keys[order], returns[order]
+    n = len(keys)
+    rows = np.zeros(0, dtype=ROLLUP_DTYPE)
+    if not n:
+        return rows
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, n))
+    growth = 1 + returns
+
+    # 週期內的淨值路徑：對數增長的分段累加；分段滾動峰值在各段加上遞增的偏移後一次求出
+    log_growth = np.log(np.maximum(growth, 1e-300))
+    log_equity = np.cumsum(log_growth)
+    group = np.repeat(np.arange(len(starts)), counts)
+    log_equity -= (log_equity[starts] - log_growth[starts])[group]
+    offset = (np.ptp(log_equity) + 1) * group
+    log_peak = np.maximum(np.maximum.accumulate(log_equity + offset) - offset, 0.0)
+
+    rows = np.zeros(len(starts), dtype=ROLLUP_DTYPE)
+    rows['key'] = keys[starts]
+    rows['count'] = counts
+    rows['equity'] = np.multiply.reduceat(growth, starts)
+    rows['pnl'] = np.add.reduceat(returns, starts)
+    rows['peak'] = np.exp(log_peak[starts + counts - 1])
+    rows['drawdown'] = np.minimum.reduceat(np.expm1(log_equity - log_peak), starts)
+    return rows
+
+class PeriodRollup:
+    """一種週期長度的匯總表，行按週期鍵排序，容量按倍數增長
+
+    交易按提交順序追加；落在已有週期（包括較早的週期）時從該行保存的淨值和峰值繼續累計，
+    結果與按交易順序整體構建相同。
+    """
+    __slots__ = ('period', 'rows', 'count')
+
+    def __init__(self, period, returns=(), days=()):
+        if period not in PERIODS:
+            raise ValueError(f"未知的週期：{period}")
+        self.period = period
+        rows = build_rows(np.asarray(returns, dtype=np.float64), period_keys(days, period))
+        self.rows = np.empty(max(data_processing.MIN_CAPACITY, len(rows)), dtype=ROLLUP_DTYPE)
+        self.rows[:len(rows)] = rows
+        self.count = len(rows)
+
+    def __len__(self):
+        return self.count
+
+    def view(self):
+        """匯總表的只讀視圖"""
+        rows = self.rows[:self.count]
+        rows.flags.writeable = False
+        return rows
+
+    def _row(self, key):
+        """返回鍵所在的行號，不存在時按順序插入一個空週期"""
+        count = self.count
+        if count and self.rows['key'][count - 1] == key:
+            return count - 1
+        index = int(np.searchsorted(self.rows['key'][:count], key))
+        if index < count and self.rows['key'][index] == key:
+            return index
+        self.rows = data_processing.grow_buffer(self.rows, count, count + 1)
+        # 新週期通常在末尾；插在中間時（時間早於已有週期的交易）後移其後的行
+        self.rows[index + 1:count + 1] = self.rows[index:count]
+        self.rows[index] = (key, 0, 1.0, 0.0, 1.0, 0.0)
+        self.count += 1
+        return index
+
+    def append(self, value, day):
+        """追加一筆交易，day 為它的本地日期"""
+        row = self.rows[self._row(int(period_keys(day, self.period)))]
+        equity = row['equity'] * (1 + value)
+        peak = max(row['peak'], equity)
+        row['count'] += 1
+        row['equity'] = equity
+        row['pnl'] += value
+        row['peak'] = peak
+        row['drawdown'] = min(row['drawdown'], equity / peak - 1)
+
+    def extend(self, values, days):
+        """批量追加交易：新週期向量化構建後併入，落在已有週期的交易逐筆累計"""
+        values = np.asarray(values, dtype=np.float64)
+        keys = period_keys(days, self.period)
+        existing = np.isin(keys, self.rows['key'][:self.count])
+        for value, day in zip(values[existing].tolist(), np.asarray(days)[existing].tolist()):
+            self.append(value, day)
+        rows = build_rows(values[~existing], keys[~existing])
+        if len(rows):
+            merged = np.concatenate((self.rows[:self.count], rows))
+            merged = merged[np.argsort(merged['key'], kind='stable')]
+            self.rows = data_processing.grow_buffer(self.rows, self.count, len(merged))
+            self.rows[:len(merged)] = merged
+            self.count = len(merged)
+
+    def refresh(self, values, days, day):
+        """以 day 所在週期內的全部交易（按交易順序）重新匯總該週期；沒有交易時刪除該行"""
+        key = int(period_keys(day, self.period))
+        keys = period_keys(days, self.period)
+        same = keys == key
+        rows = build_rows(np.asarray(values, dtype=np.float64)[same], keys[same])
+        count = self.count
+        index = int(np.searchsorted(self.rows['key'][:count], key))
+        if index < count and self.rows['key'][index] == key:
+            if len(rows):
+                self.rows[index] = rows[0]
+            else:
+                self.rows[index:count - 1] = self.rows[index + 1:count]
+                self.count -= 1
+        elif len(rows):
+            self.rows[self._row(key)] = rows[0]
+
+    def values(self, metric):
+        """各週期的指標值：收益率、報酬率之和和回撤為小數，筆數為整數"""
+        rows = self.view()
+        if metric == 'return':
+            return rows['equity'] - 1
+        if metric == 'pnl':
+            return rows['pnl']
+        if metric == 'count':
+            return rows['count']
+        if metric == 'drawdown':
+            return rows['drawdown']
+        raise ValueError(f"未知的指標：{metric}")
+
+class PeriodRollups:
+    """日、週、月三種週期的匯總表，與交易歷史同步增量維護"""
+    __slots__ = ('rollups', 'count')
+
+    def __init__(self, returns=(), timestamps=()):
+        returns = np.asarray(returns, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        known = timestamps != 0
+        days = local_days(timestamps[known])
+        self.rollups = {period: PeriodRollup(period, returns[known], days) for period in PERIODS}
+        # 已匯總的交易筆數（含時間未知而跳過的）
+        self.count = len(returns)
+
+    def __getitem__(self, period):
+        return self.rollups[period]
+
+    def append(self, value, timestamp):
+        """追加一筆交易，三種週期各以 O(1) 更新"""
+        self.count += 1
+        if not timestamp:
+            return
+        day = local_days([timestamp])[0]
+        for rollup in self.rollups.values():
+            rollup.append(value, day)
+
+    def extend(self, values, timestamps):
+        """批量追加交易"""
+        values = np.asarray(values, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.count += len(values)
+        known = timestamps != 0
+        days = local_days(timestamps[known])
+        for rollup in self.rollups.values():
+            rollup.extend(values[known], days)
+
+    def refresh(self, returns, timestamps, timestamp):
+        """修改、插入或刪除時間為 timestamp 的交易後，只重新匯總它所在的日、週、月
+
+        只需比較一次時間戳找出前後32天內的交易，不必重建整個匯總表。
+        """
+        self.count = len(returns)
+        if not timestamp:
+            return
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        near = np.flatnonzero((np.abs(timestamps - timestamp) < 32 * DAY_NS) & (timestamps != 0))
+        days = local_days(timestamps[near])
+        day = local_days([timestamp])[0]
+        values = np.asarray(returns, dtype=np.float64)[near]
+        for rollup in self.rollups.values():
+            rollup.refresh(values, days, day)
@@ -1,10 +1,12 @@
 # plotting.py
 
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.ticker import FormatStrFormatter, MaxNLocator, FuncFormatter
 
 def create_plot():
     """創建初始的 matplotlib 圖形和軸"""
-    figure = plt.Figure(figsize=(6, 4), dpi=100)
+    figure = Figure(figsize=(6, 4), dpi=100)
     ax = figure.add_subplot(111)
     ax.set_title("資產增長率曲線")
     ax.set_xlabel("交易次數")
@@ -18,3 +20,441 @@ def update_plot(ax, cumulative_returns):
     ax.set_xlabel("交易次數")
     ax.set_ylabel("資產增長率（%）")
     ax.plot(cumulative_returns * 100, marker='o')
+
+def minmax_decimate(y_data, x_low, x_high, width):
+    """按像素分桶的最小/最大值抽樣：只取可見範圍內的點，每個像素桶保留極值點
+
+    x 坐標為交易序號（從1開始）。返回抽樣後的 (x, y)，保留曲線的所有峰谷。
+    """
+    n = len(y_data)
+    # 可見範圍兩側各多取一點，使曲線延伸到邊界之外
+    start = int(min(max(np.floor(x_low) - 2, 0), n))
+    stop = int(min(max(np.ceil(x_high) + 1, 0), n))
+    count = stop - start
+    buckets = max(int(width), 1)
+    if count <= 2 * buckets:
+        indices = np.arange(start, stop)
+        return indices + 1, y_data[start:stop]
+
+    # 每桶包含 size 個點，最後不足一桶的部分單獨處理
+    size = -(-count // buckets)
+    full = count // size
+    segment = y_data[start:start + full * size].reshape(full, size)
+    offsets = start + np.arange(full) * size
+    pairs = np.stack((segment.argmin(axis=1) + offsets, segment.argmax(axis=1) + offsets), axis=1)
+    indices = [np.sort(pairs, axis=1).ravel()]
+    if full * size < count:
+        rest = y_data[start + full * size:stop]
+        rest_offset = start + full * size
+        indices.append(np.sort([rest.argmin() + rest_offset, rest.argmax() + rest_offset]))
+    indices = np.concatenate([[start]] + indices + [[stop - 1]])
+    return indices + 1, y_data[indices]
+
+class CurvePlot:
+    """持久化曲線：保留同一條 Line2D，以 set_data 更新數據並用 blitting 局部重繪"""
+    def __init__(self, canvas, ax, margin=0.05, headroom=0.25, marker_limit=200):
+        self.canvas = canvas
+        self.ax = ax
+        self.margin = margin
+        self.headroom = headroom
+        self.marker_limit = marker_limit
+        self.background = None
+        self.y_data = np.empty(0)
+        self.count = 0
+        self.y_min = None
+        self.y_max = None
+        # 模擬分位數帶（屬於背景，不參與 blitting）
+        self.band_artists = []
+        self.band_limits = None
+        # 對照曲線（如按其他倉位規則重算的資金曲線），同樣屬於背景
+        self.overlay_artist = None
+        self.overlay_limits = None
+        # 回撤區間陰影，與曲線一起由 blitting 繪製
+        self.spans = []
+        self.span_artists = []
+
+        # 曲線設為 animated，不參與整圖重繪，由 blitting 單獨繪製
+        self.line, = ax.plot([], [], marker='o', animated=True)
+
+        # 坐標軸格式只需設置一次：x 軸為整數刻度，y 軸保留兩位小數
+        ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f'{int(x)}'))
+        ax.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
+
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+        # 縮放、平移或窗口尺寸變化時，按新的可見範圍重新抽樣
+        ax.callbacks.connect('xlim_changed', self.on_view_changed)
+        self.canvas.mpl_connect('resize_event', self.on_view_changed)
+
+    def on_draw(self, event):
+        """整圖重繪後緩存坐標軸背景，並補畫曲線"""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        for artist in self.span_artists:
+            self.ax.draw_artist(artist)
+        self.ax.draw_artist(self.line)
+
+    def on_view_changed(self, _):
+        self.refresh_line()
+
+    def refresh_line(self):
+        """根據可見 x 範圍和坐標軸像素寬度重新抽樣曲線；點數少時才顯示標記"""
+        x_low, x_high = self.ax.get_xlim()
+        x_data, y_data = minmax_decimate(self.y_data, x_low, x_high, self.ax.bbox.width)
+        self.line.set_data(x_data, y_data)
+        self.line.set_marker('o' if len(x_data) <= self.marker_limit else 'None')
+
+    def set_labels(self, title, xlabel, ylabel):
+        """更新標題和坐標軸標籤（需要整圖重繪）"""
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.canvas.draw_idle()
+
+    def set_data(self, y_data):
+        """更新曲線數據；只有數據超出當前坐標範圍時才重新縮放，用戶縮放到歷史區間時保留其坐標範圍"""
+        y_data = np.asarray(y_data)
+        self.y_data = y_data
+        n = len(y_data)
+        if n == 0:
+            self.line.set_data([], [])
+            self.count = 0
+            self.y_min = self.y_max = None
+            if self.band_limits is not None or self.overlay_limits is not None:
+                self.rescale()
+                return
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.canvas.draw_idle()
+            return
+
+        # 數據增長時只需檢查新增部分的極值，否則重新計算
+        previous = self.count
+        if n > previous and self.y_min is not None:
+            tail = y_data[previous:]
+            self.y_min = min(self.y_min, tail.min())
+            self.y_max = max(self.y_max, tail.max())
+        else:
+            self.y_min = y_data.min()
+            self.y_max = y_data.max()
+        self.count = n
+
+        x_low, x_high = self.ax.get_xlim()
+        y_low, y_high = self.ax.get_ylim()
+        if x_high < previous and n > x_low:
+            # 用戶已縮放到歷史區間（視圖不含原數據的右端）時保留其坐標範圍，只更新可見部分
+            self.refresh_line()
+            self.blit()
+        elif n > x_high or 1 < x_low or self.y_min < y_low or self.y_max > y_high:
+            # 設置新的坐標範圍會觸發 xlim_changed，從而重新抽樣
+            self.rescale()
+        else:
+            self.refresh_line()
+            self.blit()
+
+    def rescale(self):
+        """按數據（和分位數帶、對照曲線）範圍加上邊距設置坐標範圍，並安排整圖重繪"""
+        count, y_min, y_max = self.count, self.y_min, self.y_max
+        for limits in (self.band_limits, self.overlay_limits):
+            if limits is None:
+                continue
+            band_count, band_min, band_max = limits
+            count = max(count, band_count)
+            y_min = band_min if y_min is None else min(y_min, band_min)
+            y_max = band_max if y_max is None else max(y_max, band_max)
+        # x 軸右側預留空間，使後續追加的交易無需每次都重新縮放
+        x_pad = max((count - 1) * self.margin, 0.5)
+        x_room = max(count * self.headroom, 5)
+        y_pad = (y_max - y_min) * self.margin or max(abs(y_max) * self.margin, 0.5)
+        self.ax.set_xlim(1 - x_pad, count + x_room)
+        self.ax.set_ylim(y_min - y_pad, y_max + y_pad)
+        self.canvas.draw_idle()
+
+    def set_bands(self, x_data, bands, color='C1'):
+        """在曲線下方顯示分位數帶：bands 依次為 5/25/50/75/95 百分位，外層和內層為陰影，中位數為虛線"""
+        self.clear_bands(redraw=False)
+        lower_outer, lower_inner, median, upper_inner, upper_outer = bands
+        self.band_artists = [
+            self.ax.fill_between(x_data, lower_outer, upper_outer, color=color, alpha=0.15, linewidth=0),
+            self.ax.fill_between(x_data, lower_inner, upper_inner, color=color, alpha=0.3, linewidth=0),
+            self.ax.plot(x_data, median, color=color, linestyle='--', linewidth=1)[0],
+        ]
+        self.band_limits = (int(x_data[-1]), float(lower_outer.min()), float(upper_outer.max()))
+        self.rescale()
+
+    def clear_bands(self, redraw=True):
+        """移除分位數帶"""
+        for artist in self.band_artists:
+            artist.remove()
+        self.band_artists = []
+        self.band_limits = None
+        if redraw:
+            if self.count:
+                self.rescale()
+            else:
+                self.canvas.draw_idle()
+
+    def set_overlay(self, y_data, color='C2'):
+        """在曲線下方顯示一條虛線對照曲線；按坐標軸像素寬度抽樣一次，不隨縮放重新抽樣"""
+        self.clear_overlay(redraw=False)
+        y_data = np.asarray(y_data)
+        if len(y_data):
+            x_data, y_sampled = minmax_decimate(y_data, 1, len(y_data), self.ax.bbox.width)
+            self.overlay_artist, = self.ax.plot(x_data, y_sampled, color=color, linestyle='--', linewidth=1)
+            self.overlay_limits = (len(y_data), float(y_data.min()), float(y_data.max()))
+        if self.overlay_limits is not None or self.count:
+            self.rescale()
+        else:
+            self.canvas.draw_idle()
+
+    def clear_overlay(self, redraw=True):
+        """移除對照曲線"""
+        if self.overlay_artist is not None:
+            self.overlay_artist.remove()
+        self.overlay_artist = None
+        self.overlay_limits = None
+        if redraw:
+            if self.count:
+                self.rescale()
+            else:
+                self.canvas.draw_idle()
+
+    def set_spans(self, spans, color='C3'):
+        """以半透明陰影標出 x 區間 [(x0, x1), ...]；在下一次 set_data 或重繪時顯示"""
+        if spans == self.spans:
+            return
+        for artist in self.span_artists:
+            artist.remove()
+        self.span_artists = [self.ax.axvspan(x0, x1, color=color, alpha=0.12, linewidth=0, animated=True)
+                             for x0, x1 in spans]
+        self.spans = list(spans)
+
+    def zoom_to(self, x0, x1):
+        """把視圖縮放到 x 區間 [x0, x1]，y 軸按區間內的數據範圍設置"""
+        start = int(min(max(x0 - 1, 0), self.count))
+        stop = int(min(max(x1, start + 1), self.count))
+        if stop <= start:
+            return
+        segment = self.y_data[start:stop]
+        x_pad = max((x1 - x0) * self.margin, 0.5)
+        y_min, y_max = segment.min(), segment.max()
+        y_pad = (y_max - y_min) * self.margin or max(abs(y_max) * self.margin, 0.5)
+        self.ax.set_xlim(x0 - x_pad, x1 + x_pad)
+        self.ax.set_ylim(y_min - y_pad, y_max + y_pad)
+        self.canvas.draw_idle()
+
+    def blit(self):
+        """坐標範圍不變時，恢復緩存的背景並只重繪曲線"""
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.ax.bbox)
+
+class PortfolioPlot:
+    """組合圖表：合成曲線加各策略的細線疊加，所有曲線都按可見範圍和像素寬度抽樣"""
+    def __init__(self, canvas, ax, margin=0.05, legend_limit=12):
+        self.canvas = canvas
+        self.ax = ax
+        self.margin = margin
+        self.legend_limit = legend_limit
+        # (Line2D, y 數據) 列表
+        self.curves = []
+
+        ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, pos: f'{int(x)}'))
+        ax.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
+
+        ax.callbacks.connect('xlim_changed', self.on_view_changed)
+        self.canvas.mpl_connect('resize_event', self.on_view_changed)
+
+    def on_view_changed(self, _):
+        self.refresh_lines()
+
+    def refresh_lines(self):
+        x_low, x_high = self.ax.get_xlim()
+        width = self.ax.bbox.width
+        for line, y_data in self.curves:
+            line.set_data(*minmax_decimate(y_data, x_low, x_high, width))
+
+    def set_labels(self, title, xlabel, ylabel):
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.canvas.draw_idle()
+
+    def set_curves(self, aggregate, overlays, aggregate_label):
+        """替換所有曲線：aggregate 為合成曲線，overlays 為 (名稱, y 數據) 列表"""
+        for line, _ in self.curves:
+            line.remove()
+        self.curves = []
+        for label, y_data in overlays:
+            line, = self.ax.plot([], [], linewidth=0.8, alpha=0.6, label=label)
+            self.curves.append((line, np.asarray(y_data)))
+        if len(aggregate):
+            line, = self.ax.plot([], [], linewidth=2.0, color='black', label=aggregate_label, zorder=3)
+            self.curves.append((line, np.asarray(aggregate)))
+
+        # 策略太多時圖例只保留合成曲線
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if self.curves:
+            lines = [line for line, _ in self.curves]
+            if len(overlays) > self.legend_limit:
+                lines = lines[-1:]
+            self.ax.legend(handles=lines, fontsize='small', loc='upper left')
+
+        self.rescale()
+
+    def rescale(self):
+        """按所有曲線的範圍設置坐標軸，並安排整圖重繪"""
+        non_empty = [y_data for _, y_data in self.curves if len(y_data)]
+        if non_empty:
+            count = max(len(y_data) for y_data in non_empty)
+            y_min = min(y_data.min() for y_data in non_empty)
+            y_max = max(y_data.max() for y_data in non_empty)
+            x_pad = max((count - 1) * self.margin, 0.5)
+            y_pad = (y_max - y_min) * self.margin or max(abs(y_max) * self.margin, 0.5)
+            self.ax.set_xlim(1 - x_pad, count + x_pad)
+            self.ax.set_ylim(y_min - y_pad, y_max + y_pad)
+        self.refresh_lines()
+        self.canvas.draw_idle()
+
+class PeriodPlot:
+    """週期匯總圖表：最近若干週期的柱狀圖，或按日曆排列的熱圖
+
+    數據為匯總表中每個週期一個值，繪製量與交易筆數無關；每次切換或刷新時重建整個圖形。
+    """
+    def __init__(self, canvas, figure, bar_limit=400, heatmap_weeks=53):
+        self.canvas = canvas
+        self.figure = figure
+        self.bar_limit = bar_limit
+        self.heatmap_weeks = heatmap_weeks
+
+    def reset(self, title):
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        ax.set_title(title)
+        return ax
+
+    def show_empty(self, title, message):
+        ax = self.reset(title)
+        ax.set_axis_off()
+        ax.text(0.5, 0.5, message, ha='center', va='center', transform=ax.transAxes)
+        self.canvas.draw_idle()
+
+    def show_bars(self, starts, values, period, title, ylabel, signed=True):
+        """最近 bar_limit 個週期的柱狀圖；signed 時盈利和虧損分別著色"""
+        starts, values = starts[-self.bar_limit:], np.asarray(values)[-self.bar_limit:]
+        ax = self.reset(title)
+        x = np.arange(len(values))
+        colors = np.where(values >= 0, 'C2', 'C3') if signed else 'C0'
+        ax.bar(x, values, width=0.8, color=colors)
+        ax.axhline(0, color='grey', linewidth=0.8)
+        ax.set_ylabel(ylabel)
+        ticks = np.unique(np.linspace(0, len(x) - 1, min(len(x), 8)).round().astype(np.int64))
+        ax.set_xticks(ticks)
+        ax.set_xticklabels(np.datetime_as_string(starts[ticks], unit='M' if period == 'month' else 'D'),
+                           rotation=30, ha='right', fontsize='small')
+        self.figure.tight_layout()
+        self.canvas.draw_idle()
+
+    def show_heatmap(self, starts, values, period, title, weekday_labels, month_labels, signed=True):
+        """日曆熱圖：日為最近 heatmap_weeks 週（列為週、行為星期），週和月為每年一行"""
+        values = np.asarray(values, dtype=np.float64)
+        days = starts.astype(np.int64)
+        if period == 'day':
+            weeks = (days + 3) // 7
+            keep = weeks > weeks[-1] - self.heatmap_weeks
+            days, values, weeks = days[keep], values[keep], weeks[keep]
+            rows, cols = (days + 3) % 7, weeks - weeks[0]
+            grid_shape = (7, int(cols[-1]) + 1)
+        else:
+            years = starts.astype('datetime64[Y]')
+            year_values = years.astype(np.int64)
+            rows = year_values - year_values[0]
+            if period == 'month':
+                cols = (starts.astype('datetime64[M]') - years).astype(np.int64)
+            else:
+                cols = (starts - years.astype('datetime64[D]')).astype(np.int64) // 7
+            grid_shape = (int(rows[-1]) + 1, 12 if period == 'month' else 53)
+        grid = np.full(grid_shape, np.nan)
+        grid[rows, cols] = values
+
+        ax = self.reset(title)
+        limit = np.nanmax(np.abs(values)) or 1.0
+        image = ax.imshow(grid, aspect='auto', interpolation='nearest',
+                          cmap='RdYlGn' if signed else 'Blues',
+                          vmin=-limit if signed else 0, vmax=limit)
+        self.figure.colorbar(image, ax=ax)
+
+        if period == 'day':
+            ax.set_yticks(range(7))
+            ax.set_yticklabels(weekday_labels)
+            # 每月第一週標出月份
+            first_days = (weeks[0] * 7 - 3 + np.arange(grid_shape[1]) * 7).astype('datetime64[D]')
+            months = first_days.astype('datetime64[M]')
+            changes = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+            # 不足兩週的首個月份不標出，避免與下一個月份重疊
+            changes = changes[np.diff(np.append(changes, grid_shape[1] + 2)) >= 2]
+            ax.set_xticks(changes)
+            ax.set_xticklabels([month_labels[int(m)] for m in months[changes].astype(np.int64) % 12],
+                               fontsize='small')
+        else:
+            ax.set_yticks(range(grid_shape[0]))
+            ax.set_yticklabels([str(year) for year in range(1970 + int(year_values[0]),
+                                                            1970 + int(year_values[0]) + grid_shape[0])])
+            if period == 'month':
+                ax.set_xticks(range(12))
+                ax.set_xticklabels(month_labels, fontsize='small')
+            else:
+                ax.set_xticks(range(0, 53, 4))
+                ax.set_xticklabels([str(week + 1) for week in range(0, 53, 4)], fontsize='small')
+        self.figure.tight_layout()
+        self.canvas.draw_idle()
+
+class DistributionPlot:
+    """R 倍數分布圖：直方圖加右側坐標軸上的累積分布曲線
+
+    繪製量只與箱數有關；箱數不變時只更新柱高和曲線，箱數變化時才重建柱子。
+    """
+    def __init__(self, canvas, ax):
+        self.canvas = canvas
+        self.ax = ax
+        self.cdf_ax = ax.twinx()
+        self.cdf_ax.set_ylim(0, 100)
+        self.bars = None
+        self.edges = None
+        self.cdf_line, = self.cdf_ax.plot([], [], color='C1', linewidth=1.2)
+        self.zero_line = ax.axvline(0, color='grey', linewidth=0.8, linestyle='--')
+
+    def set_labels(self, title, xlabel, ylabel, cdf_label):
+        self.ax.set_title(title)
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.cdf_ax.set_ylabel(cdf_label)
+        self.canvas.draw_idle()
+
+    def set_histogram(self, edges, counts, cdf):
+        """顯示各箱計數和箱右邊界處的累積分布（0~1）；盈利箱和虧損箱分別著色"""
+        if self.edges is None or len(edges) != len(self.edges) or edges[0] != self.edges[0]:
+            if self.bars is not None:
+                self.bars.remove()
+            colors = np.where(edges[:-1] >= 0, 'C2', 'C3')
+            self.bars = self.ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+                                    color=colors, edgecolor='white', linewidth=0.3)
+            self.edges = np.array(edges)
+        else:
+            for patch, count in zip(self.bars.patches, counts):
+                patch.set_height(count)
+        # 箱內按均勻分布，累積分布在箱邊界之間線性變化
+        self.cdf_line.set_data(edges, np.concatenate(([0.0], np.asarray(cdf) * 100)))
+        if len(edges) > 1:
+            self.ax.set_xlim(edges[0], edges[-1])
+            self.ax.set_ylim(0, max(int(np.max(counts)) if len(counts) else 0, 1) * 1.05)
+        self.canvas.draw_idle()
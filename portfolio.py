@@ -0,0 +1,120 @@
+# portfolio.py
+#
+# 多策略組合：並行加載多個交易日誌，計算各策略的指標並合成組合淨值曲線。
+# 只依賴 numpy、data_processing 和 journal，不導入 Qt，load_strategy 可以在進程池中運行。
+
+import os
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import numpy as np
+import data_processing
+import journal
+from report import detect_mode
+
+# 單個策略的加載結果；淨值以1為起點（增長倍數），回撤以淨值差計
+StrategyResult = namedtuple('StrategyResult', [
+    'name', 'path', 'mode', 'trades', 'total_return', 'max_drawdown',
+    'longest_profit', 'longest_loss', 'equity'
+])
+
+def strategy_name(path):
+    """以文件名（不含擴展名）作為策略名稱"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+def find_journals(directory):
+    """列出目錄中的交易日誌和 SQLite 存儲（.db）；同名的 .trj 和舊版 .json 只保留 .trj"""
+    names = sorted(os.listdir(directory))
+    stems = {os.path.splitext(name)[0] for name in names if name.endswith('.trj')}
+    paths = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext in ('.trj', '.db') or (ext == '.json' and stem not in stems):
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                paths.append(path)
+    return paths
+
+def expand_paths(paths):
+    """把命令行或對話框給出的路徑展開為日誌文件列表（目錄展開為其中的日誌）"""
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            result.extend(find_journals(path))
+        else:
+            result.append(path)
+    return result
+
+def load_strategy(path):
+    """以只讀方式加載一個日誌並計算指標
+
+    兩種計算方式統一換算為以1為起點的淨值：標準模式為累計淨值，
+    風險金額模式為資金除以初始資金，便於合成組合曲線。
+    """
+    data = journal.open_journal(path)
+    mode = detect_mode(data)
+    if mode == 'risk':
+        if data.initial_capital <= 0:
+            raise ValueError(f"{path}: 初始資金必須大於0")
+        curve = data_processing.calculate_risk_curve(data.returns, data.initial_capital, journal.risk_amounts(data))
+        equity = curve.capital_curve / data.initial_capital
+        longest_profit, longest_loss = curve.longest_profit, curve.longest_loss
+    else:
+        metrics = data_processing.MetricsAccumulator(data.returns)
+        equity = metrics.cumulative_returns + 1
+        longest_profit, longest_loss = metrics.longest_profit, metrics.longest_loss
+
+    if len(equity):
+        total_return = equity[-1] - 1
+        max_drawdown = (equity - np.maximum.accumulate(equity)).min()
+    else:
+        total_return = max_drawdown = 0.0
+    return StrategyResult(strategy_name(path), path, mode, len(equity), float(total_return),
+                          float(max_drawdown), longest_profit, longest_loss, equity)
+
+def aggregate_equity(equities):
+    """等權合成組合淨值：按交易序號對齊，已結束的策略保持最後的淨值
+
+    逐個策略累加到同一個數組，內存只需 O(最長策略的交易筆數)。
+    """
+    if not equities:
+        return np.empty(0)
+    length = max(len(equity) for equity in equities)
+    total = np.zeros(length)
+    for equity in equities:
+        n = len(equity)
+        total[:n] += equity
+        total[n:] += equity[-1] if n else 1.0
+    return total / len(equities)
+
+# 組合合成結果：淨值曲線、總收益率和最大回撤
+PortfolioCurve = namedtuple('PortfolioCurve', ['equity', 'total_return', 'max_drawdown'])
+
+def build_portfolio(equities):
+    """合成組合淨值並計算組合的總收益率和最大回撤"""
+    equity = aggregate_equity(equities)
+    if not len(equity):
+        return PortfolioCurve(equity, 0.0, 0.0)
+    max_drawdown = (equity - np.maximum.accumulate(equity)).min()
+    return PortfolioCurve(equity, float(equity[-1] - 1), float(max_drawdown))
+
+def make_executor(kind='thread', max_workers=None):
+    """創建並行加載使用的執行器：'thread' 為線程池，'process' 為進程池"""
+    if kind == 'process':
+        # 與 simulation.run_simulation 相同：使用 spawn 啟動子進程，避免在多線程的界面進程中 fork
+        return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn'))
+    return ThreadPoolExecutor(max_workers)
+
+def load_portfolio(paths, kind='thread', max_workers=None):
+    """無界面地並行加載多個日誌，返回 (按輸入順序排列的結果, [(路徑, 錯誤信息)])"""
+    results = [None] * len(paths)
+    errors = []
+    with make_executor(kind, max_workers) as executor:
+        futures = {executor.submit(load_strategy, path): i for i, path in enumerate(paths)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except (OSError, ValueError) as e:
+                errors.append((paths[index], str(e)))
+    return [result for result in results if result is not None], errors
@@ -0,0 +1,122 @@
+# profiling.py
+#
+# 可選的性能埋點：在熱路徑上記錄計時區間（span），默認關閉，關閉時幾乎沒有開銷。
+#   with profiler.span('update_plot'):
+#       ...
+# 開啟方式：設置環境變量 TRR_PROFILE=1、啟動參數 --profile / --trace，或在界面「調試」菜單中開啟。
+# 記錄可導出為 Chrome Trace Event 格式的 JSON，用 chrome://tracing 或 Perfetto 離線分析。
+
+import os
+import json
+import time
+import functools
+import threading
+from collections import deque
+from contextlib import nullcontext
+
+# 環形緩衝區最多保留的區間數
+DEFAULT_CAPACITY = 100_000
+
+_NULL_SPAN = nullcontext()
+
+class SpanStats:
+    """單個區間名稱的匯總統計（秒）"""
+    __slots__ = ('count', 'total', 'last', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.max = max(self.max, duration)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """收集計時區間：保留最近的原始記錄用於導出，並按名稱維護匯總統計"""
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self.stats = {}
+        self.lock = threading.Lock()
+        # perf_counter 的起點，導出時換算為相對微秒
+        self.origin = time.perf_counter()
+
+    def span(self, name):
+        """返回計時上下文；未開啟時返回空上下文"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def wrap(self, name, fn):
+        """包裝函數，每次調用記錄一個區間（用於無法修改源碼的回調，如畫布重繪）"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def record(self, name, start, duration):
+        """記錄一個已完成的區間（可在任意線程調用）"""
+        with self.lock:
+            self.events.append((name, start, duration, threading.get_ident()))
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.add(duration)
+
+    def reset(self):
+        with self.lock:
+            self.events.clear()
+            self.stats.clear()
+            self.origin = time.perf_counter()
+
+    def summary(self, names=None, separator='  |  '):
+        """返回文本：各區間最近一次、平均和最大耗時（毫秒）"""
+        with self.lock:
+            items = [(name, self.stats[name]) for name in (names or self.stats) if name in self.stats]
+        return separator.join(f"{name} {s.last * 1000:.2f} / {s.mean * 1000:.2f} / {s.max * 1000:.2f} ms"
+                            for name, s in items)
+
+    def to_trace(self):
+        """轉換為 Chrome Trace Event 格式的字典"""
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            stats = {name: {'count': s.count, 'total_ms': s.total * 1000, 'mean_ms': s.mean * 1000,
+                            'max_ms': s.max * 1000}
+                     for name, s in self.stats.items()}
+        trace_events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                         'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6}
+                        for name, start, duration, tid in events]
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'summary': stats}
+
+    def dump_trace(self, path):
+        """將記錄寫入 JSON 追蹤文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_trace(), f)
+
+# 全局埋點實例
+profiler = Profiler(enabled=os.environ.get('TRR_PROFILE', '') not in ('', '0'))
@@ -0,0 +1,91 @@
+# report.py
+#
+# 無界面的批量分析命令：只依賴 numpy、data_processing 和 journal，不導入 Qt 或 matplotlib。
+#   python main.py report --mode risk --file risk_data.trj
+#   python report.py journals/*.trj --format text
+
+import sys
+import json
+import argparse
+import data_processing
+import journal
+
+def detect_mode(data):
+    """根據日誌文件頭推斷計算方式：記錄了初始資金或風險金額的是風險模式"""
+    if data.initial_capital or data.risk_per_trade:
+        return 'risk'
+    return 'standard'
+
+def standard_report(data):
+    """計算標準模式的指標"""
+    metrics = data_processing.MetricsAccumulator(data.returns)
+    return {
+        'mode': 'standard',
+        'trades': metrics.count,
+        'total_return_pct': float(metrics.total_return * 100) if metrics.count else 0.0,
+        'max_drawdown_pct': float(metrics.max_drawdown * 100),
+        'longest_profit_streak': metrics.longest_profit,
+        'longest_loss_streak': metrics.longest_loss,
+    }
+
+def risk_report(data):
+    """計算風險金額模式的指標"""
+    curve = data_processing.calculate_risk_curve(data.returns, data.initial_capital, journal.risk_amounts(data))
+    current_capital = curve.capital_curve[-1] if len(curve.capital_curve) else data.initial_capital
+    return {
+        'mode': 'risk',
+        'trades': len(curve.capital_curve),
+        'initial_capital': float(data.initial_capital),
+        'risk_per_trade': float(data.risk_per_trade),
+        'current_capital': float(current_capital),
+        'max_drawdown': float(curve.max_drawdown),
+        'longest_profit_streak': curve.longest_profit,
+        'longest_loss_streak': curve.longest_loss,
+    }
+
+def build_report(path, mode=None):
+    """以只讀方式加載日誌並返回指標字典"""
+    data = journal.open_journal(path)
+    mode = mode or detect_mode(data)
+    result = risk_report(data) if mode == 'risk' else standard_report(data)
+    return dict(file=path, **result)
+
+def format_text(result):
+    """將指標字典格式化為一行文本"""
+    fields = ', '.join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                       for key, value in result.items() if key != 'file')
+    return f"{result['file']}: {fields}"
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='report', description="無界面計算交易日誌的指標")
+    parser.add_argument('files', nargs='*', metavar='FILE', help="日誌文件（.trj 或舊版 .json）")
+    parser.add_argument('--file', dest='extra_files', action='append', default=[], metavar='FILE',
+                        help="日誌文件，可重複指定")
+    parser.add_argument('--mode', choices=['standard', 'risk'],
+                        help="計算方式；默認根據日誌文件頭推斷")
+    parser.add_argument('--format', choices=['json', 'text'], default='json',
+                        help="輸出格式：json 為每行一個 JSON 對象")
+    args = parser.parse_args(argv)
+    args.files = args.files + args.extra_files
+    if not args.files:
+        parser.error("請至少指定一個日誌文件")
+    return args
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    status = 0
+    for path in args.files:
+        try:
+            result = build_report(path, args.mode)
+        except (OSError, ValueError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if args.format == 'json':
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            print(format_text(result))
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
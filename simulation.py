@@ -0,0 +1,124 @@
+# simulation.py
+#
+# 風險金額模式的蒙特卡羅模擬：對已記錄的風險回報比序列做有放回抽樣（bootstrap）或重新排列（shuffle），
+# 以二維 NumPy 批次一次模擬多條資金路徑，得到最大回撤、最終資金和破產概率的分布以及分位數帶。
+# 路徑按塊計算以限制內存，可選在進程池中並行；不依賴 Qt。
+
+import os
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import data_processing
+
+METHODS = ('bootstrap', 'shuffle')
+DEFAULT_PATHS = 5000
+
+# 分位數帶使用的百分位
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# 計算破產概率的虧損比例（相對初始資金）
+RUIN_LEVELS = (0.25, 0.5, 1.0)
+
+# 每塊二維批次的內存上限（字節）
+CHUNK_BYTES = 64 * 2**20
+
+# 每條路徑最多保留的採樣點數，用於計算分位數帶
+BAND_POINTS = 400
+
+# 模擬的數值總量（路徑數 × 交易筆數）達到此值時才值得啟動進程池
+PROCESS_THRESHOLD = 50_000_000
+
+SimulationResult = namedtuple('SimulationResult', [
+    'method', 'paths', 'horizon', 'band_x', 'bands', 'max_drawdowns', 'final_capital',
+    'min_capital', 'initial_capital'
+])
+
+def chunk_sizes(paths, horizon, chunk_bytes=CHUNK_BYTES):
+    """按內存上限把路徑數拆分為若干塊"""
+    per_chunk = max(1, chunk_bytes // (max(horizon, 1) * 8))
+    sizes = [per_chunk] * (paths // per_chunk)
+    if paths % per_chunk:
+        sizes.append(paths % per_chunk)
+    return sizes
+
+def band_steps(horizon, points=BAND_POINTS):
+    """分位數帶的採樣位置（從0開始的交易序號），包含最後一筆"""
+    if horizon <= points:
+        return np.arange(horizon)
+    return np.unique(np.linspace(0, horizon - 1, points).round().astype(np.int64))
+
+def simulate_chunk(profits_losses, paths, horizon, method, initial_capital, seed, steps):
+    """模擬一塊路徑，返回 (最大回撤, 最終資金, 最低資金, 採樣點上的資金)"""
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        # 有放回抽樣：每條路徑獨立抽取 horizon 筆交易
+        capital = profits_losses[rng.integers(0, len(profits_losses), size=(paths, horizon))]
+    else:
+        # 重新排列：每條路徑是同一組交易的一個隨機順序
+        capital = np.tile(profits_losses, (paths, 1))
+        rng.permuted(capital, axis=1, out=capital)
+
+    # 原地把盈虧累加為資金路徑，回撤定義與 calculate_risk_curve 一致
+    np.cumsum(capital, axis=1, out=capital)
+    capital += initial_capital
+    peaks = np.maximum.accumulate(capital, axis=1)
+    max_drawdowns = (capital - peaks).min(axis=1)
+    return max_drawdowns, capital[:, -1].copy(), capital.min(axis=1), capital[:, steps]
+
+def default_processes(paths, horizon):
+    """計算量大且有多個 CPU 時返回進程數，否則返回 None（在當前線程中計算）"""
+    cpus = os.cpu_count() or 1
+    if cpus > 1 and paths * horizon >= PROCESS_THRESHOLD:
+        return cpus
+    return None
+
+def run_simulation(rr_ratios, initial_capital, risk_per_trade, paths=DEFAULT_PATHS, method='bootstrap',
+                   horizon=None, seed=None, processes=None, chunk_bytes=CHUNK_BYTES):
+    """對風險回報比序列做蒙特卡羅模擬
+
+    risk_per_trade 可以是固定金額或每筆的風險金額數組（抽樣的是按各自風險金額得出的盈虧）；
+    horizon 為每條路徑的交易筆數（默認與已記錄的筆數相同，shuffle 只能使用默認值）；
+    processes 為進程數，None 或 1 時在當前線程中逐塊計算。
+    """
+    if method not in METHODS:
+        raise ValueError(f"未知的模擬方式：{method}")
+    rr = np.asarray(rr_ratios, dtype=np.float64)
+    if len(rr) < 2:
+        raise ValueError("至少需要2筆交易才能模擬")
+    horizon = len(rr) if horizon is None or method == 'shuffle' else int(horizon)
+
+    profits_losses = data_processing.calculate_risk_curve(rr, initial_capital, risk_per_trade).profits_losses
+    steps = band_steps(horizon)
+    sizes = chunk_sizes(paths, horizon, chunk_bytes)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(profits_losses, size, horizon, method, initial_capital, chunk_seed, steps)
+            for size, chunk_seed in zip(sizes, seeds)]
+
+    if processes and processes > 1 and len(sizes) > 1:
+        # 使用 spawn 啟動子進程，避免在多線程的界面進程中 fork
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(min(processes, len(sizes)), mp_context=context) as executor:
+            chunks = list(executor.map(simulate_chunk, *zip(*args)))
+    else:
+        chunks = [simulate_chunk(*chunk_args) for chunk_args in args]
+
+    max_drawdowns, final_capital, min_capital, sampled = (np.concatenate(parts) for parts in zip(*chunks))
+    bands = np.percentile(sampled, PERCENTILES, axis=0)
+    return SimulationResult(method, paths, horizon, steps + 1, bands, max_drawdowns, final_capital,
+                            min_capital, initial_capital)
+
+def ruin_probability(result, loss_fraction):
+    """資金在任一時刻虧損達到初始資金 loss_fraction 比例的路徑佔比"""
+    threshold = result.initial_capital * (1 - loss_fraction)
+    return float((result.min_capital <= threshold).mean())
+
+def summarize(result):
+    """整理模擬結果的分布摘要，供界面和報告顯示"""
+    final = np.percentile(result.final_capital, PERCENTILES)
+    drawdown = np.percentile(result.max_drawdowns, PERCENTILES)
+    return {
+        'final_capital': dict(zip(PERCENTILES, final.tolist())),
+        'max_drawdown': dict(zip(PERCENTILES, drawdown.tolist())),
+        'ruin_probability': {level: ruin_probability(result, level) for level in RUIN_LEVELS},
+    }
@@ -0,0 +1,68 @@
+# start_window.py
+#
+# 開始界面只依賴 PyQt6，可以在 numpy、matplotlib 和主界面模塊加載之前立即顯示。
+
+from PyQt6.QtWidgets import QWidget, QLabel, QPushButton, QVBoxLayout, QComboBox
+
+# 定義主題樣式表
+light_style = """
+QWidget {
+    background-color: #ffffff;
+    color: #000000;
+}
+"""
+
+dark_style = """
+QWidget {
+    background-color: #2e2e2e;
+    color: #ffffff;
+}
+"""
+
+class StartWindow(QWidget):
+    """開始界面，讓用戶選擇計算方式、語言和主題"""
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("選擇設置")
+        self.setGeometry(100, 100, 400, 250)
+        layout = QVBoxLayout()
+
+        # 計算方式選擇
+        self.calc_label = QLabel("請選擇報酬率計算方式：")
+        self.calc_combo_box = QComboBox()
+        self.calc_combo_box.addItems(["標準累計收益率", "基於初始資金和固定風險金額", "多策略組合（多個日誌）"])
+
+        # 語言選擇
+        self.lang_label = QLabel("請選擇語言 / Language:")
+        self.lang_combo_box = QComboBox()
+        self.lang_combo_box.addItems(["中文", "English"])
+
+        # 主題選擇
+        self.theme_label = QLabel("請選擇主題 / Theme:")
+        self.theme_combo_box = QComboBox()
+        self.theme_combo_box.addItems(["淺色 / Light", "深色 / Dark"])
+
+        # 下一步按鈕
+        self.next_button = QPushButton("下一步 / Next")
+        self.next_button.clicked.connect(self.next_step)
+
+        layout.addWidget(self.calc_label)
+        layout.addWidget(self.calc_combo_box)
+        layout.addWidget(self.lang_label)
+        layout.addWidget(self.lang_combo_box)
+        layout.addWidget(self.theme_label)
+        layout.addWidget(self.theme_combo_box)
+        layout.addWidget(self.next_button)
+
+        self.setLayout(layout)
+
+        # 保存用戶選擇
+        self.selected_option = None
+        self.selected_language = '中文'
+        self.selected_theme = '淺色'
+
+    def next_step(self):
+        self.selected_option = self.calc_combo_box.currentIndex()
+        self.selected_language = self.lang_combo_box.currentText()
+        self.selected_theme = self.theme_combo_box.currentText()
+        self.close()
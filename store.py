@@ -0,0 +1,313 @@
+# store.py
+#
+# 可選的 SQLite 交易存儲：每筆交易一行（報酬率或風險回報比、時間戳、品種、標籤），
+# 時間戳、品種和標籤都建有索引，按日期範圍、品種和標籤篩選時只讀取匹配的行。
+# SqliteTradeLog 與 journal.TradeLog 接口相同，可在界面中直接替換；
+# 數據庫使用 WAL 模式，後台的只讀查詢不會阻塞寫入，批量寫入在少數幾個事務中完成。
+
+import os
+import sqlite3
+from collections import namedtuple
+import numpy as np
+import journal
+
+STANDARD_STORE = 'standard_data.db'
+RISK_STORE = 'risk_data.db'
+
+# 批量插入時每個事務寫入的行數
+BATCH_SIZE = 10_000
+
+# 交易按 id（即寫入順序）排列；時間戳為納秒，0 表示未知；risk 為該筆的風險金額，0 表示使用默認值
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    value REAL NOT NULL,
+    timestamp INTEGER NOT NULL DEFAULT 0,
+    symbol TEXT,
+    tag TEXT,
+    risk REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS trades_timestamp ON trades (timestamp);
+CREATE INDEX IF NOT EXISTS trades_symbol ON trades (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS trades_tag ON trades (tag, timestamp);
+"""
+
+# 查詢結果的行格式
+ROW_DTYPE = np.dtype([('value', np.float64), ('timestamp', np.int64), ('risk', np.float64)])
+
+# 篩選條件：start / end 為納秒時間戳（包含 start，不包含 end），None 表示不限
+TradeFilter = namedtuple('TradeFilter', ['start', 'end', 'symbol', 'tag'], defaults=(None, None, None, None))
+
+def filter_clause(trade_filter):
+    """把篩選條件轉換為 WHERE 子句和參數"""
+    if trade_filter is None:
+        return '', ()
+    conditions, params = [], []
+    if trade_filter.start is not None:
+        conditions.append('timestamp >= ?')
+        params.append(int(trade_filter.start))
+    if trade_filter.end is not None:
+        conditions.append('timestamp < ?')
+        params.append(int(trade_filter.end))
+    if trade_filter.symbol is not None:
+        conditions.append('symbol = ?')
+        params.append(trade_filter.symbol)
+    if trade_filter.tag is not None:
+        conditions.append('tag = ?')
+        params.append(trade_filter.tag)
+    if not conditions:
+        return '', ()
+    return ' WHERE ' + ' AND '.join(conditions), tuple(params)
+
+def filter_matches(trade_filter, timestamp=0, symbol=None, tag=None):
+    """判斷一筆交易是否符合篩選條件（用於新提交的交易，無需查詢數據庫）"""
+    if trade_filter is None:
+        return True
+    return ((trade_filter.start is None or timestamp >= trade_filter.start)
+            and (trade_filter.end is None or timestamp < trade_filter.end)
+            and (trade_filter.symbol is None or symbol == trade_filter.symbol)
+            and (trade_filter.tag is None or tag == trade_filter.tag))
+
+def connect(path, readonly=False):
+    """打開數據庫；可寫連接會開啟 WAL 模式並建立表和索引"""
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # WAL 模式下 NORMAL 只在檢查點時同步，斷電最多丟失最近的事務，數據庫不會損壞
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    if not has_risk_column(conn):
+        # 早期版本建立的數據庫沒有風險金額列
+        with conn:
+            conn.execute('ALTER TABLE trades ADD COLUMN risk REAL NOT NULL DEFAULT 0')
+    return conn
+
+def has_risk_column(conn):
+    """trades 表是否有風險金額列"""
+    return any(row[1] == 'risk' for row in conn.execute('PRAGMA table_info(trades)'))
+
+def read_settings(conn):
+    """返回 (初始資金, 每筆風險金額)"""
+    settings = dict(conn.execute('SELECT key, value FROM settings'))
+    return settings.get('initial_capital', 0.0), settings.get('risk_per_trade', 0.0)
+
+def query_trades(conn, trade_filter=None):
+    """按篩選條件讀取交易，返回 journal.Journal
+
+    先按同樣的條件計數，再把游標直接流式寫入預先分配的結構化數組，只讀取匹配的行。
+    """
+    where, params = filter_clause(trade_filter)
+    count = conn.execute('SELECT COUNT(*) FROM trades' + where, params).fetchone()[0]
+    # 只讀打開早期版本的數據庫時沒有風險金額列，按0讀取
+    risk = 'risk' if has_risk_column(conn) else '0'
+    cursor = conn.execute(f'SELECT value, timestamp, {risk} FROM trades' + where + ' ORDER BY id', params)
+    rows = np.fromiter(cursor, dtype=ROW_DTYPE, count=count)
+    timestamps = rows['timestamp'] if rows['timestamp'].any() else None
+    risks = rows['risk'] if rows['risk'].any() else None
+    return journal.Journal(*read_settings(conn), np.ascontiguousarray(rows['value']),
+                           None if timestamps is None else np.ascontiguousarray(timestamps),
+                           None if risks is None else np.ascontiguousarray(risks))
+
+def distinct_values(conn, column):
+    """返回某一列（symbol 或 tag）中出現過的非空值，利用索引無需掃描全表"""
+    if column not in ('symbol', 'tag'):
+        raise ValueError(f"未知的列：{column}")
+    return [row[0] for row in conn.execute(
+        f'SELECT DISTINCT {column} FROM trades WHERE {column} IS NOT NULL ORDER BY {column}')]
+
+def open_store(path, trade_filter=None):
+    """以只讀方式打開數據庫並讀取（篩選後的）交易"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    conn = connect(path, readonly=True)
+    try:
+        return query_trades(conn, trade_filter)
+    finally:
+        conn.close()
+
+class SqliteTradeLog:
+    """SQLite 交易存儲，接口與 journal.TradeLog 相同（不提供整體替換交易的 rewrite）
+
+    legacy_path 為同一模式的二進制日誌；數據庫不存在而日誌存在時，首次打開會把日誌導入數據庫，
+    原日誌改名為 .bak 保留。設置篩選條件後，load() 只返回匹配的交易。
+    """
+    def __init__(self, path, initial_capital=0.0, risk_per_trade=0.0, legacy_path=None):
+        self.path = path
+        self.initial_capital = initial_capital
+        self.risk_per_trade = risk_per_trade
+        self.legacy_path = legacy_path
+        self.trade_filter = None
+        self._conn = None
+        # 與 TradeLog 相同：加載、修改、清除或改變篩選條件時遞增
+        self.version = 0
+
+    @property
+    def conn(self):
+        """可寫連接；首次使用時建立數據庫，並在需要時導入舊日誌"""
+        if self._conn is None:
+            migrate = (not os.path.exists(self.path) and self.legacy_path is not None
+                       and journal.journal_exists(self.legacy_path))
+            self._conn = connect(self.path)
+            if migrate:
+                self._migrate()
+            elif not self._conn.execute('SELECT COUNT(*) FROM settings').fetchone()[0]:
+                self._write_settings()
+        return self._conn
+
+    def _write_settings(self):
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                                   (('initial_capital', float(self.initial_capital)),
+                                    ('risk_per_trade', float(self.risk_per_trade))))
+
+    def _migrate(self):
+        """把二進制日誌（含未合併的預寫日誌）導入數據庫"""
+        data = journal.open_journal(self.legacy_path)
+        self.initial_capital = data.initial_capital
+        self.risk_per_trade = data.risk_per_trade
+        self._write_settings()
+        self._insert(data.returns, data.timestamps, risks=data.risks)
+        for path in (self.legacy_path, self.legacy_path + '.wal', journal.legacy_json_path(self.legacy_path)):
+            if os.path.exists(path):
+                os.replace(path, path + '.bak')
+
+    def _insert(self, values, timestamps=None, symbols=None, tags=None, risks=None):
+        """分批插入交易，每批一個事務"""
+        conn = self.conn
+        n = len(values)
+        for start in range(0, n, BATCH_SIZE):
+            stop = min(start + BATCH_SIZE, n)
+            rows = zip(np.asarray(values[start:stop], dtype=np.float64).tolist(),
+                       [0] * (stop - start) if timestamps is None
+                       else np.asarray(timestamps[start:stop], dtype=np.int64).tolist(),
+                       [None] * (stop - start) if symbols is None else symbols[start:stop],
+                       [None] * (stop - start) if tags is None else tags[start:stop],
+                       [0.0] * (stop - start) if risks is None
+                       else np.asarray(risks[start:stop], dtype=np.float64).tolist())
+            with conn:
+                conn.executemany(
+                    'INSERT INTO trades (value, timestamp, symbol, tag, risk) VALUES (?, ?, ?, ?, ?)', rows)
+
+    def load(self):
+        """讀取（篩選後的）交易，返回 journal.Journal；數據庫和舊日誌都不存在時拋出 FileNotFoundError"""
+        if not os.path.exists(self.path) and not (
+                self.legacy_path is not None and journal.journal_exists(self.legacy_path)):
+            raise FileNotFoundError(self.path)
+        data = query_trades(self.conn, self.trade_filter)
+        self.version += 1
+        self.initial_capital = data.initial_capital
+        self.risk_per_trade = data.risk_per_trade
+        return data
+
+    def set_filter(self, trade_filter):
+        """設置篩選條件（None 表示全部交易），下一次 load() 生效"""
+        self.trade_filter = trade_filter
+
+    def distinct(self, column):
+        """已記錄的品種或標籤"""
+        if not os.path.exists(self.path):
+            return []
+        return distinct_values(self.conn, column)
+
+    def append(self, value, timestamp=0, symbol=None, tag=None, risk=0.0):
+        """追加一筆交易（一個事務）"""
+        with self.conn:
+            self.conn.execute('INSERT INTO trades (value, timestamp, symbol, tag, risk) VALUES (?, ?, ?, ?, ?)',
+                              (float(value), int(timestamp), symbol, tag, float(risk)))
+
+    def extend(self, values, timestamps=None, symbols=None, tags=None, risks=None, compact=True):
+        """批量追加交易；每批已各自提交，compact 參數只為與 TradeLog.extend 的接口一致"""
+        self._insert(values, timestamps, symbols, tags, risks)
+
+    def _row_id(self, index):
+        """當前（篩選後的）第 index 筆交易在表中的 id"""
+        where, params = filter_clause(self.trade_filter)
+        row = self.conn.execute('SELECT id FROM trades' + where + ' ORDER BY id LIMIT 1 OFFSET ?',
+                                params + (index,)).fetchone()
+        if row is None:
+            raise IndexError('trade index out of range')
+        return row[0]
+
+    def update(self, index, value):
+        """修改當前（篩選後的）第 index 筆交易"""
+        row_id = self._row_id(index)
+        self.version += 1
+        with self.conn:
+            self.conn.execute('UPDATE trades SET value = ? WHERE id = ?', (float(value), row_id))
+
+    def insert(self, index, value, timestamp=None, symbol=None, tag=None, risk=0.0):
+        """在當前（篩選後的）第 index 筆之前插入一筆交易
+
+        timestamp 為 None 時沿用插入位置上原有交易的時間戳（插在末尾時沿用最後一筆），
+        這樣在按日期篩選的視圖中插入的交易仍在篩選範圍內。
+        """
+        where, params = filter_clause(self.trade_filter)
+        count = self.conn.execute('SELECT COUNT(*) FROM trades' + where, params).fetchone()[0]
+        if not 0 <= index <= count:
+            raise IndexError('trade index out of range')
+        neighbour = self._row_id(min(index, count - 1)) if count else None
+        if timestamp is None:
+            timestamp = 0 if neighbour is None else self.conn.execute(
+                'SELECT timestamp FROM trades WHERE id = ?', (neighbour,)).fetchone()[0]
+        self.version += 1
+        with self.conn:
+            if index < count:
+                # 把插入位置及之後的 id 加1，騰出位置；先取負數避免主鍵衝突
+                self.conn.execute('UPDATE trades SET id = -(id + 1) WHERE id >= ?', (neighbour,))
+                self.conn.execute('UPDATE trades SET id = -id WHERE id < 0')
+                self.conn.execute(
+                    'INSERT INTO trades (id, value, timestamp, symbol, tag, risk) VALUES (?, ?, ?, ?, ?, ?)',
+                    (neighbour, float(value), int(timestamp), symbol, tag, float(risk)))
+            else:
+                self.conn.execute('INSERT INTO trades (value, timestamp, symbol, tag, risk) VALUES (?, ?, ?, ?, ?)',
+                                  (float(value), int(timestamp), symbol, tag, float(risk)))
+
+    def delete(self, index):
+        """刪除當前（篩選後的）第 index 筆交易"""
+        row_id = self._row_id(index)
+        self.version += 1
+        with self.conn:
+            self.conn.execute('DELETE FROM trades WHERE id = ?', (row_id,))
+
+    def set_risks(self, risks):
+        """替換當前（篩選後的）全部交易的風險金額，其他交易不受影響"""
+        where, params = filter_clause(self.trade_filter)
+        ids = [row[0] for row in self.conn.execute('SELECT id FROM trades' + where + ' ORDER BY id', params)]
+        if len(ids) != len(risks):
+            raise ValueError("風險金額數量必須與交易筆數一致")
+        self.version += 1
+        with self.conn:
+            self.conn.executemany('UPDATE trades SET risk = ? WHERE id = ?',
+                                  zip(np.asarray(risks, dtype=np.float64).tolist(), ids))
+
+    def compact(self):
+        """把 WAL 文件中的頁面寫回數據庫並截斷 WAL 文件"""
+        self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def clear(self):
+        """刪除當前（篩選後的）全部交易；沒有篩選條件時刪除數據庫及其 WAL 文件"""
+        where, params = filter_clause(self.trade_filter)
+        self.version += 1
+        if where:
+            with self.conn:
+                self.conn.execute('DELETE FROM trades' + where, params)
+            return
+        self.close_connection()
+        for path in (self.path, self.path + '-wal', self.path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close_connection(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self):
+        """關閉存儲；確保數據庫存在，以便下次啟動時保留初始設置"""
+        self.compact()
+        self.close_connection()
@@ -0,0 +1,38 @@
+# tests/test_data_processing.py
+#
+# 指標計算的回歸測試：python -m unittest discover tests
+
+import unittest
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import data_processing
+
+class RollingStatsTest(unittest.TestCase):
+    def test_matches_direct_computation(self):
+        x = np.random.default_rng(0).normal(size=1000)
+        for window in (2, 7, 50, 999, 1000):
+            windows = sliding_window_view(x, window)
+            stats = data_processing.calculate_rolling_stats(x, window)
+            np.testing.assert_allclose(stats.expectancy, windows.mean(axis=1), rtol=1e-10, atol=1e-14)
+            np.testing.assert_allclose(stats.volatility, windows.std(axis=1, ddof=1), rtol=1e-10)
+            np.testing.assert_allclose(stats.win_rate, (windows > 0).mean(axis=1))
+
+    def test_mixed_scale_volatility(self):
+        # 大數值之後的小數值窗口仍應得到正確的波動率，而不是被舍入誤差淹沒或歸零
+        rng = np.random.default_rng(1)
+        x = np.concatenate((1000 + rng.normal(size=500), 1e-6 * rng.normal(size=500)))
+        stats = data_processing.calculate_rolling_stats(x, 20)
+        expected = sliding_window_view(x, 20).std(axis=1, ddof=1)
+        np.testing.assert_allclose(stats.volatility, expected, rtol=1e-8)
+        self.assertTrue((stats.volatility > 0).all())
+
+    def test_constant_window(self):
+        # 窗口內數值全部相同時波動率為0，夏普比率為 nan
+        x = np.concatenate(([5.0, -3.0, 1e6], np.full(30, 0.1)))
+        stats = data_processing.calculate_rolling_stats(x, 10)
+        self.assertEqual(stats.volatility[-1], 0.0)
+        self.assertTrue(np.isnan(stats.sharpe[-1]))
+        self.assertAlmostEqual(stats.expectancy[-1], 0.1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# tests/test_importer.py
+#
+# CSV 導入的回歸測試：python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+import importer
+
+class ReadCsvChunksTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'trades.csv')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_no_data_rows(self):
+        # 第一行不是數字時被當作表頭；之後沒有任何數據行時應報錯，而不是導入0筆
+        for text in ('1;2\n', 'value\n', ''):
+            self.write(text)
+            with self.assertRaises(ValueError):
+                list(importer.import_chunks(self.path, 'risk'))
+
+    def test_header_and_rows(self):
+        self.write('value\n1.5\n2\n')
+        chunks = list(importer.import_chunks(self.path, 'standard'))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(list(chunks[0][0]), [0.015, 0.02])
+        self.assertIsNone(chunks[0][1])
+
+if __name__ == '__main__':
+    unittest.main()
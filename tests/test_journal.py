@@ -0,0 +1,84 @@
+# tests/test_journal.py
+#
+# 二進制日誌和預寫日誌的回歸測試：python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import journal
+
+class TradeLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'test.trj')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_after_torn_wal_tail(self):
+        # 崩潰時預寫日誌末尾只寫了半條記錄，之後追加的記錄仍應正確讀回
+        journal.write_journal(self.path, [])
+        log = journal.TradeLog(self.path, compact_every=100)
+        log.load()
+        log.append(0.1, 1)
+        log.append(0.2, 2)
+        log.close_wal()
+        with open(self.path + '.wal', 'ab') as f:
+            f.write(b'\x01\x02\x03')
+
+        log = journal.TradeLog(self.path, compact_every=100)
+        self.assertEqual(list(log.load().returns), [0.1, 0.2])
+        log.append(0.3, 3)
+        log.close_wal()
+        data = journal.open_journal(self.path)
+        self.assertEqual(list(data.returns), [0.1, 0.2, 0.3])
+        self.assertEqual(list(data.timestamps), [1, 2, 3])
+
+    def test_append_after_torn_wal_header(self):
+        # 文件頭只寫了一部分時重新寫入文件頭
+        journal.write_journal(self.path, [0.1])
+        with open(self.path + '.wal', 'wb') as f:
+            f.write(journal.WAL_MAGIC)
+        log = journal.TradeLog(self.path)
+        log.load()
+        log.append(0.2)
+        log.close_wal()
+        self.assertEqual(list(journal.open_journal(self.path).returns), [0.1, 0.2])
+
+    def test_compact_with_timestamps_appends_in_place(self):
+        # 有時間戳和風險金額列時，合併只寫入各列的空位，不重寫（替換）已有的日誌文件
+        journal.write_journal(self.path, [], 1000.0, 10.0)
+        log = journal.TradeLog(self.path, compact_every=100)
+        log.load()
+        log.extend([0.1, 0.2], [1, 2], [5.0, 0.0])
+        # 保持舊文件打開，使其 inode 不會被新文件重用
+        with open(self.path, 'rb') as before:
+            for i in range(3, 11):
+                log.append(i / 10, i, float(i))
+            log.compact()
+            self.assertEqual(os.fstat(before.fileno()).st_ino, os.stat(self.path).st_ino)
+
+        data = journal.open_journal(self.path)
+        self.assertEqual(list(data.returns), [i / 10 for i in range(1, 11)])
+        self.assertEqual(list(data.timestamps), list(range(1, 11)))
+        self.assertEqual(list(data.risks), [5.0, 0.0] + [float(i) for i in range(3, 11)])
+
+    def test_read_version1_journal(self):
+        # 版本1的日誌（32 字節文件頭、各列緊密相連）仍可讀取，合併時升級為新版本
+        with open(self.path, 'wb') as f:
+            f.write(journal.HEADER_V1.pack(journal.MAGIC, 1, journal.FLAG_TIMESTAMPS, 2, 1000.0, 10.0))
+            np.array([0.1, 0.2], dtype='<f8').tofile(f)
+            np.array([1, 2], dtype='<i8').tofile(f)
+        log = journal.TradeLog(self.path)
+        self.assertEqual(list(log.load().timestamps), [1, 2])
+        log.append(0.3, 3)
+        log.compact()
+        self.assertEqual(journal.read_header(self.path).version, journal.VERSION)
+        data = journal.open_journal(self.path)
+        self.assertEqual(list(data.returns), [0.1, 0.2, 0.3])
+        self.assertEqual(list(data.timestamps), [1, 2, 3])
+        self.assertEqual(data.initial_capital, 1000.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+# tests/test_portfolio.py
+#
+# 多策略組合的回歸測試：python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+import journal
+import portfolio
+import store
+
+class FindJournalsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lists_sqlite_stores(self):
+        # .trj、.db 和沒有對應 .trj 的舊版 .json 都會列出，並且都可以加載
+        journal.write_journal(os.path.join(self.dir, 'a.trj'), [0.1, -0.05])
+        log = store.SqliteTradeLog(os.path.join(self.dir, 'b.db'))
+        log.extend([0.2, 0.1])
+        log.close()
+        for name in ('a.json', 'c.json', 'notes.txt'):
+            with open(os.path.join(self.dir, name), 'w') as f:
+                f.write('{"returns": [0.3]}')
+
+        paths = portfolio.find_journals(self.dir)
+        self.assertEqual([os.path.basename(p) for p in paths], ['a.trj', 'b.db', 'c.json'])
+        result = portfolio.load_strategy(paths[1])
+        self.assertEqual(result.name, 'b')
+        self.assertEqual(result.trades, 2)
+        self.assertAlmostEqual(result.total_return, 1.2 * 1.1 - 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# tests/test_store.py
+#
+# SQLite 交易存儲的回歸測試：python -m unittest discover tests
+
+import os
+import tempfile
+import unittest
+import store
+
+class SqliteTradeLogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'test.db')
+        self.log = store.SqliteTradeLog(self.path, 1000.0, 10.0)
+        self.log.extend([1.0, 2.0, 3.0, 4.0], [10, 20, 30, 40], ['A', 'B', 'A', 'B'], ['x', 'y', 'y', 'x'])
+
+    def tearDown(self):
+        self.log.close_connection()
+        self.tmp.cleanup()
+
+    def test_clear_under_filter(self):
+        # 篩選條件下清除只刪除匹配的交易，其他交易連同品種、標籤和時間戳保持不變
+        self.log.set_filter(store.TradeFilter(symbol='A'))
+        self.log.clear()
+        self.assertEqual(len(self.log.load().returns), 0)
+
+        self.log.set_filter(None)
+        data = self.log.load()
+        self.assertEqual(list(data.returns), [2.0, 4.0])
+        self.assertEqual(list(data.timestamps), [20, 40])
+        self.assertEqual(self.log.distinct('symbol'), ['B'])
+        self.assertEqual(self.log.distinct('tag'), ['x', 'y'])
+        self.assertEqual(data.initial_capital, 1000.0)
+
+    def test_clear_without_filter(self):
+        # 沒有篩選條件時刪除整個數據庫
+        self.log.clear()
+        self.assertFalse(os.path.exists(self.path))
+
+if __name__ == '__main__':
+    unittest.main()
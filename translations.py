@@ -39,6 +39,109 @@ translations = {
         'negative_rr_error': "風險回報比不能為負數。",
                 'clear_history': '清除歷史記錄',
         'confirm_clear_history': '您確定要清除所有歷史記錄嗎？此操作無法撤銷。',
+        'confirm_clear_filtered': '您確定要刪除當前篩選出的全部交易嗎？篩選範圍外的交易不受影響，此操作無法撤銷。',
+        'file': "文件",
+        'import_csv': "導入 CSV",
+        'import_done': "已導入 {} 筆交易。",
+        'import_failed': "導入中止，之前的 {} 筆交易已保存：\n{}",
+        'debug': "調試",
+        'perf_overlay': "性能覆蓋層",
+        'perf_legend': "耗時 ms（最近 / 平均 / 最大）：",
+        'save_trace': "導出性能追蹤…",
+        'trace_saved': "已導出 {} 條記錄到 {}",
+        'portfolio_mode': "交易報酬率記錄 - 多策略組合",
+        'strategies': "策略",
+        'open_journals': "打開日誌…",
+        'open_folder': "打開文件夾…",
+        'journal_filter': "交易日誌 (*.trj *.db *.json);;所有文件 (*)",
+        'col_strategy': "策略",
+        'col_mode': "計算方式",
+        'col_trades': "交易筆數",
+        'col_return': "收益率（%）",
+        'col_drawdown': "最大回撤（%）",
+        'col_streaks': "最長連續獲利 / 虧損",
+        'mode_standard': "標準",
+        'mode_risk': "風險金額",
+        'loading_progress': "正在加載日誌：{} / {}",
+        'loaded_count': "已加載 {} 個日誌",
+        'load_failed': "以下日誌加載失敗：\n{}",
+        'portfolio_return': "組合收益率：{:.2f}%",
+        'portfolio_curve': "組合（等權）",
+        'chart_title_portfolio': "組合收益率曲線",
+        'y_label_portfolio': "收益率（%）",
+        'rolling_window': "滾動窗口",
+        'rolling_custom': "自定義…",
+        'rolling_window_prompt': "每個滾動窗口的交易筆數：",
+        'rolling_title': "最近 {} 筆交易：",
+        'rolling_expectancy': "期望值：{}",
+        'rolling_volatility': "波動率：{}",
+        'rolling_sharpe': "夏普比率：{}",
+        'rolling_sortino': "索提諾比率：{}",
+        'rolling_win_rate': "勝率：{}",
+        'simulation': "模擬",
+        'mc_bootstrap': "蒙特卡羅模擬（有放回抽樣）…",
+        'mc_shuffle': "蒙特卡羅模擬（重新排列順序）…",
+        'mc_clear': "清除模擬結果",
+        'method_bootstrap': "有放回抽樣",
+        'method_shuffle': "重新排列",
+        'mc_paths_prompt': "模擬路徑數：",
+        'mc_not_enough': "至少需要2筆交易才能模擬。",
+        'mc_running': "正在模擬 {} 條路徑…",
+        'mc_title': "蒙特卡羅模擬：{} 條路徑（{}），每條 {} 筆交易",
+        'mc_final': "最終資金：中位數 {:.2f}（5%–95%：{:.2f} – {:.2f}）",
+        'mc_drawdown': "最大回撤：中位數 {:.2f}，最差 5%：{:.2f}",
+        'mc_ruin': "資金虧損達初始資金的比例 → 概率：{}",
+        'mc_bands': "圖中陰影為 5%–95% 和 25%–75% 分位數帶，虛線為中位數。",
+        'drawdown_title': "最大回撤區間（前 {} 個，雙擊縮放）",
+        'drawdown_item': "{}. {}：第 {} 筆 → {}（谷底第 {} 筆）",
+        'drawdown_open': "未恢復",
+        'symbol_placeholder': "品種（可選）",
+        'tag_placeholder': "標籤（可選）",
+        'filter_menu': "篩選",
+        'filter_trades': "篩選交易",
+        'filter_clear': "顯示全部交易",
+        'filter_from': "起始日期",
+        'filter_to': "結束日期",
+        'filter_symbol': "品種",
+        'filter_tag': "標籤",
+        'filter_any': "全部",
+        'trade_record_filtered': "交易記錄（已篩選）",
+        'edit_trade': "修改交易",
+        'insert_trade': "在此前插入交易",
+        'delete_trade': "刪除交易",
+        'confirm_delete_trade': "確定要刪除第 {} 筆交易嗎？",
+        'view_menu': "視圖",
+        'period_stats': "週期統計",
+        'period_day': "按日",
+        'period_week': "按週",
+        'period_month': "按月",
+        'period_metric_return': "複利收益率（%）",
+        'period_metric_pnl': "報酬率之和（%）",
+        'period_metric_count': "交易筆數",
+        'period_metric_drawdown': "週期內最大回撤（%）",
+        'period_view_bars': "柱狀圖",
+        'period_view_heatmap': "日曆熱圖",
+        'period_empty': "沒有帶時間的交易",
+        'period_summary': "週期數：{}，盈利週期：{}，最佳：{:.2f}%，最差：{:.2f}%",
+        'weekday_labels': "一,二,三,四,五,六,日",
+        'month_labels': "1月,2月,3月,4月,5月,6月,7月,8月,9月,10月,11月,12月",
+        'r_distribution': "R 倍數分布",
+        'r_axis': "R 倍數",
+        'r_count': "交易筆數",
+        'r_cdf': "累積比例（%）",
+        'r_summary': "筆數：{}，平均：{:.2f}R，中位數：{:.2f}R，P10：{:.2f}R，P90：{:.2f}R，勝率：{:.1f}%",
+        'risk_amount_placeholder': "風險金額（留空為默認，如 50 或 2%）",
+        'sizing_whatif': "倉位假設分析...",
+        'sizing_title': "倉位假設分析",
+        'sizing_fixed': "固定金額",
+        'sizing_fraction': "固定比例（%，複利）",
+        'sizing_value': "每筆風險金額或資金比例（%）：",
+        'sizing_preview': "預覽",
+        'sizing_apply': "應用到全部歷史",
+        'sizing_close': "關閉",
+        'sizing_summary': "假設最終資金：{:.2f}（當前 {:.2f}）\n假設最大回撤：{:.2f}（當前 {:.2f}）",
+        'sizing_confirm': "按新的倉位規則重寫全部 {} 筆交易的風險金額？",
+        'sizing_no_trades': "沒有可重算的交易。",
     },
     'English': {
         'title': "Trading Return Recorder",
@@ -78,5 +181,108 @@ translations = {
         'negative_rr_error': "Risk-reward ratio cannot be negative.",
                 'clear_history': 'Clear History',
         'confirm_clear_history': 'Are you sure you want to clear all history? This action cannot be undone.',
+        'confirm_clear_filtered': 'Are you sure you want to delete all trades in the current filter? Trades outside the filter are kept. This action cannot be undone.',
+        'file': "File",
+        'import_csv': "Import CSV",
+        'import_done': "Imported {} trades.",
+        'import_failed': "Import stopped; the {} trades before the error were saved:\n{}",
+        'debug': "Debug",
+        'perf_overlay': "Performance Overlay",
+        'perf_legend': "ms (last / avg / max): ",
+        'save_trace': "Export Performance Trace…",
+        'trace_saved': "Exported {} spans to {}",
+        'portfolio_mode': "Trading Return Recorder - Portfolio",
+        'strategies': "Strategies",
+        'open_journals': "Open Journals…",
+        'open_folder': "Open Folder…",
+        'journal_filter': "Trade journals (*.trj *.db *.json);;All files (*)",
+        'col_strategy': "Strategy",
+        'col_mode': "Mode",
+        'col_trades': "Trades",
+        'col_return': "Return (%)",
+        'col_drawdown': "Max Drawdown (%)",
+        'col_streaks': "Longest Win / Loss Streak",
+        'mode_standard': "Standard",
+        'mode_risk': "Risk-based",
+        'loading_progress': "Loading journals: {} / {}",
+        'loaded_count': "Loaded {} journals",
+        'load_failed': "Failed to load the following journals:\n{}",
+        'portfolio_return': "Portfolio Return: {:.2f}%",
+        'portfolio_curve': "Portfolio (equal weight)",
+        'chart_title_portfolio': "Portfolio Return Curve",
+        'y_label_portfolio': "Return (%)",
+        'rolling_window': "Rolling Window",
+        'rolling_custom': "Custom…",
+        'rolling_window_prompt': "Trades per rolling window:",
+        'rolling_title': "Last {} trades:",
+        'rolling_expectancy': "Expectancy: {}",
+        'rolling_volatility': "Volatility: {}",
+        'rolling_sharpe': "Sharpe Ratio: {}",
+        'rolling_sortino': "Sortino Ratio: {}",
+        'rolling_win_rate': "Win Rate: {}",
+        'simulation': "Simulation",
+        'mc_bootstrap': "Monte Carlo (Bootstrap)…",
+        'mc_shuffle': "Monte Carlo (Reshuffle)…",
+        'mc_clear': "Clear Simulation",
+        'method_bootstrap': "bootstrap",
+        'method_shuffle': "reshuffle",
+        'mc_paths_prompt': "Number of simulated paths:",
+        'mc_not_enough': "At least 2 trades are needed for a simulation.",
+        'mc_running': "Simulating {} paths…",
+        'mc_title': "Monte Carlo: {} paths ({}), {} trades each",
+        'mc_final': "Final capital: median {:.2f} (5%–95%: {:.2f} – {:.2f})",
+        'mc_drawdown': "Max drawdown: median {:.2f}, worst 5%: {:.2f}",
+        'mc_ruin': "Loss of initial capital → probability: {}",
+        'mc_bands': "Shaded: 5%–95% and 25%–75% percentile bands; dashed: median.",
+        'drawdown_title': "Largest Drawdowns (top {}, double-click to zoom)",
+        'drawdown_item': "{}. {}: trade {} → {} (trough {})",
+        'drawdown_open': "not recovered",
+        'symbol_placeholder': "Symbol (optional)",
+        'tag_placeholder': "Tag (optional)",
+        'filter_menu': "Filter",
+        'filter_trades': "Filter Trades",
+        'filter_clear': "Show All Trades",
+        'filter_from': "From",
+        'filter_to': "To",
+        'filter_symbol': "Symbol",
+        'filter_tag': "Tag",
+        'filter_any': "Any",
+        'trade_record_filtered': "Trade Records (filtered)",
+        'edit_trade': "Edit Trade",
+        'insert_trade': "Insert Trade Before",
+        'delete_trade': "Delete Trade",
+        'confirm_delete_trade': "Are you sure you want to delete trade {}?",
+        'view_menu': "View",
+        'period_stats': "Period Statistics",
+        'period_day': "Daily",
+        'period_week': "Weekly",
+        'period_month': "Monthly",
+        'period_metric_return': "Compounded Return (%)",
+        'period_metric_pnl': "Sum of Returns (%)",
+        'period_metric_count': "Trades",
+        'period_metric_drawdown': "Max Intraperiod Drawdown (%)",
+        'period_view_bars': "Bar Chart",
+        'period_view_heatmap': "Calendar Heatmap",
+        'period_empty': "No timestamped trades",
+        'period_summary': "Periods: {}, profitable: {}, best: {:.2f}%, worst: {:.2f}%",
+        'weekday_labels': "Mon,Tue,Wed,Thu,Fri,Sat,Sun",
+        'month_labels': "Jan,Feb,Mar,Apr,May,Jun,Jul,Aug,Sep,Oct,Nov,Dec",
+        'r_distribution': "R-Multiple Distribution",
+        'r_axis': "R-Multiple",
+        'r_count': "Trades",
+        'r_cdf': "Cumulative (%)",
+        'r_summary': "Trades: {}, mean: {:.2f}R, median: {:.2f}R, P10: {:.2f}R, P90: {:.2f}R, win rate: {:.1f}%",
+        'risk_amount_placeholder': "Risk amount (blank for default, e.g. 50 or 2%)",
+        'sizing_whatif': "Position Sizing What-if...",
+        'sizing_title': "Position Sizing What-if",
+        'sizing_fixed': "Fixed amount",
+        'sizing_fraction': "Fixed fraction (%, compounding)",
+        'sizing_value': "Risk amount per trade or fraction of capital (%):",
+        'sizing_preview': "Preview",
+        'sizing_apply': "Apply to All History",
+        'sizing_close': "Close",
+        'sizing_summary': "What-if final capital: {:.2f} (current {:.2f})\nWhat-if max drawdown: {:.2f} (current {:.2f})",
+        'sizing_confirm': "Rewrite the risk amount of all {} trades with the new sizing rule?",
+        'sizing_no_trades': "There are no trades to re-size.",
     }
 }
@@ -0,0 +1,140 @@
+# workers.py
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from profiling import profiler
+
+class TaskSignals(QObject):
+    """後台任務的信號：完成時返回 (代數, 結果)，失敗時返回 (代數, 錯誤信息)"""
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+class ComputeTask(QRunnable):
+    """在線程池中執行的計算任務"""
+    def __init__(self, generation, fn, args):
+        super().__init__()
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            with profiler.span(f"worker.{getattr(self.fn, '__name__', 'task')}"):
+                result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+        else:
+            self.signals.finished.emit(self.generation, result)
+
+class BackgroundComputer(QObject):
+    """把耗時計算放到 QThreadPool 執行；以代數計數丟棄過期的結果
+
+    每次 submit 都會使之前尚未返回的任務過期，主線程只收到最新一次提交的結果。
+    任務參數必須是提交時的數據快照，不能在後台修改。
+    """
+    result_ready = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.generation = 0
+        self.tasks = {}
+
+    def submit(self, fn, *args):
+        """提交新的計算任務，返回其代數"""
+        self.generation += 1
+        task = ComputeTask(self.generation, fn, args)
+        task.signals.finished.connect(self.on_finished)
+        task.signals.failed.connect(self.on_failed)
+        # 保留任務引用，直到結果送回主線程
+        self.tasks[self.generation] = task
+        self.pool.start(task)
+        return self.generation
+
+    def cancel(self):
+        """使所有尚未返回的任務過期"""
+        self.generation += 1
+
+    @property
+    def busy(self):
+        """是否有尚未返回的最新任務"""
+        return self.generation in self.tasks
+
+    def on_finished(self, generation, result):
+        self.tasks.pop(generation, None)
+        if generation == self.generation:
+            self.result_ready.emit(result)
+
+    def on_failed(self, generation, message):
+        self.tasks.pop(generation, None)
+        if generation == self.generation:
+            self.error.emit(message)
+
+class ParallelLoader(QObject):
+    """用 concurrent.futures 執行器（線程池或進程池）並行處理多個輸入
+
+    每完成一項就在主線程發出 item_ready 或 item_failed，全部完成後發出 finished；
+    與 BackgroundComputer 一樣以代數計數丟棄過期批次的結果。
+    """
+    item_ready = pyqtSignal(int, object)
+    item_failed = pyqtSignal(int, str)
+    finished = pyqtSignal()
+    # 內部信號：由執行器線程發出，排隊送到主線程處理
+    _completed = pyqtSignal(int, int, object)
+
+    def __init__(self, executor_factory, parent=None):
+        super().__init__(parent)
+        self.executor_factory = executor_factory
+        self.executor = None
+        self.generation = 0
+        self.futures = []
+        self.remaining = 0
+        self._completed.connect(self.on_completed)
+
+    def submit(self, fn, items):
+        """提交一批輸入，取消上一批中尚未開始的任務"""
+        self.cancel()
+        if self.executor is None:
+            self.executor = self.executor_factory()
+        generation = self.generation
+        self.remaining = len(items)
+        self.futures = []
+        for index, item in enumerate(items):
+            future = self.executor.submit(fn, item)
+            future.add_done_callback(
+                lambda f, index=index: self._completed.emit(generation, index, f))
+            self.futures.append(future)
+        if not items:
+            self.finished.emit()
+
+    def cancel(self):
+        """使當前批次過期並取消尚未開始的任務"""
+        self.generation += 1
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+        self.remaining = 0
+
+    @property
+    def busy(self):
+        return self.remaining > 0
+
+    def on_completed(self, generation, index, future):
+        if generation != self.generation or future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.item_ready.emit(index, future.result())
+        else:
+            self.item_failed.emit(index, str(error))
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.finished.emit()
+
+    def shutdown(self):
+        """關閉執行器：取消排隊中的任務，等待正在運行的任務結束"""
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None